@@ -0,0 +1,112 @@
+"""
+Incremental interview assessment for AI Interviewer
+Running per-turn assessment notes kept up to date in the background, so ending an interview only needs a small merge call
+"""
+
+import os
+from typing import Set, TYPE_CHECKING
+from dotenv import load_dotenv
+
+from groq_client import chat_completion
+
+if TYPE_CHECKING:
+    from session_state import InterviewState
+
+# Load environment variables
+load_dotenv()
+
+# Judging answers happens off the request path, so it can use the strong model
+ASSESSMENT_NOTES_MODEL = os.getenv("ASSESSMENT_NOTES_MODEL", "llama-3.3-70b-versatile")
+ASSESSMENT_NOTES_MAX_TOKENS = int(os.getenv("ASSESSMENT_NOTES_MAX_TOKENS", "300"))
+# The final merge mostly restructures the notes, so a fast model keeps /end quick
+ASSESSMENT_MERGE_MODEL = os.getenv("ASSESSMENT_MERGE_MODEL", "llama-3.1-8b-instant")
+# A longer unassessed tail is folded into the notes before the final merge, keeping its prompt small
+ASSESSMENT_MAX_TAIL_MESSAGES = int(os.getenv("ASSESSMENT_MAX_TAIL_MESSAGES", "12"))
+
+# Sessions whose notes are being updated by this process (kept out of the session, whose
+# background copy the next turn never sees)
+_updating: Set[str] = set()
+
+
+def new_assessment_state() -> dict:
+    """Per-session running assessment"""
+    return {
+        "notes": "",
+        "assessed_upto": 0,
+        "updates": 0
+    }
+
+
+def _format_messages(messages: list) -> str:
+    return "\n".join(f"{m['role'].upper()}: {m['content']}" for m in messages)
+
+
+def needs_assessment_update(session_id: str, session: "InterviewState") -> bool:
+    """True when there are answered turns not yet folded into the notes"""
+    return session_id not in _updating and len(session.history) > session.assessment["assessed_upto"]
+
+
+async def update_assessment(session_id: str, session: "InterviewState"):
+    """Fold the newest exchanges into the running assessment notes"""
+    state = session.assessment
+    if session_id in _updating:
+        return
+
+    start = state["assessed_upto"]
+    end = len(session.history)
+    if end <= start:
+        return
+
+    _updating.add(session_id)
+    try:
+        prompt = f"""You are keeping running assessment notes on a candidate during a {session.topic_name} mock interview ({session.difficulty} difficulty).
+
+CURRENT NOTES:
+{state["notes"] or "(no notes yet)"}
+
+NEW EXCHANGES:
+{_format_messages(session.history[start:end])}
+
+Update the notes with what the new exchanges show. Track, briefly:
+- Technical accuracy (evidence and rough rating)
+- Communication clarity
+- Problem-solving approach
+- Strengths observed
+- Gaps / areas for improvement
+Keep concrete examples from the answers. Under 200 words, plain text bullet points."""
+
+        notes = await chat_completion(
+            model=ASSESSMENT_NOTES_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.3,
+            max_tokens=ASSESSMENT_NOTES_MAX_TOKENS
+        )
+        state["notes"] = notes.strip()
+        state["assessed_upto"] = end
+        state["updates"] += 1
+    except Exception as e:
+        print(f"Assessment update failed: {e}")
+    finally:
+        _updating.discard(session_id)
+
+
+async def assessment_evidence(session_id: str, session: "InterviewState") -> str:
+    """
+    Evidence for the final summary: the running notes plus the exchanges
+    they do not cover yet. A tail longer than ASSESSMENT_MAX_TAIL_MESSAGES is
+    folded into the notes first; nothing is ever cut, so when that fails (or
+    another update is still running) the whole tail goes in, and without
+    notes the whole transcript does.
+    """
+    state = session.assessment
+    if state["notes"] and len(session.history) - state["assessed_upto"] > ASSESSMENT_MAX_TAIL_MESSAGES:
+        await update_assessment(session_id, session)
+
+    if not state["notes"]:
+        return f"Conversation:\n{_format_messages(session.history.to_list())}"
+
+    evidence = f"Running assessment notes (covering the interview so far):\n{state['notes']}"
+    tail = session.history[state["assessed_upto"]:]
+    if tail:
+        evidence += f"\n\nLatest exchanges not yet in the notes:\n{_format_messages(tail)}"
+    return evidence
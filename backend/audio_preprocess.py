@@ -0,0 +1,382 @@
+"""
+Audio normalization before transcription for AI Interviewer
+Trims silence with an energy VAD, downmixes/resamples to 16 kHz mono and re-encodes compactly (needs ffmpeg)
+"""
+
+import io
+import os
+import sys
+import math
+import time
+import shutil
+import asyncio
+import wave
+import subprocess
+import multiprocessing
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, List, Tuple, Callable, Any
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# "auto" normalizes when an ffmpeg binary is on PATH; "false" disables the stage
+AUDIO_NORMALIZE = os.getenv("AUDIO_NORMALIZE", "auto").lower()
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+AUDIO_NORMALIZE_WORKERS = int(os.getenv("AUDIO_NORMALIZE_WORKERS", "2"))
+AUDIO_NORMALIZE_TIMEOUT_SECONDS = float(os.getenv("AUDIO_NORMALIZE_TIMEOUT_SECONDS", "10"))
+# Uploads smaller than this go to Whisper untouched: decoding would cost more than it saves
+AUDIO_NORMALIZE_MIN_BYTES = int(os.getenv("AUDIO_NORMALIZE_MIN_BYTES", "65536"))
+# Keep the original unless the result is at least this much smaller or this many seconds shorter
+AUDIO_NORMALIZE_MIN_SAVINGS = float(os.getenv("AUDIO_NORMALIZE_MIN_SAVINGS", "0.15"))
+AUDIO_NORMALIZE_MIN_SECONDS_SAVED = float(os.getenv("AUDIO_NORMALIZE_MIN_SECONDS_SAVED", "1.0"))
+# Output encoding: "opus" (Ogg/Opus, smallest) or "flac" (lossless)
+AUDIO_NORMALIZE_FORMAT = os.getenv("AUDIO_NORMALIZE_FORMAT", "opus")
+AUDIO_NORMALIZE_OPUS_BITRATE = os.getenv("AUDIO_NORMALIZE_OPUS_BITRATE", "24k")
+
+# VAD tuning
+AUDIO_VAD_FRAME_MS = 30
+AUDIO_VAD_MIN_RMS = float(os.getenv("AUDIO_VAD_MIN_RMS", "300"))
+AUDIO_VAD_PADDING_MS = int(os.getenv("AUDIO_VAD_PADDING_MS", "250"))
+# Pauses inside the answer longer than this are shortened to it
+AUDIO_VAD_MAX_PAUSE_MS = int(os.getenv("AUDIO_VAD_MAX_PAUSE_MS", "1000"))
+
+SAMPLE_RATE = 16000
+BYTES_PER_SECOND = SAMPLE_RATE * 2
+
+# Process-wide totals, exposed through /metrics
+normalize_metrics = {
+    "requests": 0,
+    "applied": 0,
+    "skipped": {},
+    "bytes_in": 0,
+    "bytes_out": 0,
+    "seconds_in": 0.0,
+    "seconds_out": 0.0,
+    "elapsed_ms": 0.0
+}
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def normalization_available() -> bool:
+    """True when the stage is enabled and ffmpeg can be found"""
+    if AUDIO_NORMALIZE in ("0", "false", "no", "off"):
+        return False
+    return shutil.which(FFMPEG_BINARY) is not None
+
+
+# ============== WORKER SIDE (runs in the process pool) ==============
+
+def _run_ffmpeg(args: List[str], data: bytes) -> bytes:
+    result = subprocess.run(
+        [FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", *args],
+        input=data,
+        capture_output=True,
+        timeout=AUDIO_NORMALIZE_TIMEOUT_SECONDS
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.decode("utf-8", "replace").strip()[:200] or "ffmpeg failed")
+    return result.stdout
+
+
+def _pcm_samples(pcm: bytes) -> array:
+    samples = array("h")
+    samples.frombytes(pcm[:len(pcm) - len(pcm) % 2])
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples
+
+
+def _voiced_frames(samples: array, frame: int) -> List[bool]:
+    """Per-frame speech/silence decision with an adaptive threshold"""
+    energies = _frame_rms(samples, frame)
+    if not energies:
+        return []
+    # Well above the noise floor, never below the absolute minimum
+    noise_floor = sorted(energies)[len(energies) // 10]
+    threshold = max(AUDIO_VAD_MIN_RMS, noise_floor * 3)
+    return [e > threshold for e in energies]
+
+
+def _frame_rms(samples: array, frame: int) -> List[float]:
+    """RMS per frame, computed on every 4th sample (plenty for a speech/silence decision)"""
+    energies = []
+    for start in range(0, len(samples) - frame + 1, frame):
+        chunk = samples[start:start + frame:4]
+        energies.append(math.sqrt(sum(s * s for s in chunk) / len(chunk)))
+    return energies
+
+
+def trim_silence(pcm: bytes) -> bytes:
+    """
+    Energy VAD over 16 kHz s16le mono: drop leading/trailing silence (keeping
+    some padding) and shorten long pauses inside the answer.
+    """
+    frame = SAMPLE_RATE * AUDIO_VAD_FRAME_MS // 1000
+    voiced = _voiced_frames(_pcm_samples(pcm), frame)
+    if not any(voiced):
+        return pcm
+
+    padding = AUDIO_VAD_PADDING_MS // AUDIO_VAD_FRAME_MS
+    max_pause = AUDIO_VAD_MAX_PAUSE_MS // AUDIO_VAD_FRAME_MS
+    first = max(0, voiced.index(True) - padding)
+    last = min(len(voiced) - 1, len(voiced) - 1 - voiced[::-1].index(True) + padding)
+
+    keep: List[Tuple[int, int]] = []
+    run_start = first
+    pause = 0
+    for i in range(first, last + 1):
+        if voiced[i]:
+            pause = 0
+            continue
+        pause += 1
+        if pause == max_pause + 1:
+            # Close the kept range at the end of the allowed pause
+            keep.append((run_start, i))
+        if pause > max_pause:
+            run_start = i + 1
+    keep.append((run_start, last + 1))
+
+    bytes_per_frame = frame * 2
+    return b"".join(
+        pcm[start * bytes_per_frame:end * bytes_per_frame]
+        for start, end in keep if end > start
+    )
+
+
+def find_pause_cuts(pcm: bytes, min_pause_ms: int) -> List[int]:
+    """
+    Byte offsets inside pauses of at least min_pause_ms that follow speech,
+    i.e. safe places to cut a recording into independently transcribable segments.
+    """
+    frame = SAMPLE_RATE * AUDIO_VAD_FRAME_MS // 1000
+    voiced = _voiced_frames(_pcm_samples(pcm), frame)
+    min_pause = max(1, min_pause_ms // AUDIO_VAD_FRAME_MS)
+
+    cuts = []
+    heard_speech = False
+    pause = 0
+    for i, is_voiced in enumerate(voiced):
+        if is_voiced:
+            heard_speech = True
+            pause = 0
+            continue
+        pause += 1
+        if heard_speech and pause == min_pause:
+            # Cut in the middle of the pause, then wait for speech again
+            cuts.append((i + 1 - min_pause // 2) * frame * 2)
+            heard_speech = False
+    return cuts
+
+
+def quietest_cut(pcm: bytes) -> int:
+    """Byte offset of the start of the quietest frame (where a cut that no pause offers hurts least)"""
+    frame = SAMPLE_RATE * AUDIO_VAD_FRAME_MS // 1000
+    energies = _frame_rms(_pcm_samples(pcm), frame)
+    if not energies:
+        return 0
+    return energies.index(min(energies)) * frame * 2
+
+
+def has_speech(pcm: bytes) -> bool:
+    """True when the VAD finds any voiced frame"""
+    frame = SAMPLE_RATE * AUDIO_VAD_FRAME_MS // 1000
+    return any(_voiced_frames(_pcm_samples(pcm), frame))
+
+
+def pcm_to_wav(pcm: bytes) -> bytes:
+    """Wrap 16 kHz s16le mono PCM in a WAV header (no ffmpeg needed)"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def decode_to_pcm_sync(audio_data: bytes) -> bytes:
+    """Decode any container ffmpeg understands to 16 kHz s16le mono PCM"""
+    return _run_ffmpeg(
+        ["-i", "pipe:0", "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "s16le", "pipe:1"],
+        audio_data
+    )
+
+
+def _encode(pcm: bytes) -> Tuple[bytes, str]:
+    raw_input = ["-f", "s16le", "-ar", str(SAMPLE_RATE), "-ac", "1", "-i", "pipe:0"]
+    if AUDIO_NORMALIZE_FORMAT == "opus":
+        try:
+            return _run_ffmpeg(
+                raw_input + ["-c:a", "libopus", "-b:a", AUDIO_NORMALIZE_OPUS_BITRATE,
+                             "-application", "voip", "-f", "ogg", "pipe:1"],
+                pcm
+            ), "ogg"
+        except RuntimeError:
+            pass  # ffmpeg built without libopus: fall through to FLAC
+    return _run_ffmpeg(raw_input + ["-c:a", "flac", "-f", "flac", "pipe:1"], pcm), "flac"
+
+
+def normalize_audio_sync(audio_data: bytes) -> dict:
+    """Decode -> 16 kHz mono -> VAD trim -> re-encode. Returns the encoded audio and its stats."""
+    pcm = decode_to_pcm_sync(audio_data)
+    trimmed = trim_silence(pcm)
+    encoded, extension = _encode(trimmed)
+    return {
+        "audio": encoded,
+        "extension": extension,
+        "input_seconds": len(pcm) / BYTES_PER_SECOND,
+        "output_seconds": len(trimmed) / BYTES_PER_SECOND
+    }
+
+
+# ============== EVENT LOOP SIDE ==============
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # Not plain fork: a forked worker would inherit the pipes of running PcmStreamDecoders,
+        # and ffmpeg never sees the end of a stream whose stdin is still open elsewhere
+        context = multiprocessing.get_context("forkserver") if "forkserver" in multiprocessing.get_all_start_methods() else None
+        _pool = ProcessPoolExecutor(max_workers=AUDIO_NORMALIZE_WORKERS, mp_context=context)
+    return _pool
+
+
+async def run_in_audio_pool(func: Callable[..., Any], *args) -> Any:
+    """Run CPU/ffmpeg-bound audio work in the worker pool"""
+    return await asyncio.get_running_loop().run_in_executor(_get_pool(), func, *args)
+
+
+class PcmStreamDecoder:
+    """
+    One ffmpeg process decoding a stream that arrives in pieces (a
+    MediaRecorder upload, chunk by chunk) to 16 kHz s16le mono PCM, so every
+    byte is decoded once instead of re-decoding everything received so far.
+    Decoded PCM accumulates in `pcm`; consumers may delete what they used.
+    """
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.pcm = bytearray()
+        self._process = process
+        self._reader = asyncio.create_task(self._read())
+
+    @classmethod
+    async def start(cls) -> "PcmStreamDecoder":
+        process = await asyncio.create_subprocess_exec(
+            FFMPEG_BINARY, "-hide_banner", "-loglevel", "error",
+            "-i", "pipe:0", "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "s16le", "pipe:1",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        return cls(process)
+
+    async def _read(self):
+        while True:
+            data = await self._process.stdout.read(65536)
+            if not data:
+                return
+            self.pcm.extend(data)
+
+    async def feed(self, data: bytes):
+        """Send more of the stream (raises once ffmpeg has given up on it)"""
+        self._process.stdin.write(data)
+        await self._process.stdin.drain()
+
+    async def finish(self):
+        """End the stream and wait until everything is decoded; RuntimeError if ffmpeg failed"""
+        self._process.stdin.close()
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(self._reader, self._process.wait()),
+                AUDIO_NORMALIZE_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            self.kill()
+            raise RuntimeError("ffmpeg timed out")
+        if self._process.returncode != 0:
+            error = await self._process.stderr.read()
+            raise RuntimeError(error.decode("utf-8", "replace").strip()[:200] or "ffmpeg failed")
+
+    def kill(self):
+        self._reader.cancel()
+        if self._process.returncode is None:
+            self._process.kill()
+
+
+def shutdown_audio_pool():
+    """Stop the worker processes (called on app shutdown)"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _skip(reason: str, audio_data: bytes, filename: str, started: float) -> Tuple[bytes, str, dict]:
+    normalize_metrics["skipped"][reason] = normalize_metrics["skipped"].get(reason, 0) + 1
+    return audio_data, filename, {
+        "applied": False,
+        "reason": reason,
+        "input_bytes": len(audio_data),
+        "elapsed_ms": round((time.monotonic() - started) * 1000, 1)
+    }
+
+
+async def normalize_for_stt(audio_data: bytes, filename: str) -> Tuple[bytes, str, dict]:
+    """
+    Return (audio, filename, report) for Whisper. The normalized audio is
+    used only when it is meaningfully smaller or shorter than the upload;
+    otherwise the original is passed through and report["reason"] says why.
+    """
+    started = time.monotonic()
+    normalize_metrics["requests"] += 1
+    if not normalization_available():
+        return _skip("disabled", audio_data, filename, started)
+    if len(audio_data) < AUDIO_NORMALIZE_MIN_BYTES:
+        return _skip("small_input", audio_data, filename, started)
+
+    try:
+        result = await run_in_audio_pool(normalize_audio_sync, audio_data)
+    except Exception as e:
+        print(f"Audio normalization failed, using original upload: {e}")
+        return _skip("failed", audio_data, filename, started)
+
+    output = result["audio"]
+    bytes_saved = len(audio_data) - len(output)
+    seconds_saved = result["input_seconds"] - result["output_seconds"]
+    if bytes_saved < len(audio_data) * AUDIO_NORMALIZE_MIN_SAVINGS and seconds_saved < AUDIO_NORMALIZE_MIN_SECONDS_SAVED:
+        return _skip("no_gain", audio_data, filename, started)
+
+    elapsed_ms = round((time.monotonic() - started) * 1000, 1)
+    normalize_metrics["applied"] += 1
+    normalize_metrics["bytes_in"] += len(audio_data)
+    normalize_metrics["bytes_out"] += len(output)
+    normalize_metrics["seconds_in"] += result["input_seconds"]
+    normalize_metrics["seconds_out"] += result["output_seconds"]
+    normalize_metrics["elapsed_ms"] += elapsed_ms
+
+    stem = os.path.splitext(filename)[0] or "audio"
+    return output, f"{stem}.{result['extension']}", {
+        "applied": True,
+        "input_bytes": len(audio_data),
+        "output_bytes": len(output),
+        "bytes_saved": bytes_saved,
+        "input_seconds": round(result["input_seconds"], 2),
+        "output_seconds": round(result["output_seconds"], 2),
+        "seconds_saved": round(seconds_saved, 2),
+        "elapsed_ms": elapsed_ms
+    }
+
+
+def normalize_metrics_report() -> dict:
+    """Process-wide bytes and audio seconds saved by normalization"""
+    return {
+        **normalize_metrics,
+        "available": normalization_available(),
+        "bytes_saved": normalize_metrics["bytes_in"] - normalize_metrics["bytes_out"],
+        "seconds_saved": round(normalize_metrics["seconds_in"] - normalize_metrics["seconds_out"], 2),
+        "seconds_in": round(normalize_metrics["seconds_in"], 2),
+        "seconds_out": round(normalize_metrics["seconds_out"], 2)
+    }
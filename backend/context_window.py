@@ -0,0 +1,193 @@
+"""
+Bounded prompt context for AI Interviewer
+Keeps the last K messages verbatim and folds older turns into a running summary built in the background
+"""
+
+import os
+from typing import List, Dict, Any, Optional, Tuple, Set, TYPE_CHECKING
+from dotenv import load_dotenv
+
+from groq_client import chat_completion
+
+if TYPE_CHECKING:
+    from session_state import InterviewState
+
+# Load environment variables
+load_dotenv()
+
+# Messages (not exchanges) always sent verbatim at the end of the prompt
+CONTEXT_KEEP_MESSAGES = int(os.getenv("CONTEXT_KEEP_MESSAGES", "6"))
+# Upper bound on estimated prompt tokens (system prompt + summary + verbatim history)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+# Fold older messages once this many have piled up beyond the verbatim window
+CONTEXT_SUMMARY_BATCH = int(os.getenv("CONTEXT_SUMMARY_BATCH", "4"))
+CONTEXT_SUMMARY_MODEL = os.getenv("CONTEXT_SUMMARY_MODEL", "llama-3.1-8b-instant")
+CONTEXT_SUMMARY_MAX_TOKENS = int(os.getenv("CONTEXT_SUMMARY_MAX_TOKENS", "250"))
+
+# Process-wide totals, exposed through /metrics
+context_metrics = {
+    "turns": 0,
+    "full_prompt_tokens": 0,
+    "sent_prompt_tokens": 0,
+    "summaries_built": 0,
+    "summary_failures": 0
+}
+
+# Sessions whose summary is being rebuilt by this process. Not a field of the session:
+# the background task works on its own copy, so the next turn would never see it set.
+_summarizing: Set[str] = set()
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) - good enough for budgeting"""
+    return len(text) // 4 + 1
+
+
+def message_tokens(message: Dict[str, Any]) -> int:
+    """Estimated tokens for one chat message including role overhead"""
+    return estimate_tokens(message["content"]) + 4
+
+
+def new_context_state() -> dict:
+    """Per-session context bookkeeping stored alongside the history"""
+    return {
+        "summary": "",
+        "summarized_upto": 0,
+        "turns": 0,
+        "full_prompt_tokens": 0,
+        "sent_prompt_tokens": 0,
+        "last_turn": None
+    }
+
+
+def build_prompt_messages(
+    session: "InterviewState",
+    system_prompt: Optional[str] = None,
+    extra_messages: Optional[List[Dict[str, Any]]] = None
+) -> Tuple[List[Dict[str, Any]], dict]:
+    """
+    Build the chat messages for the next completion: system prompt, running
+    summary of older turns, then the most recent history verbatim, trimmed to
+    CONTEXT_TOKEN_BUDGET. Returns (messages, token stats for this turn).
+    The session is not modified; the caller records the stats on the copy it
+    saves with record_prompt_stats().
+    """
+    context = session.context
+    history = session.history
+    extra_messages = extra_messages or []
+    system_content = system_prompt if system_prompt is not None else session.system_prompt
+
+    full_tokens = estimate_tokens(system_content) + sum(message_tokens(m) for m in history) + sum(message_tokens(m) for m in extra_messages)
+
+    if context["summary"]:
+        system_content += f"""
+
+SUMMARY OF THE INTERVIEW SO FAR (earlier turns, already discussed):
+{context["summary"]}"""
+
+    verbatim = history[context["summarized_upto"]:] + extra_messages
+    sent_tokens = estimate_tokens(system_content) + sum(message_tokens(m) for m in verbatim)
+
+    # If summarization is lagging, drop the oldest unsummarized messages,
+    # but never the last CONTEXT_KEEP_MESSAGES
+    while sent_tokens > CONTEXT_TOKEN_BUDGET and len(verbatim) > CONTEXT_KEEP_MESSAGES:
+        sent_tokens -= message_tokens(verbatim.pop(0))
+
+    messages = [{"role": "system", "content": system_content}] + verbatim
+
+    stats = {
+        "full_prompt_tokens": full_tokens,
+        "sent_prompt_tokens": sent_tokens,
+        "saved_tokens": max(0, full_tokens - sent_tokens),
+        "verbatim_messages": len(verbatim),
+        "summarized_messages": context["summarized_upto"]
+    }
+    context_metrics["turns"] += 1
+    context_metrics["full_prompt_tokens"] += full_tokens
+    context_metrics["sent_prompt_tokens"] += sent_tokens
+    return messages, stats
+
+
+def record_prompt_stats(session: "InterviewState", stats: dict):
+    """Add one turn's prompt token stats to the session's context bookkeeping"""
+    context = session.context
+    context["turns"] += 1
+    context["full_prompt_tokens"] += stats["full_prompt_tokens"]
+    context["sent_prompt_tokens"] += stats["sent_prompt_tokens"]
+    context["last_turn"] = stats
+
+
+def needs_summary(session_id: str, session: "InterviewState") -> bool:
+    """True when enough old messages have accumulated outside the verbatim window"""
+    foldable = len(session.history) - CONTEXT_KEEP_MESSAGES - session.context["summarized_upto"]
+    return session_id not in _summarizing and foldable >= CONTEXT_SUMMARY_BATCH
+
+
+async def fold_history(session_id: str, session: "InterviewState"):
+    """Fold messages older than the verbatim window into the running summary"""
+    context = session.context
+    start = context["summarized_upto"]
+    end = len(session.history) - CONTEXT_KEEP_MESSAGES
+    if end <= start or session_id in _summarizing:
+        return
+
+    _summarizing.add(session_id)
+    try:
+        transcript = "\n".join(
+            f"{m['role'].upper()}: {m['content']}" for m in session.history[start:end]
+        )
+        prompt = f"""You maintain a compact running summary of a mock interview for the interviewer.
+
+CURRENT SUMMARY:
+{context["summary"] or "(none yet)"}
+
+NEW EXCHANGES TO FOLD IN:
+{transcript}
+
+Rewrite the summary to include the new exchanges. Keep every question already asked,
+the key points and gaps in each answer, and any [SCORE: X/10] given. Under 150 words, plain text."""
+
+        summary = await chat_completion(
+            model=CONTEXT_SUMMARY_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.2,
+            max_tokens=CONTEXT_SUMMARY_MAX_TOKENS
+        )
+        context["summary"] = summary.strip()
+        context["summarized_upto"] = end
+        context_metrics["summaries_built"] += 1
+    except Exception as e:
+        context_metrics["summary_failures"] += 1
+        print(f"Context summary failed: {e}")
+    finally:
+        _summarizing.discard(session_id)
+
+
+def context_report(session: "InterviewState") -> dict:
+    """Per-session prompt-token savings"""
+    context = session.context
+    full = context["full_prompt_tokens"]
+    sent = context["sent_prompt_tokens"]
+    return {
+        "turns": context["turns"],
+        "summarized_messages": context["summarized_upto"],
+        "summary_tokens": estimate_tokens(context["summary"]) if context["summary"] else 0,
+        "full_prompt_tokens": full,
+        "sent_prompt_tokens": sent,
+        "saved_tokens": max(0, full - sent),
+        "savings_percent": round((full - sent) / full * 100, 1) if full else 0,
+        "last_turn": context["last_turn"]
+    }
+
+
+def context_metrics_report() -> dict:
+    """Process-wide prompt-token savings"""
+    full = context_metrics["full_prompt_tokens"]
+    sent = context_metrics["sent_prompt_tokens"]
+    return {
+        **context_metrics,
+        "saved_tokens": max(0, full - sent),
+        "savings_percent": round((full - sent) / full * 100, 1) if full else 0,
+        "keep_messages": CONTEXT_KEEP_MESSAGES,
+        "token_budget": CONTEXT_TOKEN_BUDGET
+    }
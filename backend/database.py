@@ -18,6 +18,9 @@ load_dotenv()
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 DATABASE_NAME = "ai_interviewer"
 
+# Expression timeline buckets are dropped after this many days (0 keeps them)
+EXPRESSION_TIMELINE_RETENTION_DAYS = int(os.getenv("EXPRESSION_TIMELINE_RETENTION_DAYS", "90"))
+
 # Global database client
 client: Optional[AsyncIOMotorClient] = None
 db = None
@@ -96,9 +99,36 @@ async def create_indexes():
     # Global stats indexes
     await db.global_stats.create_index("stat_key", unique=True)
     
+    # Active sessions (SESSION_STORE=mongo)
+    await db.live_sessions.create_index("updated_at")
+    
+    await create_timeline_collection()
+    
     print("📊 Database indexes created")
 
 
+async def create_timeline_collection():
+    """
+    Expression timeline buckets go to a time-series collection (MongoDB 5.0+),
+    which stores them column-compressed per session. Older servers get a
+    plain collection with the equivalent index.
+    """
+    expire = {"expireAfterSeconds": EXPRESSION_TIMELINE_RETENTION_DAYS * 86400} if EXPRESSION_TIMELINE_RETENTION_DAYS > 0 else {}
+    if "expression_timeline" in await db.list_collection_names():
+        return
+    try:
+        await db.create_collection(
+            "expression_timeline",
+            timeseries={"timeField": "ts", "metaField": "session_id", "granularity": "seconds"},
+            **expire
+        )
+    except Exception as e:
+        print(f"⚠️ Time-series collections unavailable ({e}); using a regular collection for expression timelines")
+        await db.expression_timeline.create_index([("session_id", 1), ("ts", 1)])
+        if expire:
+            await db.expression_timeline.create_index("ts", **expire)
+
+
 def get_database():
     """Get database instance"""
     global db
@@ -376,6 +406,36 @@ async def set_global_stat(key: str, value: str):
     )
 
 
+# ============== EXPRESSION TIMELINE ==============
+
+async def replace_expression_buckets(session_id: str, documents: List[dict]):
+    """Store a session's timeline buckets, replacing any stored before"""
+    await db.expression_timeline.delete_many({"session_id": session_id})
+    if documents:
+        await db.expression_timeline.insert_many(documents, ordered=False)
+
+
+async def find_expression_buckets(
+    session_id: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> Optional[List[dict]]:
+    """A session's buckets in [start, end), oldest first; None if it has none stored at all"""
+    if db is None:
+        return None
+    query: Dict[str, Any] = {"session_id": session_id}
+    if start is not None or end is not None:
+        query["ts"] = {}
+        if start is not None:
+            query["ts"]["$gte"] = start
+        if end is not None:
+            query["ts"]["$lt"] = end
+    documents = await db.expression_timeline.find(query, {"_id": 0}).sort("ts", 1).to_list(length=None)
+    if not documents and "ts" in query and await db.expression_timeline.find_one({"session_id": session_id}) is not None:
+        return []
+    return documents or None
+
+
 # ============== API USAGE TRACKING ==============
 
 async def log_api_usage(usage_data: dict):
@@ -0,0 +1,206 @@
+"""
+Expression timeline for AI Interviewer
+Rolls expression samples up into fixed time buckets (min/avg/max and emotion counts) for charting and replay, persisted to a MongoDB time-series collection
+"""
+
+import os
+import math
+from datetime import datetime, timezone
+from typing import Optional, Dict, List, Any
+from dotenv import load_dotenv
+
+from database import replace_expression_buckets, find_expression_buckets
+from session_state import ExpressionSeries, EXPRESSION_TIMESTAMP_MAX_MS
+
+# Load environment variables
+load_dotenv()
+
+# Width of one timeline bucket (1 for per-second detail, 5 keeps an hour to 720 points)
+EXPRESSION_BUCKET_SECONDS = max(1, int(os.getenv("EXPRESSION_BUCKET_SECONDS", "5")))
+
+# The numeric ExpressionSeries columns rolled up per bucket
+METRICS = ("confidence", "eye_contact", "engagement")
+
+# Process-wide totals, exposed through /metrics
+timeline_metrics = {
+    "persisted_sessions": 0,
+    "persisted_buckets": 0,
+    "persist_failures": 0,
+    "dropped_buckets": 0,
+    "live_queries": 0,
+    "stored_queries": 0
+}
+
+
+def empty_timeline(bucket_seconds: int) -> Dict[str, Any]:
+    """
+    The columnar timeline shape: one entry per bucket in every list.
+    start is the bucket's start in epoch ms; emotions maps label -> counts.
+    """
+    timeline = {"bucket_seconds": bucket_seconds, "start": [], "samples": []}
+    for name in METRICS:
+        timeline[name] = {"min": [], "avg": [], "max": []}
+    timeline["emotions"] = {}
+    return timeline
+
+
+def rollup(
+    series: ExpressionSeries,
+    bucket_seconds: int = EXPRESSION_BUCKET_SECONDS,
+    start_ms: Optional[int] = None,
+    end_ms: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Bucket a session's samples in one pass over the arrays, optionally only
+    the buckets starting in [start_ms, end_ms) (the same rule the MongoDB
+    query applies). Samples may arrive out of order (batches), so buckets
+    are keyed by time and sorted at the end.
+    """
+    bucket_ms = bucket_seconds * 1000
+    columns = [getattr(series, name) for name in METRICS]
+    # bucket key -> [count, emotion counts by code, then min, sum, max per metric]
+    buckets: Dict[int, list] = {}
+    for index, timestamp in enumerate(series.timestamps):
+        key = timestamp // bucket_ms
+        if (start_ms is not None and key * bucket_ms < start_ms) or (end_ms is not None and key * bucket_ms >= end_ms):
+            continue
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = [0, {}] + [math.inf, 0.0, -math.inf] * len(columns)
+        bucket[0] += 1
+        emotion = series.emotions[index]
+        bucket[1][emotion] = bucket[1].get(emotion, 0) + 1
+        for position, values in enumerate(columns):
+            value = values[index]
+            slot = 2 + position * 3
+            if value < bucket[slot]:
+                bucket[slot] = value
+            bucket[slot + 1] += value
+            if value > bucket[slot + 2]:
+                bucket[slot + 2] = value
+
+    timeline = empty_timeline(bucket_seconds)
+    emotions = timeline["emotions"]
+    for position, key in enumerate(sorted(buckets)):
+        bucket = buckets[key]
+        count = bucket[0]
+        timeline["start"].append(key * bucket_ms)
+        timeline["samples"].append(count)
+        for metric, name in enumerate(METRICS):
+            slot = 2 + metric * 3
+            timeline[name]["min"].append(round(bucket[slot], 1))
+            timeline[name]["avg"].append(round(bucket[slot + 1] / count, 1))
+            timeline[name]["max"].append(round(bucket[slot + 2], 1))
+        for code, emotion_count in bucket[1].items():
+            label = series.label(code) or "none"
+            counts = emotions.setdefault(label, [0] * position)
+            counts.extend([0] * (position - len(counts)))
+            counts.append(emotion_count)
+    for counts in emotions.values():
+        counts.extend([0] * (len(timeline["start"]) - len(counts)))
+    return timeline
+
+
+def to_documents(session_id: str, timeline: Dict[str, Any]) -> List[dict]:
+    """
+    One time-series document per bucket (session_id is the meta field).
+    Buckets outside what datetime can represent (samples stored before
+    timestamps were range-checked) are dropped.
+    """
+    documents = []
+    labels = list(timeline["emotions"])
+    for index, start in enumerate(timeline["start"]):
+        if not 0 <= start <= EXPRESSION_TIMESTAMP_MAX_MS:
+            timeline_metrics["dropped_buckets"] += 1
+            continue
+        document = {
+            "ts": datetime.fromtimestamp(start / 1000, tz=timezone.utc),
+            "session_id": session_id,
+            "bucket_seconds": timeline["bucket_seconds"],
+            "samples": timeline["samples"][index]
+        }
+        for name in METRICS:
+            column = timeline[name]
+            document[name] = [column["min"][index], column["avg"][index], column["max"][index]]
+        # Label/count pairs: labels come from the client and are not safe as field names
+        document["emotions"] = [
+            [label, timeline["emotions"][label][index]]
+            for label in labels if timeline["emotions"][label][index]
+        ]
+        documents.append(document)
+    return documents
+
+
+def from_documents(documents: List[dict]) -> Dict[str, Any]:
+    """Stored bucket documents (sorted by ts) back to the columnar timeline"""
+    timeline = empty_timeline(documents[0]["bucket_seconds"] if documents else EXPRESSION_BUCKET_SECONDS)
+    emotions = timeline["emotions"]
+    for position, document in enumerate(documents):
+        ts = document["ts"]
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=timezone.utc)
+        timeline["start"].append(int(ts.timestamp() * 1000))
+        timeline["samples"].append(document["samples"])
+        for name in METRICS:
+            low, average, high = document[name]
+            timeline[name]["min"].append(low)
+            timeline[name]["avg"].append(average)
+            timeline[name]["max"].append(high)
+        for label, count in document["emotions"]:
+            counts = emotions.setdefault(label, [0] * position)
+            counts.extend([0] * (position - len(counts)))
+            counts.append(count)
+    for counts in emotions.values():
+        counts.extend([0] * (len(timeline["start"]) - len(counts)))
+    return timeline
+
+
+def live_timeline(
+    series: ExpressionSeries,
+    start_ms: Optional[int] = None,
+    end_ms: Optional[int] = None
+) -> Dict[str, Any]:
+    """An active session's timeline, straight from its samples"""
+    timeline_metrics["live_queries"] += 1
+    return rollup(series, EXPRESSION_BUCKET_SECONDS, start_ms, end_ms)
+
+
+async def persist_timeline(session_id: str, series: ExpressionSeries) -> int:
+    """
+    Store a finished session's buckets, replacing any stored earlier (so
+    ending twice, or on two workers, does not duplicate them). Returns the
+    number of buckets; failures are logged, never raised - the interview
+    result matters more than its chart.
+    """
+    if not len(series):
+        return 0
+    try:
+        documents = to_documents(session_id, rollup(series))
+        await replace_expression_buckets(session_id, documents)
+    except Exception as e:
+        timeline_metrics["persist_failures"] += 1
+        print(f"Could not store expression timeline for {session_id}: {e}")
+        return 0
+    timeline_metrics["persisted_sessions"] += 1
+    timeline_metrics["persisted_buckets"] += len(documents)
+    return len(documents)
+
+
+async def load_timeline(
+    session_id: str,
+    start_ms: Optional[int] = None,
+    end_ms: Optional[int] = None
+) -> Optional[Dict[str, Any]]:
+    """A stored session's buckets starting in [start_ms, end_ms); None if nothing is stored for it"""
+    start = datetime.fromtimestamp(start_ms / 1000, tz=timezone.utc) if start_ms is not None else None
+    end = datetime.fromtimestamp(end_ms / 1000, tz=timezone.utc) if end_ms is not None else None
+    documents = await find_expression_buckets(session_id, start, end)
+    if documents is None:
+        return None
+    timeline_metrics["stored_queries"] += 1
+    return from_documents(documents)
+
+
+def timeline_report() -> dict:
+    """Persistence and query counters"""
+    return {**timeline_metrics, "bucket_seconds": EXPRESSION_BUCKET_SECONDS}
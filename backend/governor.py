@@ -0,0 +1,352 @@
+"""
+Upstream concurrency governor for AI Interviewer
+Per-model concurrency and tokens-per-minute budgets, a FIFO wait queue and Retry-After aware backoff for every Groq call
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+from collections import deque
+from typing import Optional, Dict, Any, Callable, Awaitable, TypeVar, Deque, Tuple
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from groq import RateLimitError, InternalServerError, APIConnectionError, APIStatusError
+
+# Load environment variables
+load_dotenv()
+
+# Defaults applied to any model without an explicit entry in GROQ_MODEL_LIMITS
+GROQ_DEFAULT_CONCURRENCY = int(os.getenv("GROQ_DEFAULT_CONCURRENCY", "8"))
+# Tokens-per-minute budget (prompt estimate + max_tokens); 0 disables the budget
+GROQ_DEFAULT_TPM = int(os.getenv("GROQ_DEFAULT_TPM", "0"))
+# JSON overrides, e.g. {"llama-3.3-70b-versatile": {"concurrency": 4, "tpm": 6000}}
+GROQ_MODEL_LIMITS = os.getenv("GROQ_MODEL_LIMITS", "")
+# Longest a call may wait in the queue before the request is rejected with 503
+GROQ_MAX_QUEUE_WAIT_SECONDS = float(os.getenv("GROQ_MAX_QUEUE_WAIT_SECONDS", "30"))
+# Retries for 429 / 5xx / connection errors, with exponential backoff
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "3"))
+GROQ_BACKOFF_BASE_SECONDS = float(os.getenv("GROQ_BACKOFF_BASE_SECONDS", "0.5"))
+GROQ_BACKOFF_MAX_SECONDS = float(os.getenv("GROQ_BACKOFF_MAX_SECONDS", "20"))
+
+TPM_WINDOW_SECONDS = 60.0
+
+T = TypeVar("T")
+
+
+class UpstreamOverloadedError(HTTPException):
+    """Raised when a call could not be admitted within GROQ_MAX_QUEUE_WAIT_SECONDS"""
+
+    def __init__(self, model: str, retry_after: float):
+        super().__init__(
+            status_code=503,
+            detail=f"AI service is busy ({model}), please retry shortly",
+            headers={"Retry-After": str(max(1, int(retry_after + 0.999)))}
+        )
+
+
+def estimate_request_tokens(messages: Any, max_tokens: int = 0) -> int:
+    """Rough tokens a chat call counts against the TPM budget (~4 chars per token)"""
+    if not messages:
+        return max_tokens
+    chars = sum(len(str(m.get("content", ""))) + 16 for m in messages)
+    return chars // 4 + max_tokens
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read Retry-After (seconds or retry-after-ms) from a Groq error response"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        return None
+    return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """429s, 5xx and connection failures are worth retrying; other 4xx are not"""
+    if isinstance(error, (RateLimitError, InternalServerError, APIConnectionError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in (408, 409, 429) or error.status_code >= 500
+    return False
+
+
+class ModelGate:
+    """Admission control for one model: concurrency slots, TPM window and 429 cooldown"""
+
+    def __init__(self, model: str, concurrency: int, tpm: int):
+        self.model = model
+        self.concurrency = max(1, concurrency)
+        self.tpm = tpm
+
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        self._waiters: Deque[Tuple[asyncio.Future, int]] = deque()
+        self._window: Deque[Tuple[float, int]] = deque()
+        self._window_tokens = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        self.attempts = 0
+        self.queued_calls = 0
+        self.rejected = 0
+        self.rate_limited = 0
+        self.retries = 0
+        self.failures = 0
+        self.max_queue_depth = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    # ---------- token window ----------
+
+    def _expire_window(self, now: float):
+        while self._window and now - self._window[0][0] >= TPM_WINDOW_SECONDS:
+            self._window_tokens -= self._window.popleft()[1]
+
+    def _tokens_fit(self, tokens: int, now: float) -> bool:
+        if self.tpm <= 0:
+            return True
+        self._expire_window(now)
+        # An oversized call still runs once the window is empty, instead of never
+        return self._window_tokens + tokens <= self.tpm or self._window_tokens <= 0
+
+    def _record_tokens(self, tokens: int, now: float):
+        if self.tpm > 0 and tokens:
+            self._window.append((now, tokens))
+            self._window_tokens += tokens
+
+    # ---------- queue ----------
+
+    def _admissible(self, tokens: int, now: float) -> bool:
+        return (
+            self.in_flight < self.concurrency
+            and now >= self.cooldown_until
+            and self._tokens_fit(tokens, now)
+        )
+
+    def _wake(self):
+        """Admit waiters strictly in arrival order; the head blocks everyone behind it"""
+        self._timer = None
+        now = time.monotonic()
+        while self._waiters:
+            future, tokens = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if not self._admissible(tokens, now):
+                break
+            self._waiters.popleft()
+            self.in_flight += 1
+            self._record_tokens(tokens, now)
+            future.set_result(None)
+
+        if self._waiters and self.in_flight < self.concurrency:
+            # Blocked on time (cooldown or TPM window), not on a slot: re-check later
+            delay = max(self.cooldown_until - now, 0.0)
+            if self.tpm > 0 and self._window:
+                delay = max(delay, self._window[0][0] + TPM_WINDOW_SECONDS - now)
+            self._schedule_wake(max(delay, 0.01))
+
+    def _schedule_wake(self, delay: float):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(delay, self._wake)
+
+    async def acquire(self, tokens: int, timeout: float):
+        """Wait (FIFO) for a slot and token budget; raise UpstreamOverloadedError on timeout"""
+        self.attempts += 1
+        now = time.monotonic()
+        if not self._waiters and self._admissible(tokens, now):
+            self.in_flight += 1
+            self._record_tokens(tokens, now)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((future, tokens))
+        self.queued_calls += 1
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+        self._wake()
+
+        started = time.monotonic()
+        try:
+            await asyncio.wait({future}, timeout=timeout)
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            else:
+                future.cancel()
+            raise
+        finally:
+            waited = time.monotonic() - started
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+        if not future.done():
+            future.cancel()
+            self.rejected += 1
+            self._wake()
+            raise UpstreamOverloadedError(self.model, max(self.cooldown_until - time.monotonic(), 1.0))
+
+    def release(self, token_correction: int = 0):
+        """Free a slot; token_correction adjusts the window once actual usage is known"""
+        self.in_flight -= 1
+        if token_correction:
+            self._record_tokens(token_correction, time.monotonic())
+        self._wake()
+
+    def back_off(self, seconds: float):
+        """Pause admissions for this model (after a 429) so queued calls do not pile on"""
+        self.cooldown_until = max(self.cooldown_until, time.monotonic() + seconds)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        self._expire_window(now)
+        return {
+            "concurrency": self.concurrency,
+            "tpm": self.tpm,
+            "in_flight": self.in_flight,
+            "queue_depth": sum(1 for f, _ in self._waiters if not f.done()),
+            "max_queue_depth": self.max_queue_depth,
+            "tokens_last_minute": self._window_tokens,
+            "cooldown_remaining_seconds": round(max(self.cooldown_until - now, 0.0), 2),
+            "attempts": self.attempts,
+            "queued_calls": self.queued_calls,
+            "rejected": self.rejected,
+            "rate_limited": self.rate_limited,
+            "retries": self.retries,
+            "failures": self.failures,
+            "avg_queue_wait_ms": round(self.total_wait_seconds / self.queued_calls * 1000, 1) if self.queued_calls else 0,
+            "max_queue_wait_ms": round(self.max_wait_seconds * 1000, 1)
+        }
+
+
+class GroqGovernor:
+    """Routes every upstream call through its model's gate and retries transient failures"""
+
+    def __init__(self, default_concurrency: int, default_tpm: int, limits: Dict[str, dict]):
+        self.default_concurrency = default_concurrency
+        self.default_tpm = default_tpm
+        self.limits = limits
+        self._gates: Dict[str, ModelGate] = {}
+
+    def gate(self, model: str) -> ModelGate:
+        gate = self._gates.get(model)
+        if gate is None:
+            limits = self.limits.get(model, {})
+            gate = ModelGate(
+                model,
+                int(limits.get("concurrency", self.default_concurrency)),
+                int(limits.get("tpm", self.default_tpm))
+            )
+            self._gates[model] = gate
+        return gate
+
+    def backoff_delay(self, attempt: int, error: Exception) -> float:
+        """Exponential backoff with jitter, never shorter than the server's Retry-After"""
+        delay = min(GROQ_BACKOFF_BASE_SECONDS * (2 ** attempt), GROQ_BACKOFF_MAX_SECONDS)
+        delay *= random.uniform(0.8, 1.2)
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, GROQ_BACKOFF_MAX_SECONDS))
+        return delay
+
+    async def call(
+        self,
+        model: str,
+        work: Callable[[], Awaitable[T]],
+        tokens: int = 0,
+        usage_tokens: Optional[Callable[[T], Optional[int]]] = None
+    ) -> T:
+        """
+        Run work() under the model's budget, retrying 429/5xx/connection errors.
+        usage_tokens(result) may return the real token count to correct the estimate.
+        """
+        gate = self.gate(model)
+        attempt = 0
+        while True:
+            await gate.acquire(tokens, GROQ_MAX_QUEUE_WAIT_SECONDS)
+            correction = 0
+            try:
+                result = await work()
+                if usage_tokens is not None:
+                    actual = usage_tokens(result)
+                    if actual is not None:
+                        correction = actual - tokens
+                return result
+            except Exception as e:
+                if not is_retryable(e) or attempt >= GROQ_MAX_RETRIES:
+                    gate.failures += 1
+                    raise
+                delay = self.backoff_delay(attempt, e)
+                if isinstance(e, RateLimitError) or getattr(e, "status_code", None) == 429:
+                    gate.rate_limited += 1
+                    gate.back_off(delay)
+                gate.retries += 1
+                attempt += 1
+                print(f"Groq {model} call failed ({type(e).__name__}), retry {attempt} in {delay:.1f}s")
+            finally:
+                gate.release(correction)
+            await asyncio.sleep(delay)
+
+    async def acquire_stream(self, model: str, open_stream: Callable[[], Awaitable[T]], tokens: int = 0) -> T:
+        """
+        Open a streaming call under the model's budget. The slot stays taken
+        until release_stream(model) is called when the stream is finished.
+        """
+        gate = self.gate(model)
+        attempt = 0
+        while True:
+            await gate.acquire(tokens, GROQ_MAX_QUEUE_WAIT_SECONDS)
+            try:
+                return await open_stream()
+            except BaseException as e:
+                gate.release()
+                if not isinstance(e, Exception) or not is_retryable(e) or attempt >= GROQ_MAX_RETRIES:
+                    if isinstance(e, Exception):
+                        gate.failures += 1
+                    raise
+                delay = self.backoff_delay(attempt, e)
+                if isinstance(e, RateLimitError) or getattr(e, "status_code", None) == 429:
+                    gate.rate_limited += 1
+                    gate.back_off(delay)
+                gate.retries += 1
+                attempt += 1
+                print(f"Groq {model} stream failed to open ({type(e).__name__}), retry {attempt} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    def release_stream(self, model: str):
+        """Free the slot held by a stream opened with acquire_stream()"""
+        self.gate(model).release()
+
+    def stats(self) -> dict:
+        """Per-model queue depth, in-flight calls, budgets and retry counters"""
+        models = {model: gate.stats() for model, gate in self._gates.items()}
+        return {
+            "max_queue_wait_seconds": GROQ_MAX_QUEUE_WAIT_SECONDS,
+            "max_retries": GROQ_MAX_RETRIES,
+            "total_in_flight": sum(m["in_flight"] for m in models.values()),
+            "total_queue_depth": sum(m["queue_depth"] for m in models.values()),
+            "models": models
+        }
+
+
+def _parse_model_limits(raw: str) -> Dict[str, dict]:
+    if not raw:
+        return {}
+    try:
+        limits = json.loads(raw)
+        return limits if isinstance(limits, dict) else {}
+    except json.JSONDecodeError as e:
+        print(f"⚠️ Ignoring invalid GROQ_MODEL_LIMITS: {e}")
+        return {}
+
+
+# Global governor shared by every Groq call in the process
+governor = GroqGovernor(GROQ_DEFAULT_CONCURRENCY, GROQ_DEFAULT_TPM, _parse_model_limits(GROQ_MODEL_LIMITS))
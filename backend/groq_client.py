@@ -0,0 +1,154 @@
+"""
+Groq API access layer for AI Interviewer
+Shared async client so LLM, speech-to-text and text-to-speech calls never block the event loop
+Every call is admitted through the governor, which owns retries and per-model budgets
+"""
+
+import os
+from typing import Optional, List, Dict, Any, Union, AsyncIterator
+from groq import AsyncGroq
+from dotenv import load_dotenv
+
+from governor import governor, estimate_request_tokens
+
+# Load environment variables
+load_dotenv()
+
+# Default models used across the interview endpoints
+DEFAULT_CHAT_MODEL = "llama-3.3-70b-versatile"
+DEFAULT_STT_MODEL = "whisper-large-v3"
+DEFAULT_TTS_MODEL = "playht-tts"
+
+# Per-call upstream timeouts (the SDK default is 60s, far beyond any interview latency budget)
+GROQ_TIMEOUT_SECONDS = float(os.getenv("GROQ_TIMEOUT_SECONDS", "20"))
+GROQ_STT_TIMEOUT_SECONDS = float(os.getenv("GROQ_STT_TIMEOUT_SECONDS", "30"))
+
+# Global async client, shared by every request so the underlying
+# httpx connection pool is reused instead of re-created per call
+client: Optional[AsyncGroq] = None
+
+
+# ============== CLIENT LIFECYCLE ==============
+
+def init_groq_client(api_key: Optional[str] = None) -> AsyncGroq:
+    """Create the shared AsyncGroq client (retries are left to the governor)"""
+    global client
+    client = AsyncGroq(api_key=api_key or os.getenv("GROQ_API_KEY"), max_retries=0)
+    return client
+
+
+def get_groq_client() -> AsyncGroq:
+    """Get the shared AsyncGroq client, creating it on first use"""
+    global client
+    if client is None:
+        init_groq_client()
+    return client
+
+
+async def close_groq_client():
+    """Close the shared client and its connection pool"""
+    global client
+    if client is not None:
+        await client.close()
+        client = None
+        print("🔌 Groq client closed")
+
+
+# ============== CHAT COMPLETIONS ==============
+
+async def chat_completion(
+    messages: List[Dict[str, Any]],
+    model: str = DEFAULT_CHAT_MODEL,
+    temperature: float = 0.7,
+    max_tokens: int = 200,
+    timeout: float = GROQ_TIMEOUT_SECONDS
+) -> str:
+    """Run a chat completion and return the assistant message text"""
+    completion = await governor.call(
+        model,
+        lambda: get_groq_client().chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=timeout
+        ),
+        tokens=estimate_request_tokens(messages, max_tokens),
+        usage_tokens=lambda c: c.usage.total_tokens if getattr(c, "usage", None) else None
+    )
+    return completion.choices[0].message.content
+
+
+async def stream_chat_completion(
+    messages: List[Dict[str, Any]],
+    model: str = DEFAULT_CHAT_MODEL,
+    temperature: float = 0.7,
+    max_tokens: int = 200,
+    timeout: float = GROQ_TIMEOUT_SECONDS
+) -> AsyncIterator[str]:
+    """Run a streaming chat completion, yielding text deltas as they arrive"""
+    stream = await governor.acquire_stream(
+        model,
+        lambda: get_groq_client().chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            timeout=timeout
+        ),
+        tokens=estimate_request_tokens(messages, max_tokens)
+    )
+    try:
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    finally:
+        governor.release_stream(model)
+        await stream.close()
+
+
+# ============== SPEECH TO TEXT ==============
+
+async def transcribe_audio(
+    file: Union[tuple, bytes],
+    model: str = DEFAULT_STT_MODEL,
+    language: Optional[str] = None,
+    temperature: Optional[float] = None,
+    timeout: float = GROQ_STT_TIMEOUT_SECONDS
+) -> str:
+    """Transcribe audio with Whisper and return the plain text"""
+    kwargs = {"file": file, "model": model, "response_format": "json", "timeout": timeout}
+    if language:
+        kwargs["language"] = language
+    if temperature is not None:
+        kwargs["temperature"] = temperature
+
+    transcription = await governor.call(
+        model,
+        lambda: get_groq_client().audio.transcriptions.create(**kwargs)
+    )
+    return transcription.text.strip()
+
+
+# ============== TEXT TO SPEECH ==============
+
+async def synthesize_speech(
+    text: str,
+    voice: str,
+    model: str = DEFAULT_TTS_MODEL,
+    response_format: str = "wav",
+    timeout: float = GROQ_TIMEOUT_SECONDS
+) -> bytes:
+    """Synthesize speech with Groq TTS and return the raw audio bytes"""
+    async def synthesize() -> bytes:
+        response = await get_groq_client().audio.speech.create(
+            model=model,
+            voice=voice,
+            input=text,
+            response_format=response_format,
+            timeout=timeout
+        )
+        return await response.read()
+
+    return await governor.call(model, synthesize)
@@ -0,0 +1,308 @@
+"""
+Incremental answer transcription for AI Interviewer
+Audio arrives in chunks while the candidate speaks; finished VAD segments are transcribed in the background
+"""
+
+import os
+import time
+import socket
+import asyncio
+from typing import Optional, Dict, List, Tuple, Callable, Awaitable
+from dotenv import load_dotenv
+from fastapi import HTTPException
+
+from audio_preprocess import (
+    normalization_available, run_in_audio_pool, PcmStreamDecoder,
+    find_pause_cuts, quietest_cut, has_speech, pcm_to_wav, BYTES_PER_SECOND
+)
+from model_router import routed_transcribe
+
+# Load environment variables
+load_dotenv()
+
+# A pause this long ends a segment that can be transcribed on its own
+CHUNKED_SEGMENT_PAUSE_MS = int(os.getenv("CHUNKED_SEGMENT_PAUSE_MS", "600"))
+# Segments shorter than this are merged into the next one (tiny clips transcribe poorly)
+CHUNKED_MIN_SEGMENT_SECONDS = float(os.getenv("CHUNKED_MIN_SEGMENT_SECONDS", "2"))
+# Speech with no usable pause is cut at its quietest frame before it grows past this, so each
+# chunk only rescans a bounded amount of audio (and Whisper's window is 30 s anyway)
+CHUNKED_MAX_SEGMENT_SECONDS = float(os.getenv("CHUNKED_MAX_SEGMENT_SECONDS", "30"))
+# Answers with no new chunk for this long are dropped
+CHUNKED_ANSWER_TTL_SECONDS = int(os.getenv("CHUNKED_ANSWER_TTL_SECONDS", "300"))
+
+# The chunks of one answer must reach the worker that received seq=0 (session-affinity routing).
+# Sessions record that worker, so a misrouted chunk is reported as such instead of as a lost answer.
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# Process-wide totals, exposed through /metrics
+chunked_metrics = {
+    "answers": 0,
+    "finished": 0,
+    "chunks": 0,
+    "background_segments": 0,
+    "segment_failures": 0,
+    "misrouted_chunks": 0,
+    "whole_answer_fallbacks": 0,
+    "final_wait_ms_total": 0.0
+}
+
+
+# ============== WORKER SIDE (runs in the audio pool) ==============
+
+def split_new_segments(
+    pending: bytes,
+    pause_ms: int,
+    min_seconds: float,
+    max_seconds: float = CHUNKED_MAX_SEGMENT_SECONDS
+) -> Tuple[List[Tuple[bytes, float]], int]:
+    """
+    Cut decoded PCM that has not been transcribed yet at pauses, and at the
+    quietest frame of any stretch that would otherwise exceed max_seconds.
+    Returns ([(wav, seconds), ...], bytes of `pending` used up).
+    """
+    min_bytes = int(min_seconds * BYTES_PER_SECOND)
+    max_bytes = max(min_bytes + 2, int(max_seconds * BYTES_PER_SECOND))
+
+    cuts = []
+    start = 0
+    for cut in find_pause_cuts(pending, pause_ms) + [len(pending)]:
+        while cut - start > max_bytes:
+            window_start = start + min_bytes
+            forced = window_start + quietest_cut(pending[window_start:start + max_bytes])
+            # Whole samples, and always forward
+            forced = max(start + 2, forced - forced % 2)
+            cuts.append(forced)
+            start = forced
+        if cut < len(pending) and cut - start >= min_bytes:
+            cuts.append(cut)
+            start = cut
+
+    segments = []
+    start = 0
+    for cut in cuts:
+        piece = pending[start:cut]
+        if has_speech(piece):
+            segments.append((pcm_to_wav(piece), len(piece) / BYTES_PER_SECOND))
+        start = cut
+    return segments, start
+
+
+def tail_segment(tail: bytes) -> Optional[Tuple[bytes, float]]:
+    """The not-yet-transcribed end of the answer, or None when it is silence"""
+    if not tail or not has_speech(tail):
+        return None
+    return pcm_to_wav(tail), len(tail) / BYTES_PER_SECOND
+
+
+# ============== EVENT LOOP SIDE ==============
+
+class ChunkedAnswer:
+    """One answer being uploaded in chunks, with its background segment transcriptions"""
+
+    def __init__(self, session_id: str, language: Optional[str], standalone: bool):
+        self.session_id = session_id
+        self.language = language
+        # standalone: every chunk is a complete audio file (client restarts its recorder per chunk)
+        self.standalone = standalone
+        self.buffer = bytearray()
+        self.next_seq = 0
+        # Decodes the chunks as they arrive; its pcm holds what no segment has taken yet
+        self.decoder: Optional[PcmStreamDecoder] = None
+        self.decode_failed = False
+        self.segments: List[asyncio.Task] = []
+        self.lock = asyncio.Lock()
+        self.updated_at = time.time()
+
+    def cancel(self):
+        for task in self.segments:
+            task.cancel()
+        if self.decoder is not None:
+            self.decoder.kill()
+
+    async def _decode(self, seq: int, data: bytes):
+        """Feed a chunk to the decoder and queue the segments it completes"""
+        if self.decode_failed:
+            return
+        try:
+            if self.decoder is None:
+                self.decoder = await PcmStreamDecoder.start()
+            await self.decoder.feed(data)
+            segments = []
+            if len(self.decoder.pcm) >= CHUNKED_MIN_SEGMENT_SECONDS * BYTES_PER_SECOND:
+                segments, used = await run_in_audio_pool(
+                    split_new_segments, bytes(self.decoder.pcm),
+                    CHUNKED_SEGMENT_PAUSE_MS, CHUNKED_MIN_SEGMENT_SECONDS
+                )
+                del self.decoder.pcm[:used]
+        except Exception as e:
+            # Not decodable as a stream; the final chunk falls back to transcribing the whole answer
+            print(f"Chunked answer decode failed at seq {seq}: {e}")
+            self.decode_failed = True
+            if self.decoder is not None:
+                self.decoder.kill()
+            return
+        for index, (wav, seconds) in enumerate(segments):
+            self._schedule(f"segment_{seq}_{index}.wav", wav, seconds)
+
+    def _schedule(self, filename: str, audio: bytes, seconds: Optional[float]):
+        self.segments.append(asyncio.create_task(routed_transcribe(
+            "chunk.stt",
+            file=(filename, audio),
+            audio_bytes=len(audio),
+            audio_seconds=seconds,
+            language=self.language,
+            temperature=0.0
+        )))
+        chunked_metrics["background_segments"] += 1
+
+    def progress(self) -> dict:
+        return {
+            "received_bytes": len(self.buffer),
+            "next_seq": self.next_seq,
+            "segments_queued": len(self.segments),
+            "segments_done": sum(1 for t in self.segments if t.done())
+        }
+
+
+# In-flight chunked answers by session (process-local, see WORKER_ID)
+chunked_answers: Dict[str, ChunkedAnswer] = {}
+
+
+def _purge_stale():
+    now = time.time()
+    for session_id in [sid for sid, a in chunked_answers.items() if now - a.updated_at > CHUNKED_ANSWER_TTL_SECONDS]:
+        chunked_answers.pop(session_id).cancel()
+
+
+def get_chunked_answer(
+    session_id: str,
+    seq: int,
+    language: Optional[str],
+    standalone: bool,
+    worker: Optional[str] = None
+) -> ChunkedAnswer:
+    """
+    The answer this chunk belongs to; seq 0 always starts a new answer.
+    `worker` is the WORKER_ID the session recorded for its chunked uploads:
+    a later chunk for an answer another worker holds is refused with 421.
+    """
+    _purge_stale()
+    answer = chunked_answers.get(session_id)
+    if seq == 0 and (answer is None or answer.next_seq > 0):
+        if answer is not None:
+            answer.cancel()
+        answer = ChunkedAnswer(session_id, language, standalone)
+        chunked_answers[session_id] = answer
+        chunked_metrics["answers"] += 1
+    if answer is None and worker and worker != WORKER_ID:
+        chunked_metrics["misrouted_chunks"] += 1
+        raise HTTPException(
+            status_code=421,
+            detail=f"This answer's chunks go to worker {worker}; route a session's requests to one worker, or resend from seq=0"
+        )
+    if answer is None:
+        raise HTTPException(status_code=409, detail="No answer in progress; send seq=0 first")
+    return answer
+
+
+async def add_chunk(answer: ChunkedAnswer, seq: int, data: bytes, max_bytes: int) -> bool:
+    """
+    Append a chunk and queue any newly completed segments for transcription.
+    Returns False for a duplicate (already received) chunk.
+    """
+    async with answer.lock:
+        if seq < answer.next_seq:
+            return False
+        if seq > answer.next_seq:
+            raise HTTPException(status_code=409, detail=f"Missing chunk {answer.next_seq}")
+        if len(answer.buffer) + len(data) > max_bytes:
+            raise HTTPException(status_code=413, detail="Answer audio exceeds the upload limit")
+
+        answer.next_seq += 1
+        answer.updated_at = time.time()
+        chunked_metrics["chunks"] += 1
+        if not data:
+            return True
+        answer.buffer.extend(data)
+
+        if answer.standalone:
+            answer._schedule(f"chunk_{seq}.webm", data, None)
+        elif normalization_available():
+            await answer._decode(seq, data)
+        return True
+
+
+async def finish_answer(
+    answer: ChunkedAnswer,
+    transcribe_whole: Callable[[bytes], Awaitable[Tuple[str, dict]]]
+) -> Tuple[str, dict]:
+    """
+    Transcribe whatever is left after the last background segment, then join
+    all segments in order. Falls back to transcribing the whole buffer when
+    the audio could not be segmented or a segment failed.
+    """
+    started = time.monotonic()
+    if chunked_answers.get(answer.session_id) is answer:
+        del chunked_answers[answer.session_id]
+    async with answer.lock:
+        done_before_final = sum(1 for t in answer.segments if t.done())
+        mode = "standalone" if answer.standalone else "segments"
+        tail_seconds = 0.0
+
+        if not answer.standalone and normalization_available() and answer.buffer:
+            try:
+                if answer.decode_failed or answer.decoder is None:
+                    raise RuntimeError("stream was not decodable")
+                await answer.decoder.finish()
+                tail = await run_in_audio_pool(tail_segment, bytes(answer.decoder.pcm))
+                if tail is not None:
+                    answer._schedule("segment_tail.wav", tail[0], tail[1])
+                    tail_seconds = tail[1]
+            except Exception as e:
+                print(f"Chunked answer tail decode failed: {e}")
+                answer.cancel()
+                answer.segments = []
+
+        results = await asyncio.gather(*answer.segments, return_exceptions=True)
+        failed = [r for r in results if isinstance(r, BaseException)]
+        segmented = (answer.standalone or normalization_available()) and answer.segments and not failed
+
+        if failed:
+            chunked_metrics["segment_failures"] += len(failed)
+            if answer.standalone:
+                # Concatenated standalone files are not one valid file, so there is nothing to fall back to
+                raise failed[0]
+
+        if segmented:
+            text = " ".join(r[0] for r in results if r[0]).strip()
+            served = [r[1] for r in results]
+        else:
+            if not answer.buffer:
+                raise HTTPException(status_code=400, detail="Empty audio upload")
+            chunked_metrics["whole_answer_fallbacks"] += 1
+            mode = "whole"
+            text, whole_served = await transcribe_whole(bytes(answer.buffer))
+            served = [whole_served]
+
+    final_wait_ms = round((time.monotonic() - started) * 1000, 1)
+    chunked_metrics["finished"] += 1
+    chunked_metrics["final_wait_ms_total"] += final_wait_ms
+    return text, {
+        "mode": mode,
+        "chunks": answer.next_seq,
+        "segments": len(served),
+        "segments_done_before_final": done_before_final,
+        "tail_seconds": round(tail_seconds, 2),
+        "final_wait_ms": final_wait_ms,
+        "segment_served_by": served
+    }
+
+
+def chunked_metrics_report() -> dict:
+    """Process-wide chunked-upload counters"""
+    finished = chunked_metrics["finished"]
+    return {
+        **chunked_metrics,
+        "in_progress": len(chunked_answers),
+        "avg_final_wait_ms": round(chunked_metrics["final_wait_ms_total"] / finished, 1) if finished else 0
+    }
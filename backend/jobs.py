@@ -0,0 +1,144 @@
+"""
+In-process background jobs for AI Interviewer
+Heavy endpoints enqueue their work here and return 202; clients poll /jobs/{id} for the result
+"""
+
+import os
+import time
+import uuid
+import asyncio
+from typing import Optional, Dict, Callable, Awaitable, Any
+from dotenv import load_dotenv
+from fastapi import HTTPException
+
+# Load environment variables
+load_dotenv()
+
+# How many jobs may run at once; the rest wait in FIFO order
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+# How long finished jobs (and their results) are kept for polling/reconnects
+JOB_RESULT_TTL_SECONDS = int(os.getenv("JOB_RESULT_TTL_SECONDS", "900"))
+
+
+class JobManager:
+    """Bounded-concurrency job runner with a TTL'd result store"""
+
+    def __init__(self, workers: int, result_ttl_seconds: int):
+        self.result_ttl_seconds = result_ttl_seconds
+        self._jobs: Dict[str, dict] = {}
+        self._by_key: Dict[str, str] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._workers = workers
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _purge_expired(self):
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job["finished_at"] and now - job["finished_at"] > self.result_ttl_seconds
+        ]
+        for job_id in expired:
+            job = self._jobs.pop(job_id)
+            if job["key"] and self._by_key.get(job["key"]) == job_id:
+                del self._by_key[job["key"]]
+
+    async def _run(self, job_id: str, work: Callable[[], Awaitable[Any]]):
+        job = self._jobs[job_id]
+        try:
+            async with self._slots:
+                job["status"] = "running"
+                job["started_at"] = time.time()
+                job["result"] = await work()
+                job["status"] = "succeeded"
+        except HTTPException as e:
+            job["status"] = "failed"
+            job["error"] = {"status_code": e.status_code, "detail": e.detail}
+        except asyncio.CancelledError:
+            job["status"] = "cancelled"
+            raise
+        except Exception as e:
+            print(f"Job {job['kind']} {job_id} failed: {e}")
+            job["status"] = "failed"
+            job["error"] = {"status_code": 500, "detail": str(e)}
+        finally:
+            job["finished_at"] = time.time()
+            self._tasks.pop(job_id, None)
+
+    def submit(self, kind: str, work: Callable[[], Awaitable[Any]], key: Optional[str] = None) -> dict:
+        """
+        Enqueue work and return its job record. If a job with the same key is
+        still queued/running or has a retained result, that job is returned
+        instead, so retries never re-run the model call.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._workers)
+
+        existing = self.find(key) if key else None
+        if existing:
+            return existing
+
+        job_id = str(uuid.uuid4())
+        job = {
+            "job_id": job_id,
+            "kind": kind,
+            "key": key,
+            "status": "queued",
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None
+        }
+        self._jobs[job_id] = job
+        if key:
+            self._by_key[key] = job_id
+        self._tasks[job_id] = asyncio.create_task(self._run(job_id, work))
+        return job
+
+    def find(self, key: str) -> Optional[dict]:
+        """The job submit() would return for this key (queued, running or succeeded), if any"""
+        self._purge_expired()
+        existing = self._jobs.get(self._by_key.get(key, ""))
+        if existing and existing["status"] not in ("failed", "cancelled"):
+            return existing
+        return None
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Look up a job (None once its result has expired)"""
+        self._purge_expired()
+        return self._jobs.get(job_id)
+
+    def stats(self) -> dict:
+        """Queue depth and status counts"""
+        counts: Dict[str, int] = {}
+        for job in self._jobs.values():
+            counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return {
+            "workers": self._workers,
+            "queued": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            "retained": len(self._jobs),
+            "by_status": counts
+        }
+
+
+def job_view(job: dict) -> dict:
+    """Public representation of a job record"""
+    view = {
+        "job_id": job["job_id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "status_url": f"/jobs/{job['job_id']}",
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"]
+    }
+    if job["status"] == "succeeded":
+        view["result"] = job["result"]
+    elif job["error"]:
+        view["error"] = job["error"]
+    return view
+
+
+# Global job manager shared by all endpoints
+job_manager = JobManager(JOB_WORKERS, JOB_RESULT_TTL_SECONDS)
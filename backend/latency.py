@@ -0,0 +1,307 @@
+"""
+Latency budgets and fast-fallback routing for AI Interviewer
+Each route gets a latency budget; when the primary model runs over it or errors, a faster model is hedged in
+"""
+
+import os
+import json
+import time
+import asyncio
+from collections import deque
+from typing import Optional, Dict, Any, Callable, Awaitable, TypeVar, Tuple, List, Union, AsyncIterator
+from dotenv import load_dotenv
+
+from groq_client import chat_completion, stream_chat_completion, transcribe_audio, DEFAULT_CHAT_MODEL, DEFAULT_STT_MODEL
+
+# Load environment variables
+load_dotenv()
+
+# Faster models used when the primary runs over budget or fails
+FALLBACK_CHAT_MODEL = os.getenv("FALLBACK_CHAT_MODEL", "llama-3.1-8b-instant")
+FALLBACK_STT_MODEL = os.getenv("FALLBACK_STT_MODEL", "whisper-large-v3-turbo")
+# Fraction of the budget the primary gets on its own before the fallback is started alongside it
+HEDGE_AFTER_FRACTION = float(os.getenv("HEDGE_AFTER_FRACTION", "0.7"))
+# Latency samples kept per route for percentiles
+LATENCY_SAMPLE_SIZE = int(os.getenv("LATENCY_SAMPLE_SIZE", "500"))
+
+# Per-route latency budgets in milliseconds; override with LATENCY_BUDGETS_MS='{"analyze.llm": 4000}'
+DEFAULT_LATENCY_BUDGETS_MS = {
+    "analyze.stt": 4000,
+    "analyze.llm": 5000,
+    "stream.stt": 4000,
+    # Streamed replies are budgeted to their first token
+    "stream.llm": 2500,
+    "video.stt": 3000,
+    "video.llm": 5000,
+    "resume.parse": 12000,
+    "job.analyze": 8000,
+    "feedback": 10000,
+    "coaching": 6000,
+    "summary": 15000,
+    "tts": 5000
+}
+
+T = TypeVar("T")
+
+
+def _load_budgets() -> Dict[str, int]:
+    budgets = dict(DEFAULT_LATENCY_BUDGETS_MS)
+    raw = os.getenv("LATENCY_BUDGETS_MS", "")
+    if raw:
+        try:
+            budgets.update({k: int(v) for k, v in json.loads(raw).items()})
+        except (json.JSONDecodeError, AttributeError, ValueError) as e:
+            print(f"⚠️ Ignoring invalid LATENCY_BUDGETS_MS: {e}")
+    return budgets
+
+
+LATENCY_BUDGETS_MS = _load_budgets()
+
+
+class RouteStats:
+    """Latency samples and serving-path counters for one route"""
+
+    def __init__(self, budget_ms: int):
+        self.budget_ms = budget_ms
+        self.samples: deque = deque(maxlen=LATENCY_SAMPLE_SIZE)
+        self.requests = 0
+        self.over_budget = 0
+        self.failures = 0
+        self.paths: Dict[str, int] = {}
+        self.served_by: Dict[str, int] = {}
+
+    def record(self, served: dict):
+        self.requests += 1
+        self.samples.append(served["latency_ms"])
+        if served["over_budget"]:
+            self.over_budget += 1
+        self.paths[served["path"]] = self.paths.get(served["path"], 0) + 1
+        self.served_by[served["served_by"]] = self.served_by.get(served["served_by"], 0) + 1
+
+    def report(self) -> dict:
+        ordered = sorted(self.samples)
+
+        def percentile(p: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+        return {
+            "budget_ms": self.budget_ms,
+            "requests": self.requests,
+            "failures": self.failures,
+            "over_budget": self.over_budget,
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "paths": self.paths,
+            "served_by": self.served_by
+        }
+
+
+# Process-wide per-route stats, exposed through /metrics
+route_stats: Dict[str, RouteStats] = {}
+
+
+def _stats_for(route: str) -> RouteStats:
+    stats = route_stats.get(route)
+    if stats is None:
+        stats = RouteStats(budget_for(route))
+        route_stats[route] = stats
+    return stats
+
+
+def budget_for(route: str) -> int:
+    """Latency budget (ms) for a route"""
+    return LATENCY_BUDGETS_MS.get(route, 8000)
+
+
+async def run_with_fallback(
+    route: str,
+    primary: Callable[[], Awaitable[T]],
+    primary_label: str,
+    fallback: Optional[Callable[[], Awaitable[T]]] = None,
+    fallback_label: Optional[str] = None,
+    discard: Optional[Callable[[T], Awaitable[None]]] = None
+) -> Tuple[T, dict]:
+    """
+    Run primary() under the route's latency budget. If it errors, fallback()
+    runs immediately; if it is still running after HEDGE_AFTER_FRACTION of the
+    budget, fallback() is started alongside it and the first success wins.
+    A losing call that had succeeded too is passed to discard() (results
+    that hold resources, like open streams). Returns (result, served) where
+    served records which path answered.
+    """
+    stats = _stats_for(route)
+    started = time.monotonic()
+    hedge_after = stats.budget_ms / 1000 * HEDGE_AFTER_FRACTION
+
+    primary_task = asyncio.ensure_future(primary())
+    fallback_task: Optional[asyncio.Future] = None
+    path = "primary"
+    primary_error: Optional[BaseException] = None
+    try:
+        if fallback is None:
+            result = await primary_task
+            label = primary_label
+        else:
+            done, _ = await asyncio.wait({primary_task}, timeout=hedge_after)
+            if done and not primary_task.exception():
+                result, label = primary_task.result(), primary_label
+            else:
+                if done:
+                    primary_error = primary_task.exception()
+                    print(f"{route}: {primary_label} failed ({primary_error}), falling back to {fallback_label}")
+                    path = "fallback"
+                else:
+                    path = "hedge"
+                fallback_task = asyncio.ensure_future(fallback())
+                pending = {fallback_task} if done else {primary_task, fallback_task}
+                result, label = None, None
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if task.exception() is not None:
+                            if task is primary_task:
+                                primary_error = task.exception()
+                        elif label is None:
+                            result = task.result()
+                            label = primary_label if task is primary_task else fallback_label
+                        elif discard is not None:
+                            # Both finished in the same round; the loser's result is never used
+                            try:
+                                await discard(task.result())
+                            except Exception as e:
+                                print(f"{route}: could not release the losing result: {e}")
+                    if label is not None:
+                        break
+                if label is None:
+                    raise primary_error or fallback_task.exception()
+                if label == primary_label and path == "hedge":
+                    # The hedge was launched but the primary still answered first
+                    path = "primary_after_hedge"
+    except BaseException:
+        stats.failures += 1
+        raise
+    finally:
+        for task in (primary_task, fallback_task):
+            if task is not None and not task.done():
+                task.cancel()
+
+    latency_ms = round((time.monotonic() - started) * 1000, 1)
+    served = {
+        "route": route,
+        "served_by": label,
+        "path": path,
+        "latency_ms": latency_ms,
+        "budget_ms": stats.budget_ms,
+        "over_budget": latency_ms > stats.budget_ms
+    }
+    stats.record(served)
+    return result, served
+
+
+async def resilient_chat(
+    route: str,
+    messages: List[Dict[str, Any]],
+    model: str = DEFAULT_CHAT_MODEL,
+    temperature: float = 0.7,
+    max_tokens: int = 200,
+    fallback_model: Optional[str] = FALLBACK_CHAT_MODEL
+) -> Tuple[str, dict]:
+    """Chat completion with a latency budget and fast-model fallback; returns (text, served)"""
+    fallback = None
+    if fallback_model and fallback_model != model:
+        fallback = lambda: chat_completion(
+            model=fallback_model, messages=messages, temperature=temperature, max_tokens=max_tokens
+        )
+    return await run_with_fallback(
+        route,
+        lambda: chat_completion(model=model, messages=messages, temperature=temperature, max_tokens=max_tokens),
+        model,
+        fallback,
+        fallback_model
+    )
+
+
+async def _first_token(stream: AsyncIterator[str]) -> Tuple[AsyncIterator[str], str]:
+    """Start a stream and wait for its first token ("" if it ends without one)"""
+    try:
+        token = await stream.__anext__()
+    except StopAsyncIteration:
+        token = ""
+    return stream, token
+
+
+async def _resume(stream: AsyncIterator[str], first: str) -> AsyncIterator[str]:
+    """The first token again, then the rest of the stream"""
+    try:
+        if first:
+            yield first
+        async for token in stream:
+            yield token
+    finally:
+        await stream.aclose()
+
+
+async def _close_opened(opened: Tuple[AsyncIterator[str], str]):
+    """Close a stream opened by _first_token that lost the race"""
+    await opened[0].aclose()
+
+
+async def resilient_chat_stream(
+    route: str,
+    messages: List[Dict[str, Any]],
+    model: str = DEFAULT_CHAT_MODEL,
+    temperature: float = 0.7,
+    max_tokens: int = 200,
+    fallback_model: Optional[str] = FALLBACK_CHAT_MODEL
+) -> Tuple[AsyncIterator[str], dict]:
+    """
+    Streaming chat completion with the same budget and fallback as
+    resilient_chat, applied to the first token: once a model has produced
+    one, its stream is kept and the other is closed. Returns (tokens, served);
+    served latency is the time to the first token.
+    """
+    def open_stream(name: str) -> Callable[[], Awaitable[Tuple[AsyncIterator[str], str]]]:
+        return lambda: _first_token(stream_chat_completion(
+            model=name, messages=messages, temperature=temperature, max_tokens=max_tokens
+        ))
+
+    fallback = None
+    if fallback_model and fallback_model != model:
+        fallback = open_stream(fallback_model)
+    (stream, first), served = await run_with_fallback(
+        route, open_stream(model), model, fallback, fallback_model, discard=_close_opened
+    )
+    return _resume(stream, first), served
+
+
+async def resilient_transcribe(
+    route: str,
+    file: Union[tuple, bytes],
+    model: str = DEFAULT_STT_MODEL,
+    language: Optional[str] = None,
+    temperature: Optional[float] = None,
+    fallback_model: Optional[str] = FALLBACK_STT_MODEL
+) -> Tuple[str, dict]:
+    """Whisper transcription with a latency budget and turbo fallback; returns (text, served)"""
+    fallback = None
+    if fallback_model and fallback_model != model:
+        fallback = lambda: transcribe_audio(file=file, model=fallback_model, language=language, temperature=temperature)
+    return await run_with_fallback(
+        route,
+        lambda: transcribe_audio(file=file, model=model, language=language, temperature=temperature),
+        model,
+        fallback,
+        fallback_model
+    )
+
+
+def latency_metrics_report() -> dict:
+    """Per-route latency percentiles and which model/path served requests"""
+    return {
+        "hedge_after_fraction": HEDGE_AFTER_FRACTION,
+        "fallback_chat_model": FALLBACK_CHAT_MODEL,
+        "fallback_stt_model": FALLBACK_STT_MODEL,
+        "routes": {route: stats.report() for route, stats in route_stats.items()}
+    }
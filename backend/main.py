@@ -7,21 +7,21 @@ import os
 import uuid
 import io
 import re
+import json
 import time
 import asyncio
+import hashlib
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple, Annotated
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Depends, Request, status
+from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Header, Query, Depends, Request, status, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import StreamingResponse, JSONResponse, Response
 from fastapi.security import OAuth2PasswordRequestForm
-from pydantic import BaseModel
-from groq import Groq
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, Field, ValidationError
 from dotenv import load_dotenv
-import shutil
-import edge_tts
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
@@ -35,6 +35,39 @@ from database import (
     get_user_interviews as db_get_user_interviews, delete_interview as db_delete_interview,
     save_interview_to_user, get_user_stats as db_get_user_stats, add_transcript_message
 )
+from groq_client import (
+    init_groq_client, close_groq_client,
+    synthesize_speech
+)
+from streaming import sse_event, ScoreTagFilter, SentenceChunker
+from speech import (
+    synthesize_edge_tts, stream_edge_tts, InsufficientAudioError,
+    DEFAULT_EDGE_VOICE, EDGE_VOICES, EDGE_VOICE_IDS, MIN_AUDIO_BYTES
+)
+from tts_cache import tts_cache, tts_cache_key
+from context_window import (
+    build_prompt_messages, record_prompt_stats, needs_summary, fold_history,
+    context_report, context_metrics_report
+)
+from jobs import job_manager, job_view
+from governor import governor
+from latency import run_with_fallback, latency_metrics_report
+from model_router import routed_chat, routed_chat_stream, routed_transcribe, routing_metrics_report
+from audio_preprocess import normalize_for_stt, normalize_metrics_report, shutdown_audio_pool
+from incremental_stt import get_chunked_answer, add_chunk, finish_answer, chunked_metrics_report, WORKER_ID
+from session_store import session_store, session_store_report, SessionNotFoundError
+from session_state import (
+    InterviewState, EXPRESSION_VALUE_MIN, EXPRESSION_VALUE_MAX, EXPRESSION_TIMESTAMP_MAX_MS, EXPRESSION_LABEL_MAX_LENGTH
+)
+from session_janitor import start_janitor, stop_janitor, janitor_report
+from session_snapshot import start_snapshots, stop_snapshots, snapshot_report
+from turn_guard import session_locks, idempotency_cache, request_fingerprint, turn_guard_report
+from expression_timeline import live_timeline, load_timeline, persist_timeline, timeline_report
+from session_watch import watch, session_cursor, watch_report
+from assessment import (
+    needs_assessment_update, update_assessment,
+    assessment_evidence, ASSESSMENT_MERGE_MODEL
+)
 from auth import (
     UserCreate, UserResponse, UserLogin, Token, PasswordChange, UserUpdate,
     create_user, authenticate_user,
@@ -57,9 +90,16 @@ async def lifespan(app: FastAPI):
     """Application lifecycle - startup and shutdown"""
     # Startup
     await init_db()
+    start_snapshots()
+    start_janitor()
     print("🚀 AI Interviewer API started!")
     yield
     # Shutdown
+    await stop_janitor()
+    await stop_snapshots()
+    await close_groq_client()
+    await session_store.close()
+    shutdown_audio_pool()
     await close_mongo_connection()
     print("👋 AI Interviewer API shutdown complete")
 
@@ -80,7 +120,7 @@ GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 if not GROQ_API_KEY:
     raise ValueError("GROQ_API_KEY not found in environment variables!")
 
-client = Groq(api_key=GROQ_API_KEY)
+init_groq_client(GROQ_API_KEY)
 
 app.add_middleware(
     CORSMiddleware,
@@ -101,8 +141,68 @@ async def health_check():
         "database": "mongodb"
     }
 
-# Store active interview sessions (in production, use Redis)
-interview_sessions = {}
+# Metrics endpoint
+@app.get("/metrics")
+async def get_metrics():
+    """Operational counters for capacity planning"""
+    return {
+        "tts_cache": tts_cache.stats(),
+        "context": context_metrics_report(),
+        "jobs": job_manager.stats(),
+        "groq": governor.stats(),
+        "latency": latency_metrics_report(),
+        "routing": routing_metrics_report(),
+        "audio_normalization": normalize_metrics_report(),
+        "chunked_answers": chunked_metrics_report(),
+        "session_store": await session_store_report(),
+        "session_janitor": janitor_report(),
+        "session_snapshots": snapshot_report(),
+        "turn_guard": turn_guard_report(),
+        "expression_timeline": timeline_report(),
+        "session_watch": watch_report()
+    }
+
+# ============== BACKGROUND JOBS ==============
+
+def accepted_job(kind: str, work, key: Optional[str] = None) -> JSONResponse:
+    """Enqueue work as a background job and answer 202 with its status URL"""
+    job = job_manager.submit(kind, work, key=key)
+    return JSONResponse(status_code=202, content=jsonable_encoder(job_view(job)))
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Poll a background job; the result is included once it has succeeded"""
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job_view(job)
+
+
+# Strong references to fire-and-forget tasks so they are not garbage collected mid-run
+background_tasks = set()
+
+
+def spawn_background(coro) -> asyncio.Task:
+    """Run a coroutine in the background, logging (not raising) its failure"""
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    
+    def _done(t: asyncio.Task):
+        background_tasks.discard(t)
+        if not t.cancelled() and t.exception():
+            print(f"Background task failed: {t.exception()}")
+    
+    task.add_done_callback(_done)
+    return task
+
+
+async def load_session(session_id: str, detail: str = "Session not found") -> dict:
+    """Fetch an active session from the session store or answer 404"""
+    session = await session_store.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=detail)
+    return session
 
 # Language code mapping for Whisper and TTS
 LANGUAGE_CODES = {
@@ -373,6 +473,7 @@ class InterviewSession(BaseModel):
     duration_minutes: int = 30
     mode: str = "audio"  # 'audio' | 'video'
     language: str = "en-US"  # Interview language code
+    voice: str = DEFAULT_EDGE_VOICE  # Edge TTS voice for the pre-synthesized opening (one of /tts/voices)
 
 
 class Message(BaseModel):
@@ -387,20 +488,68 @@ class TextToSpeechRequest(BaseModel):
 class EdgeTTSRequest(BaseModel):
     text: str
     voice: str = "en-US-AriaNeural"  # Default to natural female voice
+    stream: bool = False  # Forward MP3 frames as they are synthesized
 
 
 class ResumeParseRequest(BaseModel):
     text: str
 
 
+# The bounds ExpressionSeries enforces, checked while the request is parsed (422 instead of a failed write)
+ExpressionValue = Annotated[float, Field(ge=EXPRESSION_VALUE_MIN, le=EXPRESSION_VALUE_MAX)]
+ExpressionLabel = Annotated[str, Field(max_length=EXPRESSION_LABEL_MAX_LENGTH)]
+ExpressionTimestamp = Annotated[int, Field(ge=0, le=EXPRESSION_TIMESTAMP_MAX_MS)]
+
+
 class ExpressionData(BaseModel):
-    """Expression data captured from video interview"""
-    confidence: float = 0
-    eyeContact: float = 0
-    emotion: str = "neutral"
-    engagement: float = 0
-    posture: str = "unknown"
-    timestamp: Optional[int] = None
+    """Expression data captured from video interview (metrics are percentages, timestamp epoch ms)"""
+    confidence: ExpressionValue = 0
+    eyeContact: ExpressionValue = 0
+    emotion: ExpressionLabel = "neutral"
+    engagement: ExpressionValue = 0
+    posture: ExpressionLabel = "unknown"
+    timestamp: Optional[ExpressionTimestamp] = None
+
+
+class ExpressionBatch(BaseModel):
+    """
+    Several expression samples in one request: either `samples` (a list of
+    ExpressionData) or the same fields as parallel columns, which is far
+    smaller on the wire and skips a model per sample. Omitted columns take
+    ExpressionData's defaults.
+    """
+    samples: List[ExpressionData] = []
+    confidence: List[ExpressionValue] = []
+    eyeContact: List[ExpressionValue] = []
+    emotion: List[Optional[ExpressionLabel]] = []
+    engagement: List[ExpressionValue] = []
+    posture: List[Optional[ExpressionLabel]] = []
+    timestamp: List[Optional[ExpressionTimestamp]] = []
+    
+    def columns(self) -> Dict[str, list]:
+        """
+        The batch as parallel columns, defaults filled in. Every value was
+        range-checked when the batch was parsed; ValueError if the columns
+        disagree in length or are sent alongside `samples`.
+        """
+        if self.samples:
+            mixed = [name for name in ExpressionData.model_fields if getattr(self, name)]
+            if mixed:
+                raise ValueError(f"Send either 'samples' or columns, not both (got {', '.join(mixed)})")
+            rows = [sample.model_dump() for sample in self.samples]
+            columns = {name: [row[name] for row in rows] for name in ExpressionData.model_fields}
+        else:
+            given = {name: getattr(self, name) for name in ExpressionData.model_fields if getattr(self, name)}
+            count = max((len(values) for values in given.values()), default=0)
+            columns = {}
+            for name, field in ExpressionData.model_fields.items():
+                values = given.get(name, [field.default] * count)
+                if len(values) != count:
+                    raise ValueError(f"Column '{name}' has {len(values)} values, expected {count}")
+                columns[name] = values
+        now = int(time.time() * 1000)
+        columns["timestamp"] = [now if timestamp is None else timestamp for timestamp in columns["timestamp"]]
+        return columns
 
 
 class VideoAnalysisRequest(BaseModel):
@@ -608,48 +757,150 @@ def get_difficulties():
     }
 
 
+def audio_response(http_request: Request, audio: bytes, media_type: str, key: str, filename: str, cache_status: str):
+    """
+    Serve synthesized audio with ETag revalidation and single byte-range support,
+    so browsers can seek and re-fetch cached clips cheaply.
+    """
+    etag = f'"{key}"'
+    headers = {
+        "Content-Disposition": f"inline; filename={filename}",
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "public, max-age=86400",
+        "X-TTS-Cache": cache_status,
+        "X-Audio-URL": f"/tts/audio/{key}"
+    }
+    
+    if http_request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    
+    total = len(audio)
+    range_header = http_request.headers.get("range")
+    range_match = re.fullmatch(r'bytes=(\d*)-(\d*)', range_header.strip()) if range_header else None
+    if range_match and (range_match.group(1) or range_match.group(2)):
+        if range_match.group(1):
+            start = int(range_match.group(1))
+            end = int(range_match.group(2)) if range_match.group(2) else total - 1
+        else:
+            # Suffix range: last N bytes
+            start = max(0, total - int(range_match.group(2)))
+            end = total - 1
+        end = min(end, total - 1)
+        if start > end:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{total}"})
+        return Response(
+            content=audio[start:end + 1],
+            status_code=206,
+            media_type=media_type,
+            headers={**headers, "Content-Range": f"bytes {start}-{end}/{total}"}
+        )
+    
+    return Response(content=audio, media_type=media_type, headers=headers)
+
+
+async def cached_groq_speech(text: str, voice: str) -> Tuple[bytes, str, bool]:
+    """Groq TTS through the audio cache; returns (audio, cache_key, was_cached)"""
+    key = tts_cache_key(text, voice, "groq-playht", "wav")
+    audio, was_cached = await tts_cache.get_or_create(
+        key, lambda: synthesize_speech(text, voice=voice, response_format="wav")
+    )
+    return audio, key, was_cached
+
+
+async def cached_edge_speech(text: str, voice: str) -> Tuple[bytes, str, bool]:
+    """Edge TTS through the audio cache; returns (audio, cache_key, was_cached)"""
+    key = tts_cache_key(text, voice, "edge", "mp3")
+    audio, was_cached = await tts_cache.get_or_create(
+        key, lambda: synthesize_edge_tts(text, voice)
+    )
+    return audio, key, was_cached
+
+
+async def streaming_edge_speech(http_request: Request, text: str, voice: str):
+    """
+    Stream Edge TTS audio to the client as edge-tts yields it. The response is
+    only started once enough audio has arrived to rule out the "insufficient
+    audio" failure; if the client disconnects, the generator is cancelled and
+    the upstream synthesis connection is closed. Completed streams are cached.
+    """
+    key = tts_cache_key(text, voice, "edge", "mp3")
+    cached = await tts_cache.get(key)
+    if cached is not None:
+        return audio_response(http_request, cached, "audio/mpeg", key, "speech.mp3", "hit")
+    
+    upstream = stream_edge_tts(text, voice)
+    primed = []
+    primed_bytes = 0
+    try:
+        async for data in upstream:
+            primed.append(data)
+            primed_bytes += len(data)
+            if primed_bytes >= MIN_AUDIO_BYTES:
+                break
+    except BaseException:
+        await upstream.aclose()
+        raise
+    
+    if primed_bytes < MIN_AUDIO_BYTES:
+        await upstream.aclose()
+        raise InsufficientAudioError(f"Audio data too small ({primed_bytes} bytes)")
+    
+    async def body():
+        chunks = list(primed)
+        completed = False
+        try:
+            for data in primed:
+                yield data
+            async for data in upstream:
+                chunks.append(data)
+                yield data
+            completed = True
+        finally:
+            await upstream.aclose()
+            if completed:
+                await tts_cache.put(key, b"".join(chunks))
+            else:
+                print(f"Edge TTS stream cancelled after {sum(len(c) for c in chunks)} bytes")
+    
+    return StreamingResponse(
+        body(),
+        media_type="audio/mpeg",
+        headers={
+            "Content-Disposition": "inline; filename=speech.mp3",
+            "Cache-Control": "no-cache",
+            "X-TTS-Cache": "miss",
+            "X-Audio-URL": f"/tts/audio/{key}"
+        }
+    )
+
+
 @app.post("/tts")
-async def text_to_speech(request: TextToSpeechRequest):
+async def text_to_speech(request: TextToSpeechRequest, http_request: Request):
     """Convert text to speech using Groq's enhanced TTS with better voice"""
     try:
         # Use a more natural, professional female voice for the interviewer
         # Available PlayHT voices: Fritz, Ariana, Jennifer, etc.
         # Ariana provides a warmer, more professional interview tone
-        response = client.audio.speech.create(
-            model="playht-tts",
-            voice="Ariana-PlayHT",  # Warmer, more natural female voice
-            input=request.text,
-            response_format="wav"
+        # Fritz is hedged in if Ariana fails or runs past the TTS latency budget
+        (audio_bytes, key, was_cached), served = await run_with_fallback(
+            "tts",
+            lambda: cached_groq_speech(request.text, voice="Ariana-PlayHT"),  # Warmer, more natural female voice
+            "Ariana-PlayHT",
+            lambda: cached_groq_speech(request.text, voice="Fritz-PlayHT"),
+            "Fritz-PlayHT"
         )
         
-        audio_bytes = response.read()
-        return StreamingResponse(
-            io.BytesIO(audio_bytes),
-            media_type="audio/wav",
-            headers={"Content-Disposition": "inline; filename=speech.wav"}
-        )
+        response = audio_response(http_request, audio_bytes, "audio/wav", key, "speech.wav", "hit" if was_cached else "miss")
+        response.headers["X-Served-By"] = f"{served['served_by']} ({served['path']})"
+        return response
     except Exception as e:
         print(f"TTS Error: {e}")
-        # Fallback to Fritz if Ariana fails
-        try:
-            response = client.audio.speech.create(
-                model="playht-tts",
-                voice="Fritz-PlayHT",
-                input=request.text,
-                response_format="wav"
-            )
-            audio_bytes = response.read()
-            return StreamingResponse(
-                io.BytesIO(audio_bytes),
-                media_type="audio/wav",
-                headers={"Content-Disposition": "inline; filename=speech.wav"}
-            )
-        except Exception as fallback_error:
-            raise HTTPException(status_code=500, detail=f"TTS failed: {str(fallback_error)}")
+        raise HTTPException(status_code=500, detail=f"TTS failed: {str(e)}")
 
 
 @app.post("/tts/edge")
-async def edge_text_to_speech(request: EdgeTTSRequest):
+async def edge_text_to_speech(request: EdgeTTSRequest, http_request: Request):
     """
     Free Edge TTS using Microsoft's Text-to-Speech engine.
     
@@ -660,34 +911,29 @@ async def edge_text_to_speech(request: EdgeTTSRequest):
     - en-US-DavisNeural (male, professional)
     - en-GB-SoniaNeural (female, British)
     - en-AU-NatashaNeural (female, Australian)
+    
+    Repeated phrases are served from the TTS audio cache. Set "stream": true to
+    receive MP3 frames as they are synthesized instead of after the whole clip.
     """
     try:
-        # Create communicate instance for edge-tts
-        communicate = edge_tts.Communicate(request.text, request.voice)
+        if request.stream:
+            try:
+                return await streaming_edge_speech(http_request, request.text, request.voice)
+            except InsufficientAudioError as e:
+                print(f"Edge TTS Warning: {e} for text: {request.text[:50]}...")
+                raise HTTPException(status_code=500, detail="Edge TTS generated insufficient audio data")
         
         # Collect all audio chunks into a buffer first for reliable delivery
-        audio_chunks = []
-        async for chunk in communicate.stream():
-            if chunk["type"] == "audio":
-                audio_chunks.append(chunk["data"])
-        
-        # Combine all chunks into a single audio buffer
-        audio_data = b"".join(audio_chunks)
-        
-        if len(audio_data) < 100:
-            print(f"Edge TTS Warning: Audio data too small ({len(audio_data)} bytes) for text: {request.text[:50]}...")
+        try:
+            audio_data, key, was_cached = await cached_edge_speech(request.text, request.voice)
+        except InsufficientAudioError as e:
+            print(f"Edge TTS Warning: {e} for text: {request.text[:50]}...")
             raise HTTPException(status_code=500, detail="Edge TTS generated insufficient audio data")
         
-        print(f"Edge TTS: Generated {len(audio_data)} bytes for voice {request.voice}")
+        if not was_cached:
+            print(f"Edge TTS: Generated {len(audio_data)} bytes for voice {request.voice}")
         
-        return StreamingResponse(
-            io.BytesIO(audio_data),
-            media_type="audio/mpeg",
-            headers={
-                "Content-Disposition": "inline; filename=speech.mp3",
-                "Content-Length": str(len(audio_data))
-            }
-        )
+        return audio_response(http_request, audio_data, "audio/mpeg", key, "speech.mp3", "hit" if was_cached else "miss")
     except HTTPException:
         raise
     except Exception as e:
@@ -695,33 +941,60 @@ async def edge_text_to_speech(request: EdgeTTSRequest):
         raise HTTPException(status_code=500, detail=f"Edge TTS failed: {str(e)}")
 
 
+@app.get("/tts/audio/{key}")
+async def get_cached_audio(key: str, request: Request):
+    """Fetch previously synthesized audio by its cache key (supports ETag and Range)"""
+    if not re.fullmatch(r'[0-9a-f]{64}', key):
+        raise HTTPException(status_code=404, detail="Audio not found")
+    
+    audio = await tts_cache.get_or_wait(key)
+    if audio is None:
+        raise HTTPException(status_code=404, detail="Audio not found")
+    
+    media_type = "audio/wav" if audio[:4] == b"RIFF" else "audio/mpeg"
+    extension = "wav" if media_type == "audio/wav" else "mp3"
+    return audio_response(request, audio, media_type, key, f"speech.{extension}", "hit")
+
+
+@app.get("/tts/cache/stats")
+async def get_tts_cache_stats():
+    """TTS audio cache hit rate and size, for capacity planning"""
+    return tts_cache.stats()
+
+
 @app.get("/tts/voices")
 async def get_available_voices():
     """Get list of available Edge TTS voices"""
     return {
-        "voices": [
-            {"id": "en-US-AriaNeural", "name": "Aria", "gender": "Female", "locale": "US English", "recommended": True},
-            {"id": "en-US-JennyNeural", "name": "Jenny", "gender": "Female", "locale": "US English"},
-            {"id": "en-US-GuyNeural", "name": "Guy", "gender": "Male", "locale": "US English"},
-            {"id": "en-US-DavisNeural", "name": "Davis", "gender": "Male", "locale": "US English"},
-            {"id": "en-GB-SoniaNeural", "name": "Sonia", "gender": "Female", "locale": "UK English"},
-            {"id": "en-AU-NatashaNeural", "name": "Natasha", "gender": "Female", "locale": "Australian English"},
-            {"id": "en-IN-NeerjaNeural", "name": "Neerja", "gender": "Female", "locale": "Indian English"},
-            {"id": "en-US-ChristopherNeural", "name": "Christopher", "gender": "Male", "locale": "US English"},
-            {"id": "en-US-EricNeural", "name": "Eric", "gender": "Male", "locale": "US English"},
-            {"id": "en-US-MichelleNeural", "name": "Michelle", "gender": "Female", "locale": "US English"}
-        ],
-        "default": "en-US-AriaNeural"
+        "voices": EDGE_VOICES,
+        "default": DEFAULT_EDGE_VOICE
     }
 
 
 @app.post("/resume/parse")
-async def parse_resume(file: UploadFile = File(...)):
-    """Parse resume file and extract key information using AI with enhanced question generation"""
+async def parse_resume(file: UploadFile = File(...), async_job: bool = False):
+    """
+    Parse resume file and extract key information using AI with enhanced question generation.
+    With ?async_job=true the parse runs as a background job (202 + /jobs/{id}).
+    """
+    content = await file.read()
+    filename = file.filename or "resume.txt"
+    
+    if async_job:
+        content_hash = hashlib.sha256(content).hexdigest()
+        return accepted_job(
+            "resume_parse",
+            lambda: parse_resume_content(content, filename),
+            key=f"resume:{content_hash}"
+        )
+    
+    return await parse_resume_content(content, filename)
+
+
+async def parse_resume_content(content: bytes, filename: str) -> dict:
+    """Extract structured resume information with the LLM"""
     try:
-        content = await file.read()
-        
-        if file.filename.endswith('.txt'):
+        if filename.endswith('.txt'):
             resume_text = content.decode('utf-8')
         else:
             try:
@@ -749,22 +1022,23 @@ SUGGESTED_QUESTIONS: [5 specific interview questions based on THIS resume, refer
 
 Be factual and specific. The questions should directly reference items from the resume."""
 
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
+        parsed_info, served = await routed_chat(
+            "resume.parse",
             messages=[{"role": "user", "content": extraction_prompt}],
             temperature=0.3,
             max_tokens=800
         )
         
-        parsed_info = completion.choices[0].message.content
-        
         return {
             "success": True,
             "raw_text": resume_text[:3000],
             "parsed_info": parsed_info,
-            "filename": file.filename
+            "filename": filename,
+            "served_by": served
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Resume Parse Error: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to parse resume: {str(e)}")
@@ -788,20 +1062,21 @@ Extract and return:
 
 Be concise and actionable."""
 
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
+        analysis, served = await routed_chat(
+            "job.analyze",
             messages=[{"role": "user", "content": analysis_prompt}],
             temperature=0.3,
             max_tokens=400
         )
         
-        analysis = completion.choices[0].message.content
-        
         return {
             "success": True,
-            "analysis": analysis
+            "analysis": analysis,
+            "served_by": served
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Job Analysis Error: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to analyze job description: {str(e)}")
@@ -815,6 +1090,9 @@ async def start_interview(
     current_user: Optional[dict] = Depends(get_current_user)
 ):
     """Start a new interview session - works for both guests and authenticated users"""
+    if session.voice not in EDGE_VOICE_IDS:
+        raise HTTPException(status_code=422, detail=f"Unknown voice '{session.voice}'; see /tts/voices")
+    
     session_id = str(uuid.uuid4())
     start_time = time.time()
     
@@ -916,8 +1194,8 @@ All questions, feedback, and responses should be in this language.
             "system_design": f"Welcome {candidate_name}! I see you have experience{' as a ' + resume_role if resume_role else ''}{(' with ' + resume_skill) if resume_skill else ''}. {('Your work on ' + resume_project + ' caught my eye. ') if resume_project else ''}Let's discuss system design - imagine you need to design a system similar to something you've built before. How would you approach designing a scalable notification service?",
             "behavioral": f"Hi {candidate_name}! Thanks for joining me today. I've looked through your background{' and your role as ' + resume_role if resume_role else ''} looks really interesting. {('I’d love to hear about ' + resume_project + ' in more detail. ') if resume_project else ''}But first, tell me a bit about yourself and what you're looking for in your next opportunity?",
             "frontend": f"Hello {candidate_name}! I see you have frontend experience{(' with ' + resume_skill) if resume_skill else ''}{' as a ' + resume_role if resume_role else ''}. {('The ' + resume_project + ' project sounds interesting! ') if resume_project else ''}Let's start by discussing something you've likely encountered - how would you optimize the performance of a React application that's getting slow?",
-            "backend": f"Welcome {candidate_name}! Your background{' as a ' + resume_role if resume_role else ''}{(' working with ' + resume_skill) if resume_skill else ''} is impressive. {('I\'m curious about ' + resume_project + '. ') if resume_project else ''}Let's dive into backend concepts - can you tell me about your experience with database design and when you'd choose SQL vs NoSQL?",
-            "general": f"Hi {candidate_name}! Great to connect with you. I've reviewed your resume{' - ' + resume_role if resume_role else ''} looks like a great background. {('I\'d love to hear about ' + resume_project + '. ') if resume_project else ''}Let's start with what you're most proud of from your recent work experience?"
+            "backend": f"Welcome {candidate_name}! Your background{' as a ' + resume_role if resume_role else ''}{(' working with ' + resume_skill) if resume_skill else ''} is impressive. {('I’m curious about ' + resume_project + '. ') if resume_project else ''}Let's dive into backend concepts - can you tell me about your experience with database design and when you'd choose SQL vs NoSQL?",
+            "general": f"Hi {candidate_name}! Great to connect with you. I've reviewed your resume{' - ' + resume_role if resume_role else ''} looks like a great background. {('I’d love to hear about ' + resume_project + '. ') if resume_project else ''}Let's start with what you're most proud of from your recent work experience?"
         }
         opening = resume_openings.get(session.topic, resume_openings["general"])
     else:
@@ -935,37 +1213,33 @@ All questions, feedback, and responses should be in this language.
     # Get user_id if authenticated
     user_id = current_user["_id"] if current_user else None
     
-    # Store in memory for active session
-    interview_sessions[session_id] = {
-        "topic": session.topic,
-        "topic_name": topic_config["name"],
-        "difficulty": session.difficulty,
-        "company_style": session.company_style,
-        "company_name": company_config["name"],
-        "system_prompt": full_system_prompt,
-        "history": [{"role": "assistant", "content": opening}],
-        "scores": [],
-        "question_count": 1,
-        "enable_tts": session.enable_tts,
-        "current_difficulty_adjustment": 0,
-        "start_time": start_time,
-        "duration_minutes": session.duration_minutes,
-        "has_resume": bool(session.resume_text),
-        "has_job_description": bool(session.job_description),
-        "user_id": user_id,
-        "mode": session.mode,
-        "language": session.language,
-        "whisper_lang": whisper_lang,
-        # Video mode specific data
-        "expression_history": [],
-        "video_metrics": {
-            "avg_confidence": 0,
-            "avg_eye_contact": 0,
-            "avg_engagement": 0,
-            "emotion_distribution": {},
-            "confidence_trend": "stable"
-        }
-    }
+    # Start synthesizing the opening line now; the client fetches it from opening_audio_url
+    opening_audio_url = None
+    if session.enable_tts:
+        spawn_background(cached_edge_speech(opening, session.voice))
+        opening_audio_url = f"/tts/audio/{tts_cache_key(opening, session.voice, 'edge', 'mp3')}"
+    
+    # Keep the active session in the session store
+    state = InterviewState(
+        topic=session.topic,
+        topic_name=topic_config["name"],
+        difficulty=session.difficulty,
+        company_style=session.company_style,
+        company_name=company_config["name"],
+        system_prompt=full_system_prompt,
+        question_count=1,
+        enable_tts=session.enable_tts,
+        start_time=start_time,
+        duration_minutes=session.duration_minutes,
+        has_resume=bool(session.resume_text),
+        has_job_description=bool(session.job_description),
+        user_id=user_id,
+        mode=session.mode,
+        language=session.language,
+        whisper_lang=whisper_lang
+    )
+    state.history.append({"role": "assistant", "content": opening})
+    await session_store.create(session_id, state)
     
     # Save to MongoDB only if authenticated user
     if user_id:
@@ -992,6 +1266,7 @@ All questions, feedback, and responses should be in this language.
         "company": company_config["name"],
         "difficulty": session.difficulty,
         "opening_message": opening,
+        "opening_audio_url": opening_audio_url,
         "enable_tts": session.enable_tts,
         "duration_minutes": session.duration_minutes,
         "has_resume": bool(session.resume_text),
@@ -1001,139 +1276,454 @@ All questions, feedback, and responses should be in this language.
     }
 
 
-@app.post("/interview/{session_id}/analyze")
-@limiter.limit("30/minute")
-async def analyze_audio(
-    request: Request,
+def complete_interview_turn(session: InterviewState, ai_response: str, score: Optional[int]) -> dict:
+    """Record the interviewer's reply, update scores and adaptive difficulty"""
+    if score is not None:
+        session.scores.append(score)
+    
+    # Calculate running average
+    avg_score = sum(session.scores) / len(session.scores) if session.scores else None
+    
+    # Adaptive difficulty
+    if avg_score:
+        if avg_score >= 8 and session.current_difficulty_adjustment < 2:
+            session.current_difficulty_adjustment += 1
+        elif avg_score <= 4 and session.current_difficulty_adjustment > -2:
+            session.current_difficulty_adjustment -= 1
+    
+    session.history.append({"role": "assistant", "content": ai_response})
+    session.question_count += 1
+    
+    return {
+        "question_number": session.question_count,
+        "history_length": len(session.history),
+        "score": score,
+        "average_score": round(avg_score, 1) if avg_score else None,
+        "total_scores": len(session.scores),
+        "difficulty_trend": "harder" if session.current_difficulty_adjustment > 0 else ("easier" if session.current_difficulty_adjustment < 0 else "stable")
+    }
+
+
+async def commit_interview_turn(
     session_id: str,
-    file: UploadFile = File(...)
-):
-    """Process audio and continue the interview conversation"""
+    session: InterviewState,
+    user_message: dict,
+    ai_response: str,
+    score: Optional[int],
+    prompt_stats: dict
+) -> Tuple[InterviewState, dict]:
+    """
+    Append the answer and reply to the stored session under optimistic
+    concurrency (re-applied on a fresh copy if another request saved first).
+    Returns (saved session, turn stats).
+    """
+    def apply(stored: InterviewState) -> dict:
+        stored.history.append(user_message)
+        record_prompt_stats(stored, prompt_stats)
+        return complete_interview_turn(stored, ai_response, score)
     
-    if session_id not in interview_sessions:
-        raise HTTPException(status_code=404, detail="Session not found. Please start a new interview.")
+    session, turn_stats = await session_store.update(session_id, apply, session)
+    schedule_session_refresh(session_id, session)
+    return session, turn_stats
+
+
+def schedule_session_refresh(session_id: str, session: InterviewState):
+    """Fold older turns into the running summary and assessment off the request path"""
+    if needs_summary(session_id, session):
+        spawn_background(refresh_context_summary(session_id, session))
+    if needs_assessment_update(session_id, session):
+        spawn_background(refresh_assessment(session_id, session))
+
+
+async def merge_session_state(session_id: str, session: InterviewState, key: str, fields: Tuple[str, ...], progress: str):
+    """
+    Write state a background task built on its copy of the session back to
+    the store, unless the stored copy already covers more of the history.
+    """
+    built = getattr(session, key)
     
-    session = interview_sessions[session_id]
+    def apply(stored: InterviewState):
+        state = getattr(stored, key)
+        if built[progress] > state[progress]:
+            state.update({field: built[field] for field in fields})
+    
+    try:
+        await session_store.update(session_id, apply)
+    except SessionNotFoundError:
+        # The interview ended while the background call was running
+        pass
+
+
+async def refresh_context_summary(session_id: str, session: InterviewState):
+    await fold_history(session_id, session)
+    await merge_session_state(session_id, session, "context", ("summary", "summarized_upto"), "summarized_upto")
+
+
+async def refresh_assessment(session_id: str, session: InterviewState):
+    await update_assessment(session_id, session)
+    await merge_session_state(session_id, session, "assessment", ("notes", "assessed_upto", "updates"), "assessed_upto")
+
+
+async def persist_interview_turn(session_id: str, session: InterviewState):
+    """Save the running transcript to MongoDB for authenticated users"""
+    if session.user_id:
+        await update_interview(session_id, {
+            "transcript": session.history.to_list(),
+            "scores": session.score_list(),
+            "question_count": session.question_count
+        })
+
+
+# Recordings larger than this are rejected before transcription (Groq's own limit is 25 MB)
+MAX_AUDIO_UPLOAD_MB = float(os.getenv("MAX_AUDIO_UPLOAD_MB", "25"))
+MAX_AUDIO_UPLOAD_BYTES = int(MAX_AUDIO_UPLOAD_MB * 1024 * 1024)
+
+
+async def read_audio_upload(file: UploadFile) -> bytes:
+    """
+    Read an answer recording straight from the upload spool, with no temp
+    file. The bytes go to Whisper as-is, so this is the only copy per turn.
+    """
+    too_large = HTTPException(
+        status_code=413,
+        detail=f"Audio upload exceeds {MAX_AUDIO_UPLOAD_MB:g} MB"
+    )
+    if file.size is not None and file.size > MAX_AUDIO_UPLOAD_BYTES:
+        raise too_large
+    audio_data = await file.read(MAX_AUDIO_UPLOAD_BYTES + 1)
+    if len(audio_data) > MAX_AUDIO_UPLOAD_BYTES:
+        raise too_large
+    if not audio_data:
+        raise HTTPException(status_code=400, detail="Empty audio upload")
+    return audio_data
+
+
+def upload_filename(file: UploadFile, session_id: str) -> str:
+    """Filename sent to Whisper, which uses the extension to detect the container"""
+    return file.filename or f"audio_{session_id}.webm"
+
+
+async def transcribe_answer(
+    route: str,
+    audio_data: bytes,
+    filename: str,
+    language: Optional[str] = None,
+    temperature: Optional[float] = None
+) -> Tuple[str, dict]:
+    """Normalize (when it pays off) and transcribe an answer; returns (text, served)"""
+    audio_data, filename, preprocessing = await normalize_for_stt(audio_data, filename)
+    text, served = await routed_transcribe(
+        route,
+        file=(filename, audio_data),
+        audio_bytes=len(audio_data),
+        audio_seconds=preprocessing.get("output_seconds"),
+        language=language,
+        temperature=temperature
+    )
+    return text, {**served, "preprocessing": preprocessing}
+
+
+async def reply_to_answer(session_id: str, session: InterviewState, user_text: str) -> Tuple[str, dict, dict]:
+    """
+    Second half of a turn, once the answer is transcribed: interviewer reply,
+    score, bookkeeping and persistence. Returns (display_response, turn_stats, llm_served).
+    """
+    user_message = {"role": "user", "content": user_text}
+
+    # Build messages
+    messages, prompt_stats = build_prompt_messages(session, extra_messages=[user_message])
+    
+    # Generate AI Response
+    print("Thinking...")
+    ai_response, llm_served = await routed_chat(
+        "analyze.llm",
+        messages=messages,
+        temperature=0.7,
+        max_tokens=200,
+        difficulty=session.difficulty,
+        language=session.whisper_lang
+    )
+    print(f"AI said: {ai_response}")
+    
+    # Extract score
+    score = None
+    score_match = re.search(r'\[SCORE:\s*(\d+)/10\]', ai_response)
+    if score_match:
+        score = int(score_match.group(1))
+        display_response = re.sub(r'\s*\[SCORE:\s*\d+/10\]', '', ai_response).strip()
+    else:
+        display_response = ai_response
+    
+    session, turn_stats = await commit_interview_turn(
+        session_id, session, user_message, ai_response, score, prompt_stats
+    )
+    
+    # Update MongoDB if user is authenticated
+    await persist_interview_turn(session_id, session)
+    return display_response, turn_stats, llm_served
+
+
+async def answer_turn(session_id: str, audio_data: bytes, filename: str) -> dict:
+    """One /analyze turn; the caller holds the session's turn lock"""
+    
+    session = await load_session(session_id, "Session not found. Please start a new interview.")
     
     try:
-        # Save temporary file
-        temp_filename = f"temp_audio_{session_id}.webm"
-        with open(temp_filename, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
         # Get language for transcription from session
-        whisper_lang = session.get("whisper_lang", "en")
+        whisper_lang = session.whisper_lang
         
         # Transcribe audio with correct language
         print(f"Transcribing in {whisper_lang}...")
-        with open(temp_filename, "rb") as audio_file:
-            transcription = client.audio.transcriptions.create(
-                file=(temp_filename, audio_file.read()),
-                model="whisper-large-v3",
-                response_format="json",
-                language=whisper_lang,
-                temperature=0.0 
-            )
-        user_text = transcription.text
+        user_text, stt_served = await transcribe_answer(
+            "analyze.stt",
+            audio_data,
+            filename,
+            language=whisper_lang,
+            temperature=0.0
+        )
         print(f"User said: {user_text}")
         
-        session["history"].append({"role": "user", "content": user_text})
+        display_response, turn_stats, llm_served = await reply_to_answer(session_id, session, user_text)
 
-        # Build messages
-        messages = [{"role": "system", "content": session["system_prompt"]}]
-        messages.extend(session["history"])
-        
-        # Generate AI Response
-        print("Thinking...")
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=messages,
-            temperature=0.7,
-            max_tokens=200
+        return {
+            "user_text": user_text, 
+            "ai_response": display_response,
+            **turn_stats,
+            "served_by": {"stt": stt_served, "llm": llm_served}
+        }
+
+    except HTTPException:
+        # Includes 503 from the upstream governor when the queue is saturated
+        raise
+    except Exception as e:
+        print(f"Error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/interview/{session_id}/analyze")
+@limiter.limit("30/minute")
+async def analyze_audio(
+    request: Request,
+    response: Response,
+    session_id: str,
+    file: UploadFile = File(...),
+    idempotency_key: Optional[str] = Header(None)
+):
+    """
+    Process audio and continue the interview conversation.
+    
+    Answers for one session run one at a time. Send an Idempotency-Key header
+    (any unique string per answer) to make retries safe: a repeat of the same
+    key returns the first response (marked Idempotent-Replayed: true) instead
+    of transcribing and scoring the answer again.
+    """
+    
+    audio_data = await read_audio_upload(file)
+    filename = upload_filename(file, session_id)
+    
+    async def run_turn() -> dict:
+        async with session_locks.hold(session_id):
+            return await answer_turn(session_id, audio_data, filename)
+    
+    result, replayed = await idempotency_cache.run(
+        "analyze", session_id, idempotency_key, request_fingerprint(audio_data), run_turn
+    )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
+
+
+@app.post("/interview/{session_id}/analyze/chunk")
+@limiter.limit("600/minute")
+async def analyze_audio_chunk(
+    request: Request,
+    session_id: str,
+    file: UploadFile = File(...),
+    seq: int = Form(...),
+    final: bool = Form(False),
+    standalone: bool = Form(False)
+):
+    """
+    Chunked variant of /analyze: upload the answer while it is being recorded.
+    
+    Send MediaRecorder chunks in order as seq=0,1,2,... and set final=true on
+    the last one. Completed segments (split at pauses) are transcribed in the
+    background, so when the final chunk arrives only the tail is left before
+    the interviewer reply. Set standalone=true if every chunk is a complete
+    audio file of its own. Non-final chunks return upload progress; the final
+    chunk returns the same body as /analyze plus a "chunked" report.
+    """
+    
+    session = await load_session(session_id, "Session not found. Please start a new interview.")
+    whisper_lang = session.whisper_lang
+    
+    data = await file.read(MAX_AUDIO_UPLOAD_BYTES + 1)
+    answer = get_chunked_answer(session_id, seq, whisper_lang, standalone, session.chunk_worker)
+    if seq == 0 and session.chunk_worker != WORKER_ID:
+        # Chunk state stays on this worker; recording it lets other workers refuse misrouted chunks
+        await session_store.update(session_id, lambda stored: setattr(stored, "chunk_worker", WORKER_ID))
+    accepted = await add_chunk(answer, seq, data, MAX_AUDIO_UPLOAD_BYTES)
+    
+    if not final:
+        return {"session_id": session_id, "seq": seq, "duplicate": not accepted, **answer.progress()}
+    
+    try:
+        filename = upload_filename(file, session_id)
+        user_text, chunked = await finish_answer(
+            answer,
+            lambda audio: transcribe_answer("analyze.stt", audio, filename, language=whisper_lang, temperature=0.0)
         )
-        ai_response = completion.choices[0].message.content
-        print(f"AI said: {ai_response}")
-        
-        # Extract score
-        score = None
-        score_match = re.search(r'\[SCORE:\s*(\d+)/10\]', ai_response)
-        if score_match:
-            score = int(score_match.group(1))
-            session["scores"].append(score)
-            display_response = re.sub(r'\s*\[SCORE:\s*\d+/10\]', '', ai_response).strip()
-        else:
-            display_response = ai_response
-        
-        # Calculate running average
-        avg_score = sum(session["scores"]) / len(session["scores"]) if session["scores"] else None
-        
-        # Adaptive difficulty
-        if avg_score:
-            if avg_score >= 8 and session["current_difficulty_adjustment"] < 2:
-                session["current_difficulty_adjustment"] += 1
-            elif avg_score <= 4 and session["current_difficulty_adjustment"] > -2:
-                session["current_difficulty_adjustment"] -= 1
-        
-        session["history"].append({"role": "assistant", "content": ai_response})
-        session["question_count"] += 1
+        print(f"User said: {user_text}")
         
-        # Update MongoDB if user is authenticated
-        if session.get("user_id"):
-            await update_interview(session_id, {
-                "transcript": session["history"],
-                "scores": session["scores"],
-                "question_count": session["question_count"]
-            })
+        async with session_locks.hold(session_id):
+            # Re-read under the lock: another answer may have finished while this one uploaded
+            session = await load_session(session_id, "Session not found. Please start a new interview.")
+            display_response, turn_stats, llm_served = await reply_to_answer(session_id, session, user_text)
         
-        # Cleanup
-        if os.path.exists(temp_filename):
-            os.remove(temp_filename)
-
         return {
-            "user_text": user_text, 
+            "user_text": user_text,
             "ai_response": display_response,
-            "question_number": session["question_count"],
-            "history_length": len(session["history"]),
-            "score": score,
-            "average_score": round(avg_score, 1) if avg_score else None,
-            "total_scores": len(session["scores"]),
-            "difficulty_trend": "harder" if session["current_difficulty_adjustment"] > 0 else ("easier" if session["current_difficulty_adjustment"] < 0 else "stable")
+            **turn_stats,
+            "served_by": {"stt": chunked.pop("segment_served_by"), "llm": llm_served},
+            "chunked": chunked
         }
-
+    
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def run_streaming_turn(session_id: str, session: InterviewState, audio_bytes: bytes, filename: str):
+    """
+    Run one interview turn as a pipeline, yielding (event, data) tuples:
+    transcription -> token* -> done. Shared by the SSE and WebSocket endpoints.
+    """
+    whisper_lang = session.whisper_lang
+    user_text, stt_served = await transcribe_answer(
+        "stream.stt",
+        audio_bytes,
+        filename,
+        language=whisper_lang,
+        temperature=0.0
+    )
+    yield "transcription", {"user_text": user_text}
+    
+    user_message = {"role": "user", "content": user_text}
+    messages, prompt_stats = build_prompt_messages(session, extra_messages=[user_message])
+    
+    score_filter = ScoreTagFilter()
+    display_parts = []
+    # Budgeted to the first token: a slow or failing model is hedged before anything reaches the client
+    tokens, llm_served = await routed_chat_stream(
+        "stream.llm",
+        messages=messages,
+        temperature=0.7,
+        max_tokens=200,
+        difficulty=session.difficulty,
+        language=whisper_lang
+    )
+    async for token in tokens:
+        text = score_filter.feed(token)
+        if text:
+            display_parts.append(text)
+            yield "token", {"text": text}
+    
+    tail, score = score_filter.finish()
+    if tail:
+        display_parts.append(tail)
+        yield "token", {"text": tail}
+    
+    session, turn_stats = await commit_interview_turn(
+        session_id, session, user_message, score_filter.raw, score, prompt_stats
+    )
+    await persist_interview_turn(session_id, session)
+    
+    yield "done", {
+        "user_text": user_text,
+        "ai_response": "".join(display_parts).strip(),
+        **turn_stats,
+        "served_by": {"stt": stt_served, "llm": llm_served}
+    }
+
+
+@app.post("/interview/{session_id}/analyze/stream")
+@limiter.limit("30/minute")
+async def analyze_audio_stream(
+    request: Request,
+    session_id: str,
+    file: UploadFile = File(...)
+):
+    """
+    Streaming variant of /analyze using Server-Sent Events.
+    
+    Events, in order:
+    - transcription: {"user_text"} as soon as Whisper returns
+    - token: {"text"} interviewer reply fragments, score tag already removed
+    - done: {"ai_response", "score", "average_score", ...} same fields as /analyze
+    - error: {"detail"} if anything fails mid-stream
+    """
+    
+    await load_session(session_id, "Session not found. Please start a new interview.")
+    audio_bytes = await read_audio_upload(file)
+    filename = upload_filename(file, session_id)
+    
+    async def event_stream():
+        try:
+            async with session_locks.hold(session_id):
+                session = await load_session(session_id)
+                async for event, data in run_streaming_turn(session_id, session, audio_bytes, filename):
+                    yield sse_event(event, data)
+        except Exception as e:
+            print(f"Streaming analyze error: {e}")
+            yield sse_event("error", {"detail": str(e)})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.post("/interview/{session_id}/end")
-async def end_interview(session_id: str):
-    """End the interview and get summary"""
+async def end_interview(session_id: str, async_job: bool = False):
+    """
+    End the interview and get summary.
+    With ?async_job=true the summary runs as a background job (202 + /jobs/{id}).
+    """
     
-    if session_id not in interview_sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
+    if async_job:
+        key = f"end:{session_id}"
+        # A retry after the job has ended (and removed) the session still gets that job
+        if job_manager.find(key) is None:
+            await load_session(session_id)
+        return accepted_job("interview_end", lambda: end_interview(session_id), key=key)
     
-    session = interview_sessions[session_id]
+    session = await load_session(session_id)
     
-    scores = session.get("scores", [])
+    scores = session.score_list()
     avg_score = round(sum(scores) / len(scores), 1) if scores else None
     min_score = min(scores) if scores else None
     max_score = max(scores) if scores else None
     
-    start_time = session.get("start_time", time.time())
+    start_time = session.start_time
     duration_seconds = int(time.time() - start_time)
     
+    # Folds a long unassessed tail into the notes first, so the prompt stays small without cutting anything
+    evidence = await assessment_evidence(session_id, session)
+    
     # Generate summary using AI
     score_info = f"\nScores received: {scores}\nAverage score: {avg_score}/10" if scores else ""
     
     summary_prompt = f"""Based on this interview conversation, provide a detailed performance summary:
     
-Interview Topic: {session.get('topic_name', session['topic'])}
-Company Style: {session.get('company_name', 'Standard')}
-Difficulty: {session['difficulty']}
-Number of exchanges: {session['question_count']}{score_info}
+Interview Topic: {session.topic_name}
+Company Style: {session.company_name}
+Difficulty: {session.difficulty}
+Number of exchanges: {session.question_count}{score_info}
 
-Conversation:
-{chr(10).join([f"{msg['role'].upper()}: {msg['content']}" for msg in session['history']])}
+{evidence}
 
 Provide a structured assessment:
 1. **Overall Impression** (2-3 sentences)
@@ -1148,22 +1738,23 @@ Provide a structured assessment:
 Be constructive, specific, and actionable."""
 
     try:
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
+        summary, _ = await routed_chat(
+            "summary",
+            # With running notes the summary is mostly a merge, which the fast model handles
+            model=ASSESSMENT_MERGE_MODEL if session.assessment["notes"] else None,
             messages=[{"role": "user", "content": summary_prompt}],
             temperature=0.5,
             max_tokens=500
         )
-        summary = completion.choices[0].message.content
     except Exception:
         summary = "Unable to generate summary. Please try again."
     
     result = {
         "session_id": session_id,
-        "topic": session.get("topic_name", session["topic"]),
-        "company_style": session.get("company_name", "Standard"),
-        "difficulty": session["difficulty"],
-        "total_questions": session["question_count"],
+        "topic": session.topic_name,
+        "company_style": session.company_name,
+        "difficulty": session.difficulty,
+        "total_questions": session.question_count,
         "scores": {
             "individual": scores,
             "average": avg_score,
@@ -1172,19 +1763,19 @@ Be constructive, specific, and actionable."""
             "trend": "improving" if len(scores) >= 2 and scores[-1] > scores[0] else ("declining" if len(scores) >= 2 and scores[-1] < scores[0] else "stable")
         },
         "summary": summary,
-        "history": session["history"],
+        "history": session.history.to_list(),
         "duration_seconds": duration_seconds,
-        "is_guest": session.get("user_id") is None
+        "is_guest": session.user_id is None
     }
     
     # Update MongoDB if user is authenticated
-    if session.get("user_id"):
+    if session.user_id:
         await update_interview(session_id, {
             "scores": scores,
             "average_score": avg_score,
-            "transcript": session["history"],
+            "transcript": session.history.to_list(),
             "summary": summary,
-            "question_count": session["question_count"],
+            "question_count": session.question_count,
             "ended_at": datetime.utcnow(),
             "duration_seconds": duration_seconds,
             "status": "completed"
@@ -1194,27 +1785,27 @@ Be constructive, specific, and actionable."""
         interview_data = {
             "session_id": session_id,
             "user_id": None,  # Will be linked when user saves to history
-            "topic": session.get("topic", "general"),
-            "topic_name": session.get("topic_name", "General Technical"),
-            "company_style": session.get("company_style", "default"),
-            "company_name": session.get("company_name", "Standard"),
-            "difficulty": session.get("difficulty", "medium"),
-            "duration_minutes": session.get("duration_minutes", 30),
-            "question_count": session.get("question_count", 0),
+            "topic": session.topic,
+            "topic_name": session.topic_name,
+            "company_style": session.company_style,
+            "company_name": session.company_name,
+            "difficulty": session.difficulty,
+            "duration_minutes": session.duration_minutes,
+            "question_count": session.question_count,
             "scores": scores,
             "average_score": avg_score,
-            "transcript": session.get("history", []),
+            "transcript": session.history.to_list(),
             "summary": summary,
-            "has_resume": bool(session.get("resume_text")),
-            "has_job_description": bool(session.get("job_description")),
-            "started_at": datetime.fromtimestamp(session.get("start_time", time.time())),
+            "has_resume": session.has_resume,
+            "has_job_description": session.has_job_description,
+            "started_at": datetime.fromtimestamp(session.start_time),
             "ended_at": datetime.utcnow(),
             "duration_seconds": duration_seconds,
             "status": "completed"
         }
         await create_interview_db(interview_data)
     
-    del interview_sessions[session_id]
+    await session_store.delete(session_id)
     
     return result
 
@@ -1225,103 +1816,147 @@ Be constructive, specific, and actionable."""
 async def record_expression_data(session_id: str, expression: ExpressionData):
     """Record expression data snapshot from video interview"""
     
-    if session_id not in interview_sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    session = interview_sessions[session_id]
-    
     # Add timestamp if not provided
-    if not expression.timestamp:
+    if expression.timestamp is None:
         expression.timestamp = int(time.time() * 1000)
     
-    # Add to expression history
-    session["expression_history"].append({
+    sample = {
         "confidence": expression.confidence,
         "eyeContact": expression.eyeContact,
         "emotion": expression.emotion,
         "engagement": expression.engagement,
         "posture": expression.posture,
         "timestamp": expression.timestamp
-    })
+    }
     
-    # Update running metrics
-    history = session["expression_history"]
-    if len(history) > 0:
-        session["video_metrics"]["avg_confidence"] = round(
-            sum(h["confidence"] for h in history) / len(history), 1
-        )
-        session["video_metrics"]["avg_eye_contact"] = round(
-            sum(h["eyeContact"] for h in history) / len(history), 1
-        )
-        session["video_metrics"]["avg_engagement"] = round(
-            sum(h["engagement"] for h in history) / len(history), 1
-        )
-        
-        # Calculate emotion distribution
-        emotion_counts = {}
-        for h in history:
-            emotion_counts[h["emotion"]] = emotion_counts.get(h["emotion"], 0) + 1
-        session["video_metrics"]["emotion_distribution"] = {
-            k: round(v / len(history) * 100, 1) 
-            for k, v in emotion_counts.items()
-        }
-        
-        # Calculate confidence trend
-        if len(history) >= 10:
-            mid = len(history) // 2
-            first_half_avg = sum(h["confidence"] for h in history[:mid]) / mid
-            second_half_avg = sum(h["confidence"] for h in history[mid:]) / (len(history) - mid)
-            if second_half_avg > first_half_avg + 10:
-                session["video_metrics"]["confidence_trend"] = "improving"
-            elif second_half_avg < first_half_avg - 10:
-                session["video_metrics"]["confidence_trend"] = "declining"
-            else:
-                session["video_metrics"]["confidence_trend"] = "stable"
+    def apply(session: InterviewState) -> int:
+        # Add to expression history; the series keeps running totals, so this is O(1)
+        session.expressions.append(sample)
+        session.video_metrics = session.expressions.metrics()
+        return len(session.expressions)
+    
+    try:
+        session, total_samples = await session_store.update(session_id, apply)
+    except (ValueError, OverflowError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    return {
+        "success": True,
+        "total_samples": total_samples,
+        "current_metrics": session.video_metrics
+    }
+
+
+# Larger batches are rejected; at a few samples a second this is minutes of telemetry
+EXPRESSION_BATCH_MAX_SAMPLES = int(os.getenv("EXPRESSION_BATCH_MAX_SAMPLES", "1000"))
+
+
+async def record_expression_batch(session_id: str, batch: ExpressionBatch) -> dict:
+    """Apply a batch of samples to the session in one pass and one store write"""
+    try:
+        columns = batch.columns()
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    accepted = len(columns["timestamp"])
+    if accepted > EXPRESSION_BATCH_MAX_SAMPLES:
+        raise HTTPException(status_code=413, detail=f"At most {EXPRESSION_BATCH_MAX_SAMPLES} samples per batch")
+    
+    def apply(session: InterviewState) -> int:
+        if accepted:
+            session.expressions.extend(columns)
+            session.video_metrics = session.expressions.metrics()
+        return len(session.expressions)
+    
+    try:
+        session, total_samples = await session_store.update(session_id, apply)
+    except (ValueError, OverflowError) as e:
+        # extend() checks everything before storing anything, so the session is unchanged
+        raise HTTPException(status_code=422, detail=str(e))
     
     return {
         "success": True,
-        "total_samples": len(history),
-        "current_metrics": session["video_metrics"]
+        "accepted": accepted,
+        "total_samples": total_samples,
+        "current_metrics": session.video_metrics
     }
 
 
+@app.post("/interview/{session_id}/video/expressions")
+async def record_expression_data_batch(session_id: str, batch: ExpressionBatch):
+    """
+    Record many expression samples at once (buffer them client-side and send
+    every few seconds instead of one request per sample). Same response as
+    /video/expression plus the number accepted.
+    """
+    return await record_expression_batch(session_id, batch)
+
+
 @app.get("/interview/{session_id}/video/metrics")
-async def get_video_metrics(session_id: str):
-    """Get current video interview metrics"""
+async def get_video_metrics(session_id: str, since: Optional[str] = None, wait: float = 0):
+    """
+    Get current video interview metrics.
     
-    if session_id not in interview_sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
+    Pass the `cursor` of the previous response as `since` to get only the
+    samples recorded after it (304, no body, if there are none); with
+    `wait` (seconds) the request is held open until there are.
+    """
     
-    session = interview_sessions[session_id]
+    session = await watch(session_id, since, wait, lambda state: str(len(state.expressions)))
+    if session is None:
+        return Response(status_code=304)
+    
+    total_samples = len(session.expressions)
+    history_count = 20  # Last 20 samples
+    if since is not None and since.isdigit() and int(since) <= total_samples:
+        history_count = min(history_count, total_samples - int(since))
     
     return {
         "session_id": session_id,
-        "mode": session.get("mode", "audio"),
-        "metrics": session["video_metrics"],
-        "total_samples": len(session["expression_history"]),
-        "expression_history": session["expression_history"][-20:]  # Last 20 samples
+        "mode": session.mode,
+        "metrics": session.video_metrics,
+        "total_samples": total_samples,
+        "expression_history": session.expressions.tail(history_count),
+        "cursor": str(total_samples)
     }
 
 
-@app.post("/interview/{session_id}/video/analyze")
-@limiter.limit("30/minute")
-async def analyze_video_response(
-    request: Request,
+@app.get("/interview/{session_id}/video/timeline")
+async def get_video_timeline(
     session_id: str,
-    file: UploadFile = File(...),
-    confidence: float = Form(0),
-    eye_contact: float = Form(0),
-    emotion: str = Form("neutral"),
-    engagement: float = Form(0)
+    start: Optional[int] = Query(None, ge=0, le=EXPRESSION_TIMESTAMP_MAX_MS),
+    end: Optional[int] = Query(None, ge=0, le=EXPRESSION_TIMESTAMP_MAX_MS)
 ):
-    """Process audio with expression data for video interview"""
-    
-    if session_id not in interview_sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
+    """
+    Expression samples rolled up into fixed time buckets (min/avg/max per
+    metric, emotion counts) as parallel arrays, for charts and replay.
+    start/end (epoch ms) keep the buckets starting in [start, end). Served from the live
+    session while the interview runs, from MongoDB once it has ended.
+    """
     
-    session = interview_sessions[session_id]
+    session = await session_store.get(session_id)
+    if session is not None:
+        return {"session_id": session_id, "source": "live", **live_timeline(session.expressions, start, end)}
     
-    # Record expression data
+    timeline = await load_timeline(session_id, start, end)
+    if timeline is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"session_id": session_id, "source": "stored", **timeline}
+
+
+async def video_answer_turn(
+    session_id: str,
+    audio_data: bytes,
+    filename: str,
+    confidence: float,
+    eye_contact: float,
+    emotion: str,
+    engagement: float
+) -> dict:
+    """One /video/analyze turn; the caller holds the session's turn lock"""
+    
+    session = await load_session(session_id)
+    
+    # Expression data for this answer (recorded with the turn below)
     expression_snapshot = {
         "confidence": confidence,
         "eyeContact": eye_contact,
@@ -1329,31 +1964,19 @@ async def analyze_video_response(
         "engagement": engagement,
         "timestamp": int(time.time() * 1000)
     }
-    session["expression_history"].append(expression_snapshot)
     
     try:
-        # Save and transcribe audio (same as regular analyze)
-        temp_filename = f"temp_audio_{session_id}.webm"
-        with open(temp_filename, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Transcribe audio
-        with open(temp_filename, "rb") as audio_file:
-            transcription = client.audio.transcriptions.create(
-                file=audio_file,
-                model="whisper-large-v3-turbo",
-                response_format="text"
-            )
-        
-        user_response = transcription.strip()
-        
-        # Clean up temp file
-        if os.path.exists(temp_filename):
-            os.remove(temp_filename)
+        # Transcribe audio straight from the upload (same as regular analyze)
+        user_response, stt_served = await transcribe_answer(
+            "video.stt",
+            audio_data,
+            filename,
+            language=session.whisper_lang
+        )
         
         # Add expression context to the AI prompt for video mode
         expression_context = ""
-        if session.get("mode") == "video":
+        if session.mode == "video":
             # Determine coaching hint based on expression
             coaching_hint = ""
             if confidence < 40:
@@ -1389,42 +2012,48 @@ IMPORTANT: Naturally incorporate body language feedback when appropriate:
 """
         
         # Build conversation for AI
-        messages = [{"role": "system", "content": session["system_prompt"] + expression_context}]
-        messages.extend(session["history"])
-        messages.append({"role": "user", "content": user_response})
+        messages, prompt_stats = build_prompt_messages(
+            session,
+            system_prompt=session.system_prompt + expression_context,
+            extra_messages=[{"role": "user", "content": user_response}]
+        )
         
         # Get AI response
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
+        ai_response, llm_served = await routed_chat(
+            "video.llm",
             messages=messages,
             temperature=0.7,
-            max_tokens=300
+            max_tokens=300,
+            difficulty=session.difficulty,
+            language=session.whisper_lang
         )
         
-        ai_response = completion.choices[0].message.content
-        
         # Extract score
         score = None
         score_match = re.search(r'\[SCORE:\s*(\d+(?:\.\d+)?)/10\]', ai_response)
         if score_match:
             score = float(score_match.group(1))
-            session["scores"].append(score)
             ai_response_clean = re.sub(r'\s*\[SCORE:\s*\d+(?:\.\d+)?/10\]', '', ai_response)
         else:
             ai_response_clean = ai_response
         
-        # Update session history (don't add expression to history - causes API error)
-        session["history"].append({"role": "user", "content": user_response})
-        session["history"].append({"role": "assistant", "content": ai_response_clean})
+        def apply(stored: InterviewState):
+            # Store expression data with the answer's score
+            stored.add_snapshot(expression_snapshot, score)
+            record_prompt_stats(stored, prompt_stats)
+            if score is not None:
+                stored.scores.append(score)
+            
+            # Update session history (don't add expression to history - causes API error)
+            stored.history.append({"role": "user", "content": user_response})
+            stored.history.append({"role": "assistant", "content": ai_response_clean})
+            stored.question_count += 1
         
-        # Store expression data separately
-        if "expression_snapshots" not in session:
-            session["expression_snapshots"] = []
-        session["expression_snapshots"].append({"expression": expression_snapshot, "score": score})
-        session["question_count"] += 1
+        session, _ = await session_store.update(session_id, apply, session)
+        schedule_session_refresh(session_id, session)
         
         # Calculate averages
-        scores = session["scores"]
+        scores = session.score_list()
         avg_score = round(sum(scores) / len(scores), 1) if scores else None
         
         return {
@@ -1432,36 +2061,79 @@ IMPORTANT: Naturally incorporate body language feedback when appropriate:
             "response": ai_response_clean,
             "score": score,
             "average_score": avg_score,
-            "question_count": session["question_count"],
+            "question_count": session.question_count,
             "expression_data": expression_snapshot,
-            "video_metrics": session["video_metrics"],
-            "difficulty_trend": session["video_metrics"]["confidence_trend"]
+            "video_metrics": session.video_metrics,
+            "difficulty_trend": session.video_metrics["confidence_trend"],
+            "served_by": {"stt": stt_served, "llm": llm_served}
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Video analysis error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/interview/{session_id}/video/analyze")
+@limiter.limit("30/minute")
+async def analyze_video_response(
+    request: Request,
+    response: Response,
+    session_id: str,
+    file: UploadFile = File(...),
+    confidence: float = Form(0, ge=EXPRESSION_VALUE_MIN, le=EXPRESSION_VALUE_MAX),
+    eye_contact: float = Form(0, ge=EXPRESSION_VALUE_MIN, le=EXPRESSION_VALUE_MAX),
+    emotion: str = Form("neutral", max_length=EXPRESSION_LABEL_MAX_LENGTH),
+    engagement: float = Form(0, ge=EXPRESSION_VALUE_MIN, le=EXPRESSION_VALUE_MAX),
+    idempotency_key: Optional[str] = Header(None)
+):
+    """Process audio with expression data for video interview (Idempotency-Key as for /analyze)"""
+    
+    audio_data = await read_audio_upload(file)
+    filename = upload_filename(file, session_id)
+    
+    async def run_turn() -> dict:
+        async with session_locks.hold(session_id):
+            return await video_answer_turn(
+                session_id, audio_data, filename, confidence, eye_contact, emotion, engagement
+            )
+    
+    fingerprint = request_fingerprint(audio_data, confidence, eye_contact, emotion, engagement)
+    result, replayed = await idempotency_cache.run("video_analyze", session_id, idempotency_key, fingerprint, run_turn)
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
+
+
 @app.post("/interview/{session_id}/video/end")
-async def end_video_interview(session_id: str):
-    """End video interview and get comprehensive summary with expression analysis"""
+async def end_video_interview(session_id: str, async_job: bool = False):
+    """
+    End video interview and get comprehensive summary with expression analysis.
+    With ?async_job=true the summary runs as a background job (202 + /jobs/{id}).
+    """
     
-    if session_id not in interview_sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
+    if async_job:
+        key = f"video_end:{session_id}"
+        # A retry after the job has ended (and removed) the session still gets that job
+        if job_manager.find(key) is None:
+            await load_session(session_id)
+        return accepted_job("video_end", lambda: end_video_interview(session_id), key=key)
     
-    session = interview_sessions[session_id]
+    session = await load_session(session_id)
     
-    scores = session.get("scores", [])
+    scores = session.score_list()
     avg_score = round(sum(scores) / len(scores), 1) if scores else None
     min_score = min(scores) if scores else None
     max_score = max(scores) if scores else None
     
-    start_time = session.get("start_time", time.time())
+    start_time = session.start_time
     duration_seconds = int(time.time() - start_time)
     
-    video_metrics = session.get("video_metrics", {})
-    expression_history = session.get("expression_history", [])
+    video_metrics = session.video_metrics
+    expression_samples = len(session.expressions)
+    
+    evidence = await assessment_evidence(session_id, session)
     
     # Generate comprehensive video summary using AI
     expression_summary = f"""
@@ -1471,22 +2143,21 @@ Video Interview Expression Analysis:
 - Average Engagement: {video_metrics.get('avg_engagement', 0)}%
 - Confidence Trend: {video_metrics.get('confidence_trend', 'stable')}
 - Emotion Distribution: {video_metrics.get('emotion_distribution', {})}
-- Total Expression Samples: {len(expression_history)}
+- Total Expression Samples: {expression_samples}
 """
     
     summary_prompt = f"""Based on this VIDEO interview conversation and expression analysis, provide a comprehensive assessment:
     
-Interview Topic: {session.get('topic_name', session['topic'])}
-Company Style: {session.get('company_name', 'Standard')}
-Difficulty: {session['difficulty']}
-Number of exchanges: {session['question_count']}
+Interview Topic: {session.topic_name}
+Company Style: {session.company_name}
+Difficulty: {session.difficulty}
+Number of exchanges: {session.question_count}
 Scores: {scores}
 Average score: {avg_score}/10
 
 {expression_summary}
 
-Conversation:
-{chr(10).join([f"{msg['role'].upper()}: {msg['content']}" for msg in session['history'][:10]])}
+{evidence}
 
 Provide a structured VIDEO interview assessment:
 1. **Overall Impression** (considering both content AND body language)
@@ -1502,13 +2173,14 @@ Provide a structured VIDEO interview assessment:
 Be constructive and specific about video presence."""
 
     try:
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
+        summary, _ = await routed_chat(
+            "summary",
+            # With running notes the summary is mostly a merge, which the fast model handles
+            model=ASSESSMENT_MERGE_MODEL if session.assessment["notes"] else None,
             messages=[{"role": "user", "content": summary_prompt}],
             temperature=0.5,
             max_tokens=600
         )
-        summary = completion.choices[0].message.content
     except Exception:
         summary = "Unable to generate video summary. Please try again."
     
@@ -1527,10 +2199,10 @@ Be constructive and specific about video presence."""
     result = {
         "session_id": session_id,
         "mode": "video",
-        "topic": session.get("topic_name", session["topic"]),
-        "company_style": session.get("company_name", "Standard"),
-        "difficulty": session["difficulty"],
-        "total_questions": session["question_count"],
+        "topic": session.topic_name,
+        "company_style": session.company_name,
+        "difficulty": session.difficulty,
+        "total_questions": session.question_count,
         "scores": {
             "individual": scores,
             "average": avg_score,
@@ -1546,7 +2218,7 @@ Be constructive and specific about video presence."""
             "eye_contact": round(eye_contact_score, 1)
         },
         "expression_summary": {
-            "total_samples": len(expression_history),
+            "total_samples": expression_samples,
             "confidence_trend": video_metrics.get("confidence_trend", "stable"),
             "dominant_emotion": max(
                 video_metrics.get("emotion_distribution", {"neutral": 100}).items(),
@@ -1554,69 +2226,79 @@ Be constructive and specific about video presence."""
             )[0] if video_metrics.get("emotion_distribution") else "neutral"
         },
         "summary": summary,
-        "history": session["history"],
+        "history": session.history.to_list(),
         "duration_seconds": duration_seconds,
-        "is_guest": session.get("user_id") is None
+        "is_guest": session.user_id is None
     }
     
     # Update MongoDB if user is authenticated
-    if session.get("user_id"):
+    if session.user_id:
         await update_interview(session_id, {
             "scores": scores,
             "average_score": avg_score,
             "combined_score": combined_score,
             "video_metrics": video_metrics,
-            "transcript": session["history"],
+            "transcript": session.history.to_list(),
             "summary": summary,
-            "question_count": session["question_count"],
+            "question_count": session.question_count,
             "ended_at": datetime.utcnow(),
             "duration_seconds": duration_seconds,
             "status": "completed",
             "mode": "video"
         })
     
-    del interview_sessions[session_id]
+    # Keep the expression timeline for replay once the session is gone
+    await persist_timeline(session_id, session.expressions)
+    
+    await session_store.delete(session_id)
     
     return result
 
 
 @app.get("/interview/{session_id}/status")
-def get_session_status(session_id: str):
-    """Get current session status"""
-    if session_id not in interview_sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    session = interview_sessions[session_id]
-    scores = session.get("scores", [])
-    
-    start_time = session.get("start_time", time.time())
+async def get_session_status(session_id: str, since: Optional[str] = None, wait: float = 0):
+    """Get current session status (`since`/`wait` as for /video/metrics)"""
+    session = await watch(session_id, since, wait, session_cursor)
+    if session is None:
+        return Response(status_code=304)
+    scores = session.score_list()
+    
+    start_time = session.start_time
     elapsed_seconds = int(time.time() - start_time)
-    duration_minutes = session.get("duration_minutes", 30)
+    duration_minutes = session.duration_minutes
     remaining_seconds = max(0, (duration_minutes * 60) - elapsed_seconds)
     
     return {
         "session_id": session_id,
-        "topic": session.get("topic_name", session["topic"]),
-        "company_style": session.get("company_name", "Standard"),
-        "difficulty": session["difficulty"],
-        "question_count": session["question_count"],
-        "history_length": len(session["history"]),
+        "topic": session.topic_name,
+        "company_style": session.company_name,
+        "difficulty": session.difficulty,
+        "question_count": session.question_count,
+        "history_length": len(session.history),
         "current_average": round(sum(scores) / len(scores), 1) if scores else None,
-        "enable_tts": session.get("enable_tts", True),
+        "enable_tts": session.enable_tts,
         "elapsed_seconds": elapsed_seconds,
         "remaining_seconds": remaining_seconds,
         "duration_minutes": duration_minutes,
         "is_time_up": remaining_seconds <= 0,
-        "has_resume": session.get("has_resume", False),
-        "has_job_description": session.get("has_job_description", False),
-        "is_guest": session.get("user_id") is None
+        "has_resume": session.has_resume,
+        "has_job_description": session.has_job_description,
+        "is_guest": session.user_id is None,
+        "cursor": session_cursor(session)
     }
 
 
 @app.get("/interview/{session_id}/time")
-def get_interview_time(session_id: str):
-    """Get interview timer status"""
-    if session_id not in interview_sessions:
+async def get_interview_time(session_id: str, since: Optional[str] = None, wait: float = 0):
+    """
+    Get interview timer status.
+    
+    With `since`, 304 until the session changes or the timer enters its
+    warning or time-up phase; in between the client can count seconds itself.
+    """
+    try:
+        session = await watch(session_id, since, wait, session_cursor)
+    except SessionNotFoundError:
         # Return default values for missing sessions (frontend will use local timer)
         return {
             "elapsed_seconds": 0,
@@ -1629,11 +2311,17 @@ def get_interview_time(session_id: str):
             "is_warning": False,
             "session_exists": False
         }
+    if session is None:
+        return Response(status_code=304)
     
-    session = interview_sessions[session_id]
-    start_time = session.get("start_time", time.time())
+    return {**interview_timer(session), "session_exists": True, "cursor": session_cursor(session)}
+
+
+def interview_timer(session: InterviewState) -> dict:
+    """Compute elapsed/remaining time for an active session"""
+    start_time = session.start_time
     elapsed_seconds = int(time.time() - start_time)
-    duration_minutes = session.get("duration_minutes", 30)
+    duration_minutes = session.duration_minutes
     remaining_seconds = max(0, (duration_minutes * 60) - elapsed_seconds)
     
     return {
@@ -1644,11 +2332,209 @@ def get_interview_time(session_id: str):
         "duration_minutes": duration_minutes,
         "progress_percent": min(100, (elapsed_seconds / (duration_minutes * 60)) * 100),
         "is_time_up": remaining_seconds <= 0,
-        "is_warning": remaining_seconds <= 300 and remaining_seconds > 0,
-        "session_exists": True
+        "is_warning": remaining_seconds <= 300 and remaining_seconds > 0
     }
 
 
+@app.get("/interview/{session_id}/context")
+async def get_interview_context(session_id: str):
+    """Prompt-context usage for a session: summary coverage and token savings"""
+    session = await load_session(session_id)
+    return {"session_id": session_id, **context_report(session)}
+
+
+# ============== REAL-TIME INTERVIEW CHANNEL ==============
+
+# How often the WebSocket pushes timer updates (replaces polling /time)
+WS_TIMER_INTERVAL_SECONDS = 5
+
+
+async def stream_turn_over_websocket(
+    session_id: str,
+    session: InterviewState,
+    audio_bytes: bytes,
+    send_json,
+    send_audio,
+    voice: str,
+    enable_tts: bool
+):
+    """
+    Run one turn for the WebSocket channel. Reply text is cut into sentences
+    while the LLM is still generating, and each sentence is synthesized and
+    pushed as soon as it is ready, so audio starts after the first sentence.
+    """
+    sentences: asyncio.Queue = asyncio.Queue()
+    chunker = SentenceChunker()
+    
+    async def tts_worker():
+        index = 0
+        while True:
+            sentence = await sentences.get()
+            if sentence is None:
+                break
+            try:
+                audio, _, _ = await cached_edge_speech(sentence, voice)
+            except Exception as e:
+                print(f"WebSocket TTS error: {e}")
+                await send_json({"type": "error", "detail": f"TTS failed: {str(e)}"})
+                continue
+            await send_audio(index, sentence, audio)
+            index += 1
+        await send_json({"type": "audio_end", "chunks": index})
+    
+    tts_task = asyncio.create_task(tts_worker()) if enable_tts else None
+    try:
+        async for event, data in run_streaming_turn(session_id, session, audio_bytes, f"audio_{session_id}.webm"):
+            if event == "transcription":
+                await send_json({"type": "transcript", "text": data["user_text"]})
+            elif event == "token":
+                await send_json({"type": "reply", "text": data["text"]})
+                if tts_task:
+                    for sentence in chunker.feed(data["text"]):
+                        sentences.put_nowait(sentence)
+            elif event == "done":
+                if tts_task:
+                    remainder = chunker.flush()
+                    if remainder:
+                        sentences.put_nowait(remainder)
+                await send_json({"type": "turn_complete", **data})
+    except BaseException:
+        if tts_task:
+            tts_task.cancel()
+        raise
+    
+    if tts_task:
+        sentences.put_nowait(None)
+        await tts_task
+
+
+@app.websocket("/ws/interview/{session_id}")
+async def interview_websocket(
+    websocket: WebSocket,
+    session_id: str,
+    voice: str = DEFAULT_EDGE_VOICE,
+    tts: Optional[bool] = None
+):
+    """
+    Full-duplex interview channel: audio in, transcript + reply + TTS audio out.
+    
+    Client -> server:
+    - binary frames: audio of the current answer (appended until end_of_answer)
+    - {"type": "end_of_answer"}: run STT -> LLM -> sentence TTS on the buffered audio
+    - {"type": "cancel"}: discard the buffered audio
+    - {"type": "time"}: request an immediate timer update
+    - {"type": "expressions", ...}: a batch of expression samples, same body as /video/expressions
+    
+    Server -> client:
+    - {"type": "transcript", "text"}
+    - {"type": "reply", "text"}: reply fragments, score tag removed
+    - {"type": "audio", "index", "text", "bytes"} followed by one binary frame of MP3
+    - {"type": "audio_end", "chunks"}
+    - {"type": "turn_complete", ...}: same fields as /analyze, including the score
+    - {"type": "timer", ...}: same fields as /time, pushed periodically
+    - {"type": "expressions_recorded", ...}: same fields as /video/expressions
+    - {"type": "error", "detail"}
+    """
+    await websocket.accept()
+    
+    session = await session_store.get(session_id)
+    if session is None:
+        await websocket.send_json({"type": "error", "detail": "Session not found"})
+        await websocket.close(code=4404)
+        return
+    
+    # Checked up front, like /start: an unknown voice would otherwise fail every sentence's TTS
+    if voice not in EDGE_VOICE_IDS:
+        await websocket.send_json({"type": "error", "detail": f"Unknown voice '{voice}'; see /tts/voices"})
+        await websocket.close(code=4422)
+        return
+    
+    enable_tts = session.enable_tts if tts is None else tts
+    
+    # Audio header + binary frame pairs must not interleave with other messages
+    send_lock = asyncio.Lock()
+    
+    async def send_json(payload: dict):
+        async with send_lock:
+            await websocket.send_json(payload)
+    
+    async def send_audio(index: int, text: str, audio: bytes):
+        async with send_lock:
+            await websocket.send_json({"type": "audio", "index": index, "text": text, "bytes": len(audio)})
+            await websocket.send_bytes(audio)
+    
+    async def push_timer():
+        while await session_store.exists(session_id):
+            await send_json({"type": "timer", **interview_timer(session)})
+            await asyncio.sleep(WS_TIMER_INTERVAL_SECONDS)
+    
+    timer_task = asyncio.create_task(push_timer())
+    audio_buffer = bytearray()
+    
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            
+            if message.get("bytes") is not None:
+                if len(audio_buffer) + len(message["bytes"]) > MAX_AUDIO_UPLOAD_BYTES:
+                    audio_buffer.clear()
+                    await send_json({"type": "error", "detail": f"Answer audio exceeds {MAX_AUDIO_UPLOAD_MB:g} MB; discarded"})
+                    continue
+                audio_buffer.extend(message["bytes"])
+                continue
+            
+            try:
+                command = json.loads(message.get("text") or "{}")
+            except json.JSONDecodeError:
+                await send_json({"type": "error", "detail": "Invalid message"})
+                continue
+            
+            kind = command.get("type")
+            if kind == "end_of_answer":
+                if not audio_buffer:
+                    await send_json({"type": "error", "detail": "No audio received"})
+                    continue
+                audio_bytes = bytes(audio_buffer)
+                audio_buffer.clear()
+                try:
+                    async with session_locks.hold(session_id):
+                        # Re-read: other requests (or workers) may have changed the session since the last turn
+                        session = await session_store.get(session_id)
+                        if session is None:
+                            await send_json({"type": "error", "detail": "Session not found"})
+                            break
+                        await stream_turn_over_websocket(
+                            session_id, session, audio_bytes, send_json, send_audio, voice, enable_tts
+                        )
+                except WebSocketDisconnect:
+                    raise
+                except Exception as e:
+                    print(f"WebSocket turn error: {e}")
+                    await send_json({"type": "error", "detail": str(e)})
+            elif kind == "cancel":
+                audio_buffer.clear()
+            elif kind == "time":
+                await send_json({"type": "timer", **interview_timer(session)})
+            elif kind == "expressions":
+                try:
+                    result = await record_expression_batch(session_id, ExpressionBatch.model_validate(command))
+                except ValidationError as e:
+                    await send_json({"type": "error", "detail": f"Invalid expressions: {e.errors()[0]['msg']}"})
+                    continue
+                except HTTPException as e:
+                    await send_json({"type": "error", "detail": e.detail})
+                    continue
+                await send_json({"type": "expressions_recorded", **result})
+            else:
+                await send_json({"type": "error", "detail": f"Unknown message type: {kind}"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        timer_task.cancel()
+
+
 # ============== USER DATA ENDPOINTS (REQUIRE AUTH) ==============
 
 @app.post("/user/interviews/save")
@@ -1670,39 +2556,39 @@ async def save_interview_to_user_history(
         else:
             raise HTTPException(status_code=403, detail="Interview belongs to another user")
     
-    # If not in DB, check memory
-    if session_id not in interview_sessions:
-        raise HTTPException(status_code=404, detail="Session not found or already ended")
-    
-    session = interview_sessions[session_id]
-    scores = session.get("scores", [])
+    # If not in DB, check the active sessions
+    session = await load_session(session_id, "Session not found or already ended")
+    scores = session.score_list()
     
     # Create interview record
     interview_data = {
         "session_id": session_id,
         "user_id": current_user["_id"],
-        "topic": session.get("topic", "general"),
-        "topic_name": session.get("topic_name", "General Technical"),
-        "company_style": session.get("company_style", "default"),
-        "company_name": session.get("company_name", "Standard"),
-        "difficulty": session.get("difficulty", "medium"),
-        "duration_minutes": session.get("duration_minutes", 30),
-        "question_count": session.get("question_count", 0),
+        "topic": session.topic,
+        "topic_name": session.topic_name,
+        "company_style": session.company_style,
+        "company_name": session.company_name,
+        "difficulty": session.difficulty,
+        "duration_minutes": session.duration_minutes,
+        "question_count": session.question_count,
         "scores": scores,
         "average_score": round(sum(scores) / len(scores), 1) if scores else None,
-        "transcript": session.get("history", []),
-        "has_resume": bool(session.get("resume_text")),
-        "has_job_description": bool(session.get("job_description")),
-        "started_at": datetime.fromtimestamp(session.get("start_time", time.time())),
+        "transcript": session.history.to_list(),
+        "has_resume": session.has_resume,
+        "has_job_description": session.has_job_description,
+        "started_at": datetime.fromtimestamp(session.start_time),
         "ended_at": datetime.utcnow(),
-        "duration_seconds": int(time.time() - session.get("start_time", time.time())),
+        "duration_seconds": int(time.time() - session.start_time),
         "status": "completed"
     }
     
     result = await create_interview_db(interview_data)
     
     # Update session to mark as saved
-    interview_sessions[session_id]["user_id"] = current_user["_id"]
+    def apply(stored: InterviewState):
+        stored.user_id = current_user["_id"]
+    
+    await session_store.update(session_id, apply, session)
     
     return {"success": True, "message": "Interview saved successfully", "interview_id": result["_id"]}
 
@@ -2069,22 +2955,20 @@ async def get_user_dashboard(current_user: dict = Depends(get_current_user_requi
 
 # ============== FEEDBACK & COACHING ENDPOINTS ==============
 
-@app.post("/interview/{session_id}/question-feedback")
-async def get_question_feedback(session_id: str):
-    """Generate detailed feedback for each question-answer pair"""
-    
-    if session_id not in interview_sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    session = interview_sessions[session_id]
-    history = session["history"]
-    scores = session.get("scores", [])
+# Feedback fan-out: how many completions run at once, and how long each may take
+FEEDBACK_CONCURRENCY = int(os.getenv("FEEDBACK_CONCURRENCY", "8"))
+FEEDBACK_TIMEOUT_SECONDS = float(os.getenv("FEEDBACK_TIMEOUT_SECONDS", "20"))
+
+
+def extract_qa_pairs(session: InterviewState) -> list:
+    """Pair each interviewer question with the candidate's answer and its score"""
+    scores = session.score_list()
     
     qa_pairs = []
     current_question = None
     score_index = 0
     
-    for msg in history:
+    for msg in session.history:
         if msg["role"] == "assistant":
             question = re.sub(r'\s*\[SCORE:\s*\d+/10\]', '', msg["content"]).strip()
             current_question = question
@@ -2099,10 +2983,12 @@ async def get_question_feedback(session_id: str):
             score_index += 1
             current_question = None
     
-    detailed_feedback = []
-    
-    for qa in qa_pairs[:5]:  # Limit to first 5 for performance
-        feedback_prompt = f"""Analyze this interview Q&A briefly:
+    return qa_pairs
+
+
+async def generate_qa_feedback(qa: dict, semaphore: asyncio.Semaphore) -> dict:
+    """Generate feedback for one Q&A pair, never raising"""
+    feedback_prompt = f"""Analyze this interview Q&A briefly:
 
 QUESTION: {qa['question']}
 ANSWER: {qa['answer']}
@@ -2110,26 +2996,92 @@ SCORE: {qa['score']}/10
 
 Give 2-3 sentences of feedback and suggest a better answer in 2-3 sentences."""
 
+    timed_out = False
+    served_by = None
+    async with semaphore:
         try:
-            completion = client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[{"role": "user", "content": feedback_prompt}],
-                temperature=0.5,
-                max_tokens=200
+            feedback, served = await asyncio.wait_for(
+                routed_chat(
+                    "feedback",
+                    messages=[{"role": "user", "content": feedback_prompt}],
+                    temperature=0.5,
+                    max_tokens=200
+                ),
+                timeout=FEEDBACK_TIMEOUT_SECONDS
             )
-            feedback = completion.choices[0].message.content
-        except:
+            served_by = served["served_by"]
+        except asyncio.TimeoutError:
+            feedback = "Feedback is taking too long for this question. Please try again."
+            timed_out = True
+        except Exception:
             feedback = "Unable to generate feedback."
+    
+    return {
+        **qa,
+        "feedback": feedback,
+        "timed_out": timed_out,
+        "served_by": served_by
+    }
+
+
+@app.post("/interview/{session_id}/question-feedback")
+async def get_question_feedback(session_id: str, stream: bool = False, async_job: bool = False):
+    """
+    Generate detailed feedback for every question-answer pair.
+    
+    All pairs are analyzed concurrently (bounded by FEEDBACK_CONCURRENCY), so
+    wall time is roughly one completion. Pairs that exceed the per-call timeout
+    come back with a placeholder and timed_out=True instead of failing the request.
+    With ?stream=true each pair is sent as an SSE "feedback" event as soon as it
+    completes, followed by a "done" event. With ?async_job=true the whole
+    batch runs as a background job (202 + /jobs/{id}).
+    """
+    
+    session = await load_session(session_id)
+    
+    if async_job:
+        return accepted_job(
+            "question_feedback",
+            lambda: get_question_feedback(session_id),
+            key=f"feedback:{session_id}:{len(session.history)}"
+        )
+    
+    qa_pairs = extract_qa_pairs(session)
+    semaphore = asyncio.Semaphore(FEEDBACK_CONCURRENCY)
+    
+    if stream:
+        async def event_stream():
+            tasks = [asyncio.create_task(generate_qa_feedback(qa, semaphore)) for qa in qa_pairs]
+            try:
+                timed_out = 0
+                for next_done in asyncio.as_completed(tasks):
+                    item = await next_done
+                    timed_out += item["timed_out"]
+                    yield sse_event("feedback", item)
+                yield sse_event("done", {
+                    "session_id": session_id,
+                    "total_questions": len(qa_pairs),
+                    "partial": timed_out > 0
+                })
+            finally:
+                for task in tasks:
+                    task.cancel()
         
-        detailed_feedback.append({
-            **qa,
-            "feedback": feedback
-        })
+        return StreamingResponse(
+            event_stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
+    detailed_feedback = await asyncio.gather(*[
+        generate_qa_feedback(qa, semaphore) for qa in qa_pairs
+    ])
     
     return {
         "session_id": session_id,
         "feedback": detailed_feedback,
-        "total_questions": len(qa_pairs)
+        "total_questions": len(qa_pairs),
+        "partial": any(item["timed_out"] for item in detailed_feedback)
     }
 
 
@@ -2137,20 +3089,17 @@ Give 2-3 sentences of feedback and suggest a better answer in 2-3 sentences."""
 async def get_coaching_tips(session_id: str):
     """Generate personalized coaching based on interview performance"""
     
-    if session_id not in interview_sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    session = interview_sessions[session_id]
-    history = session["history"]
-    scores = session.get("scores", [])
+    session = await load_session(session_id)
+    history = session.history
+    scores = session.score_list()
     
     avg_score = sum(scores) / len(scores) if scores else 0
     
-    coaching_prompt = f"""Based on this {session.get('topic_name', 'technical')} interview:
+    coaching_prompt = f"""Based on this {session.topic_name} interview:
 
 Average score: {avg_score:.1f}/10
-Total questions: {session['question_count']}
-Difficulty: {session['difficulty']}
+Total questions: {session.question_count}
+Difficulty: {session.difficulty}
 
 Recent responses:
 {chr(10).join([f"- {msg['content'][:100]}..." for msg in history[-6:] if msg['role'] == 'user'])}
@@ -2158,13 +3107,12 @@ Recent responses:
 Provide 3 specific, actionable coaching tips to improve performance."""
 
     try:
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
+        coaching, _ = await routed_chat(
+            "coaching",
             messages=[{"role": "user", "content": coaching_prompt}],
             temperature=0.5,
             max_tokens=300
         )
-        coaching = completion.choices[0].message.content
     except:
         coaching = "Keep practicing and focus on clear, structured answers."
     
@@ -2172,7 +3120,7 @@ Provide 3 specific, actionable coaching tips to improve performance."""
         "session_id": session_id,
         "coaching": coaching,
         "average_score": round(avg_score, 1),
-        "questions_analyzed": session["question_count"]
+        "questions_analyzed": session.question_count
     }
 
 
@@ -2210,7 +3158,8 @@ async def get_global_stats():
 async def export_interview_report(session_id: str):
     """Generate exportable interview report"""
     
-    if session_id not in interview_sessions:
+    session = await session_store.get(session_id)
+    if session is None:
         # Check database for completed interview
         interview = await get_interview_by_session_id(session_id)
         if not interview:
@@ -2228,19 +3177,18 @@ async def export_interview_report(session_id: str):
             }
         }
     
-    session = interview_sessions[session_id]
-    scores = session.get("scores", [])
+    scores = session.score_list()
     
     return {
         "session_id": session_id,
         "report": {
-            "topic": session.get("topic_name", session["topic"]),
-            "company_style": session.get("company_name", "Standard"),
-            "difficulty": session["difficulty"],
-            "total_questions": session["question_count"],
+            "topic": session.topic_name,
+            "company_style": session.company_name,
+            "difficulty": session.difficulty,
+            "total_questions": session.question_count,
             "average_score": round(sum(scores) / len(scores), 1) if scores else None,
             "scores": scores,
-            "transcript": session["history"]
+            "transcript": session.history.to_list()
         }
     }
 
@@ -0,0 +1,250 @@
+"""
+Model routing for AI Interviewer
+Picks the STT/LLM model per call from the workload shape and reports latency and estimated cost per route
+"""
+
+import os
+import json
+from typing import Optional, Dict, Any, List, Tuple, Union, AsyncIterator
+from dotenv import load_dotenv
+
+from governor import estimate_request_tokens
+from latency import resilient_chat, resilient_chat_stream, resilient_transcribe
+
+# Load environment variables
+load_dotenv()
+
+ROUTER_HEAVY_CHAT_MODEL = os.getenv("ROUTER_HEAVY_CHAT_MODEL", "llama-3.3-70b-versatile")
+ROUTER_FAST_CHAT_MODEL = os.getenv("ROUTER_FAST_CHAT_MODEL", "llama-3.1-8b-instant")
+ROUTER_ACCURATE_STT_MODEL = os.getenv("ROUTER_ACCURATE_STT_MODEL", "whisper-large-v3")
+ROUTER_FAST_STT_MODEL = os.getenv("ROUTER_FAST_STT_MODEL", "whisper-large-v3-turbo")
+
+# Routes that get the heavy model unless pinned (they score answers or write the final report)
+ROUTER_HEAVY_ROUTES = set(filter(None, os.getenv(
+    "ROUTER_HEAVY_ROUTES", "analyze.llm,stream.llm,video.llm,resume.parse,summary"
+).split(",")))
+# Routes that always get the fast model (short, low-stakes text)
+ROUTER_FAST_ROUTES = set(filter(None, os.getenv(
+    "ROUTER_FAST_ROUTES", "job.analyze,coaching"
+).split(",")))
+# Other routes go to the fast model when their output is at most this many tokens
+ROUTER_SMALL_MAX_TOKENS = int(os.getenv("ROUTER_SMALL_MAX_TOKENS", "250"))
+# Languages the fast chat model / turbo STT handle well enough; others get the heavy models
+ROUTER_FAST_LANGUAGES = set(filter(None, os.getenv("ROUTER_FAST_LANGUAGES", "en").split(",")))
+# Clips up to this long use turbo STT in any language (accuracy gap is small on short answers)
+ROUTER_STT_SHORT_SECONDS = float(os.getenv("ROUTER_STT_SHORT_SECONDS", "8"))
+# Browser MediaRecorder webm/opus is ~32 kbps; used to estimate duration without decoding
+ROUTER_AUDIO_BYTES_PER_SECOND = int(os.getenv("ROUTER_AUDIO_BYTES_PER_SECOND", "4000"))
+
+# Approximate list prices in USD: chat per 1M tokens (input, output), STT per audio hour.
+# Override with ROUTER_PRICES='{"llama-3.3-70b-versatile": {"input": 0.59, "output": 0.79}}'
+DEFAULT_MODEL_PRICES = {
+    "llama-3.3-70b-versatile": {"input": 0.59, "output": 0.79},
+    "llama-3.1-8b-instant": {"input": 0.05, "output": 0.08},
+    "whisper-large-v3": {"hour": 0.111},
+    "whisper-large-v3-turbo": {"hour": 0.04}
+}
+
+
+def _load_prices() -> Dict[str, dict]:
+    prices = dict(DEFAULT_MODEL_PRICES)
+    raw = os.getenv("ROUTER_PRICES", "")
+    if raw:
+        try:
+            prices.update(json.loads(raw))
+        except (json.JSONDecodeError, TypeError, ValueError) as e:
+            print(f"⚠️ Ignoring invalid ROUTER_PRICES: {e}")
+    return prices
+
+
+MODEL_PRICES = _load_prices()
+
+# Per-route call counts, latency and estimated cost, exposed through /metrics
+route_usage: Dict[str, dict] = {}
+
+
+# ============== ROUTING DECISIONS ==============
+
+def choose_chat_model(
+    route: str,
+    max_tokens: int,
+    difficulty: Optional[str] = None,
+    language: Optional[str] = None
+) -> Tuple[str, str]:
+    """Pick a chat model for a call; returns (model, reason)"""
+    if route in ROUTER_HEAVY_ROUTES:
+        return ROUTER_HEAVY_CHAT_MODEL, "heavy_route"
+    if route in ROUTER_FAST_ROUTES:
+        return ROUTER_FAST_CHAT_MODEL, "fast_route"
+    if language and language not in ROUTER_FAST_LANGUAGES:
+        return ROUTER_HEAVY_CHAT_MODEL, "language"
+    if difficulty == "hard":
+        return ROUTER_HEAVY_CHAT_MODEL, "difficulty"
+    if max_tokens <= ROUTER_SMALL_MAX_TOKENS:
+        return ROUTER_FAST_CHAT_MODEL, "short_output"
+    return ROUTER_HEAVY_CHAT_MODEL, "long_output"
+
+
+def estimate_audio_seconds(audio_bytes: int) -> float:
+    """Rough clip duration from its compressed size"""
+    return audio_bytes / max(1, ROUTER_AUDIO_BYTES_PER_SECOND)
+
+
+def choose_stt_model(audio_seconds: float, language: Optional[str] = None) -> Tuple[str, str]:
+    """Pick a Whisper model for a clip; returns (model, reason)"""
+    if audio_seconds <= ROUTER_STT_SHORT_SECONDS:
+        return ROUTER_FAST_STT_MODEL, "short_audio"
+    if not language or language in ROUTER_FAST_LANGUAGES:
+        return ROUTER_FAST_STT_MODEL, "language"
+    return ROUTER_ACCURATE_STT_MODEL, "long_multilingual"
+
+
+# ============== COST & USAGE ==============
+
+def estimate_chat_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimated USD for one chat call"""
+    price = MODEL_PRICES.get(model, {})
+    return (prompt_tokens * price.get("input", 0) + completion_tokens * price.get("output", 0)) / 1_000_000
+
+
+def estimate_stt_cost(model: str, audio_seconds: float) -> float:
+    """Estimated USD for one transcription (Groq bills at least 10s per request)"""
+    return max(audio_seconds, 10) / 3600 * MODEL_PRICES.get(model, {}).get("hour", 0)
+
+
+def _record(route: str, reason: str, served: dict, cost: float):
+    usage = route_usage.get(route)
+    if usage is None:
+        usage = {"calls": 0, "latency_ms_total": 0.0, "cost_usd": 0.0, "models": {}, "reasons": {}}
+        route_usage[route] = usage
+    usage["calls"] += 1
+    usage["latency_ms_total"] += served["latency_ms"]
+    usage["cost_usd"] += cost
+    served_model = served["served_by"]
+    usage["models"][served_model] = usage["models"].get(served_model, 0) + 1
+    usage["reasons"][reason] = usage["reasons"].get(reason, 0) + 1
+
+
+# ============== ROUTED CALLS ==============
+
+async def routed_chat(
+    route: str,
+    messages: List[Dict[str, Any]],
+    temperature: float = 0.7,
+    max_tokens: int = 200,
+    difficulty: Optional[str] = None,
+    language: Optional[str] = None,
+    model: Optional[str] = None
+) -> Tuple[str, dict]:
+    """
+    Chat completion on the model the router picks for this workload (or the
+    pinned model, if given). Returns (text, served) with the routing decision
+    and estimated cost added to the served record.
+    """
+    if model:
+        reason = "pinned"
+    else:
+        model, reason = choose_chat_model(route, max_tokens, difficulty, language)
+
+    text, served = await resilient_chat(
+        route, messages=messages, model=model, temperature=temperature, max_tokens=max_tokens
+    )
+    prompt_tokens = estimate_request_tokens(messages)
+    cost = estimate_chat_cost(served["served_by"], prompt_tokens, len(text) // 4 + 1)
+    _record(route, reason, served, cost)
+    return text, {**served, "routed_to": model, "route_reason": reason, "est_cost_usd": round(cost, 6)}
+
+
+async def routed_chat_stream(
+    route: str,
+    messages: List[Dict[str, Any]],
+    temperature: float = 0.7,
+    max_tokens: int = 200,
+    difficulty: Optional[str] = None,
+    language: Optional[str] = None,
+    model: Optional[str] = None
+) -> Tuple[AsyncIterator[str], dict]:
+    """
+    Streaming routed_chat: returns (tokens, served). The call is recorded
+    and est_cost_usd added to served once the stream has been consumed
+    (or closed early), when the reply length is known.
+    """
+    if model:
+        reason = "pinned"
+    else:
+        model, reason = choose_chat_model(route, max_tokens, difficulty, language)
+
+    tokens, served = await resilient_chat_stream(
+        route, messages=messages, model=model, temperature=temperature, max_tokens=max_tokens
+    )
+    served = {**served, "routed_to": model, "route_reason": reason}
+    prompt_tokens = estimate_request_tokens(messages)
+
+    async def recorded() -> AsyncIterator[str]:
+        length = 0
+        try:
+            async for token in tokens:
+                length += len(token)
+                yield token
+        finally:
+            await tokens.aclose()
+            cost = estimate_chat_cost(served["served_by"], prompt_tokens, length // 4 + 1)
+            _record(route, reason, served, cost)
+            served["est_cost_usd"] = round(cost, 6)
+
+    return recorded(), served
+
+
+async def routed_transcribe(
+    route: str,
+    file: Union[tuple, bytes],
+    audio_bytes: int,
+    language: Optional[str] = None,
+    temperature: Optional[float] = None,
+    model: Optional[str] = None,
+    audio_seconds: Optional[float] = None
+) -> Tuple[str, dict]:
+    """
+    Whisper transcription on the model the router picks for this clip; returns
+    (text, served). audio_seconds, when known, replaces the size-based estimate.
+    """
+    if audio_seconds is None:
+        audio_seconds = estimate_audio_seconds(audio_bytes)
+    if model:
+        reason = "pinned"
+    else:
+        model, reason = choose_stt_model(audio_seconds, language)
+
+    # Whichever Whisper model was not picked serves as the fallback
+    fallback = ROUTER_ACCURATE_STT_MODEL if model == ROUTER_FAST_STT_MODEL else ROUTER_FAST_STT_MODEL
+    text, served = await resilient_transcribe(
+        route, file=file, model=model, language=language, temperature=temperature, fallback_model=fallback
+    )
+    cost = estimate_stt_cost(served["served_by"], audio_seconds)
+    _record(route, reason, served, cost)
+    return text, {
+        **served,
+        "routed_to": model,
+        "route_reason": reason,
+        "audio_seconds_est": round(audio_seconds, 1),
+        "est_cost_usd": round(cost, 6)
+    }
+
+
+def routing_metrics_report() -> dict:
+    """Per-route model mix, average latency and estimated spend"""
+    routes = {}
+    for route, usage in route_usage.items():
+        routes[route] = {
+            "calls": usage["calls"],
+            "avg_latency_ms": round(usage["latency_ms_total"] / usage["calls"], 1),
+            "cost_usd": round(usage["cost_usd"], 6),
+            "models": usage["models"],
+            "reasons": usage["reasons"]
+        }
+    return {
+        "heavy_chat_model": ROUTER_HEAVY_CHAT_MODEL,
+        "fast_chat_model": ROUTER_FAST_CHAT_MODEL,
+        "total_cost_usd": round(sum(u["cost_usd"] for u in route_usage.values()), 6),
+        "routes": routes
+    }
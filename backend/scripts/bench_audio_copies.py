@@ -0,0 +1,104 @@
+"""
+Benchmark: bytes copied per interview turn on the audio upload path
+
+The old /analyze and /video/analyze handlers copied the upload spool to
+temp_audio_{session}.webm, reopened it, read it back and deleted it. The new
+path reads the spool once with read_audio_upload() and hands those bytes to
+Whisper. This counts the bytes each path moves and times TURNS turns. Wall
+time on a warm page cache is similar either way; the difference is that the
+old path did all of its disk I/O synchronously on the event loop.
+
+Usage (from backend/):
+    python scripts/bench_audio_copies.py [AUDIO_KB] [TURNS]
+"""
+
+import io
+import os
+import sys
+import time
+import shutil
+import asyncio
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+from starlette.datastructures import UploadFile
+from main import read_audio_upload
+
+
+class CountingFile(io.RawIOBase):
+    """File wrapper that counts bytes read from and written to it"""
+
+    def __init__(self, raw, counter: dict):
+        self.raw = raw
+        self.counter = counter
+
+    def readable(self):
+        return True
+
+    def writable(self):
+        return True
+
+    def read(self, size=-1):
+        data = self.raw.read(size)
+        self.counter["copied"] += len(data)
+        return data
+
+    def write(self, data):
+        self.counter["copied"] += len(data)
+        return self.raw.write(data)
+
+
+def make_upload(payload: bytes) -> UploadFile:
+    """Same spool starlette builds for a multipart upload (in memory up to 1 MB)"""
+    spool = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    spool.write(payload)
+    spool.seek(0)
+    return UploadFile(file=spool, filename="answer.webm", size=len(payload))
+
+
+async def old_path(upload: UploadFile, counter: dict, workdir: str) -> bytes:
+    temp_filename = os.path.join(workdir, "temp_audio_bench.webm")
+    with open(temp_filename, "wb") as buffer:
+        # CountingFile counts the temp-file write; add the spool read that fed it
+        shutil.copyfileobj(upload.file, CountingFile(buffer, counter))
+        counter["copied"] += buffer.tell()
+    with open(temp_filename, "rb") as audio_file:
+        data = CountingFile(audio_file, counter).read()
+    os.remove(temp_filename)
+    return data
+
+
+async def new_path(upload: UploadFile, counter: dict, workdir: str) -> bytes:
+    data = await read_audio_upload(upload)
+    counter["copied"] += len(data)
+    return data
+
+
+async def run(path, payload: bytes, turns: int, workdir: str):
+    counter = {"copied": 0}
+    started = time.perf_counter()
+    for _ in range(turns):
+        data = await path(make_upload(payload), counter, workdir)
+        assert data == payload
+    return counter["copied"] / turns, (time.perf_counter() - started) / turns
+
+
+def main():
+    audio_kb = int(sys.argv[1]) if len(sys.argv) > 1 else 480
+    turns = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    payload = os.urandom(audio_kb * 1024)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        old_bytes, old_time = asyncio.run(run(old_path, payload, turns, workdir))
+        new_bytes, new_time = asyncio.run(run(new_path, payload, turns, workdir))
+
+    print(f"{turns} turns of {audio_kb} KB audio (bytes copied per turn, excluding the Whisper upload)")
+    print(f"  temp file  : {old_bytes / 1024:8.0f} KB  {old_time * 1000:6.2f} ms/turn")
+    print(f"  spool read : {new_bytes / 1024:8.0f} KB  {new_time * 1000:6.2f} ms/turn")
+    print(f"  saved      : {(old_bytes - new_bytes) / 1024:8.0f} KB  ({old_bytes / max(new_bytes, 1):.1f}x fewer bytes)")
+
+
+if __name__ == "__main__":
+    main()
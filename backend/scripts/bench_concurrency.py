@@ -0,0 +1,85 @@
+"""
+Benchmark: concurrent interviews against the Groq integration layer
+
+Fires N simultaneous /job/analyze requests at the app with a fake Groq client
+that takes LATENCY seconds per completion. With the old blocking client each
+call froze the event loop, so wall time was N * LATENCY. With the async client
+the calls overlap and wall time stays close to a single LATENCY.
+
+Usage (from backend/):
+    python scripts/bench_concurrency.py [N] [LATENCY]
+"""
+
+import os
+import sys
+import time
+import asyncio
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+import httpx
+import groq_client
+from main import app
+
+
+def _completion(text):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+
+class AsyncFakeCompletions:
+    """Fake AsyncGroq completions: awaits, so the event loop keeps serving"""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    async def create(self, **kwargs):
+        await asyncio.sleep(self.latency)
+        return _completion("ok")
+
+
+class BlockingFakeCompletions:
+    """Reproduces the old behaviour: a sync call made inside an async handler"""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    async def create(self, **kwargs):
+        time.sleep(self.latency)
+        return _completion("ok")
+
+
+def _fake_client(completions):
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+
+async def run(n: int, completions) -> float:
+    groq_client.client = _fake_client(completions)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        started = time.perf_counter()
+        responses = await asyncio.gather(*[
+            http.post("/job/analyze", data={"job_description": f"Backend engineer #{i}"})
+            for i in range(n)
+        ])
+        elapsed = time.perf_counter() - started
+    assert all(r.status_code == 200 for r in responses)
+    return elapsed
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+
+    blocking = asyncio.run(run(n, BlockingFakeCompletions(latency)))
+    non_blocking = asyncio.run(run(n, AsyncFakeCompletions(latency)))
+
+    print(f"{n} concurrent interviews, {latency:.2f}s per completion")
+    print(f"  blocking client : {blocking:6.2f}s  (serialized)")
+    print(f"  async client    : {non_blocking:6.2f}s  (overlapped)")
+    print(f"  speedup         : {blocking / non_blocking:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark: /video/expression metrics, full recompute vs running totals
+
+Feeds SAMPLES expression samples into one session the way the endpoint does
+and times the metrics update after each one: the old code re-summed the whole
+series (averages, emotion distribution, first-half/second-half trend) on every
+sample, ExpressionSeries keeps running totals. Reports the per-sample cost at
+a few points and the total for the interview, and checks that the averages
+and emotion distribution agree.
+
+Usage (from backend/):
+    python scripts/bench_expression_stats.py [SAMPLES] [RUNS]
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from session_state import ExpressionSeries
+
+EMOTIONS = ["neutral", "happy", "confused", "focused", "nervous"]
+POSTURES = ["upright", "leaning", "unknown"]
+
+
+def make_samples(count: int, seed: int = 7) -> list:
+    """A drifting confidence signal, so the trend has something to find"""
+    rng = random.Random(seed)
+    return [
+        {
+            "confidence": round(min(100, max(0, 40 + 30 * i / count + rng.gauss(0, 12))), 1),
+            "eyeContact": round(rng.uniform(10, 90), 1),
+            "emotion": rng.choice(EMOTIONS),
+            "engagement": round(rng.uniform(30, 95), 1),
+            "posture": rng.choice(POSTURES),
+            "timestamp": 1_700_000_000_000 + i * 500
+        }
+        for i in range(count)
+    ]
+
+
+def recompute_metrics(series: ExpressionSeries) -> dict:
+    """What record_expression_data did before the running totals (O(n) per sample)"""
+    total = len(series)
+    metrics = {
+        "avg_confidence": round(sum(series.confidence) / total, 1),
+        "avg_eye_contact": round(sum(series.eye_contact) / total, 1),
+        "avg_engagement": round(sum(series.engagement) / total, 1)
+    }
+    emotion_counts = {}
+    for code in series.emotions:
+        emotion_counts[code] = emotion_counts.get(code, 0) + 1
+    metrics["emotion_distribution"] = {series.label(k): round(v / total * 100, 1) for k, v in emotion_counts.items()}
+    metrics["confidence_trend"] = "stable"
+    if total >= 10:
+        mid = total // 2
+        first_half_avg = sum(series.confidence[:mid]) / mid
+        second_half_avg = sum(series.confidence[mid:]) / (total - mid)
+        if second_half_avg > first_half_avg + 10:
+            metrics["confidence_trend"] = "improving"
+        elif second_half_avg < first_half_avg - 10:
+            metrics["confidence_trend"] = "declining"
+    return metrics
+
+
+def run(samples: list, update) -> tuple:
+    """(total ms, ms per sample at each checkpoint, final metrics)"""
+    series = ExpressionSeries()
+    checkpoints = {1000, 5000, len(samples)}
+    at = {}
+    metrics = None
+    started = time.perf_counter()
+    for i, sample in enumerate(samples, 1):
+        before = time.perf_counter()
+        series.append(sample)
+        metrics = update(series)
+        if i in checkpoints:
+            at[i] = (time.perf_counter() - before) * 1000
+    return (time.perf_counter() - started) * 1000, at, metrics
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    samples = make_samples(count)
+
+    results = {}
+    for name, update in (("recompute", recompute_metrics), ("running totals", ExpressionSeries.metrics)):
+        best = min((run(samples, update) for _ in range(runs)), key=lambda result: result[0])
+        results[name] = best
+
+    print(f"{count} expression samples in one session (best of {runs})")
+    for name, (total_ms, at, _) in results.items():
+        points = "  ".join(f"@{i}: {ms * 1000:7.1f} us" for i, ms in sorted(at.items()))
+        print(f"  {name:15s}: {total_ms:9.1f} ms total  {total_ms * 1000 / count:8.1f} us/sample avg  {points}")
+    print(f"  speedup        : {results['recompute'][0] / max(results['running totals'][0], 1e-9):.0f}x over the interview")
+
+    old, new = results["recompute"][2], results["running totals"][2]
+    same = all(old[key] == new[key] for key in ("avg_confidence", "avg_eye_contact", "avg_engagement", "emotion_distribution"))
+    print(f"  averages and emotion distribution match: {same}")
+    print(f"  trend: half-split {old['confidence_trend']}, EWMA {new['confidence_trend']}")
+
+
+if __name__ == "__main__":
+    main()
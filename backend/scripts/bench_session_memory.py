@@ -0,0 +1,124 @@
+"""
+Benchmark: memory per active interview session, nested dicts vs InterviewState
+
+Builds N sessions of a finished-looking video interview (ANSWERS answers,
+SAMPLES expression samples) in the old layout (a dict of lists of dicts) and
+as InterviewState, and measures each with tracemalloc. Both layouts hold the
+same text, so the difference is the per-message and per-sample overhead.
+Also times the round trip through the JSON the Redis store writes.
+
+Usage (from backend/):
+    python scripts/bench_session_memory.py [N] [ANSWERS] [SAMPLES]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from context_window import new_context_state
+from assessment import new_assessment_state
+from session_state import InterviewState, new_video_metrics
+
+EMOTIONS = ["neutral", "happy", "confused", "focused", "nervous"]
+POSTURES = ["upright", "leaning", "unknown"]
+
+
+def make_text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(["hash", "map", "cache", "latency", "queue", "index", "thread"]) for _ in range(words))
+
+
+def make_samples(rng: random.Random, count: int) -> list:
+    return [
+        {
+            "confidence": round(rng.uniform(20, 95), 1),
+            "eyeContact": round(rng.uniform(10, 90), 1),
+            "emotion": rng.choice(EMOTIONS),
+            "engagement": round(rng.uniform(30, 95), 1),
+            "posture": rng.choice(POSTURES),
+            "timestamp": 1_700_000_000_000 + i * 2000
+        }
+        for i in range(count)
+    ]
+
+
+def dict_session(seed: int, answers: int, samples: int) -> dict:
+    """The layout sessions had before InterviewState"""
+    rng = random.Random(seed)
+    history = [{"role": "assistant", "content": make_text(rng, 40)}]
+    for _ in range(answers):
+        history.append({"role": "user", "content": make_text(rng, 90)})
+        history.append({"role": "assistant", "content": make_text(rng, 50)})
+    return {
+        "topic": "system_design", "topic_name": "System Design", "difficulty": "medium",
+        "company_style": "default", "company_name": "Standard", "system_prompt": make_text(rng, 400),
+        "history": history, "scores": [rng.randint(3, 9) for _ in range(answers)],
+        "question_count": answers + 1, "enable_tts": True, "current_difficulty_adjustment": 0,
+        "start_time": time.time(), "duration_minutes": 30, "has_resume": False,
+        "has_job_description": False, "user_id": None, "mode": "video", "language": "en",
+        "whisper_lang": "en", "context": new_context_state(), "assessment": new_assessment_state(),
+        "expression_history": make_samples(rng, samples), "video_metrics": new_video_metrics(),
+        "_version": answers * 2
+    }
+
+
+def slotted_session(seed: int, answers: int, samples: int) -> InterviewState:
+    rng = random.Random(seed)
+    state = InterviewState(
+        topic="system_design", topic_name="System Design", system_prompt=make_text(rng, 400),
+        question_count=answers + 1, start_time=time.time(), mode="video", version=answers * 2
+    )
+    state.history.append({"role": "assistant", "content": make_text(rng, 40)})
+    for _ in range(answers):
+        state.history.append({"role": "user", "content": make_text(rng, 90)})
+        state.history.append({"role": "assistant", "content": make_text(rng, 50)})
+    for _ in range(answers):
+        state.scores.append(rng.randint(3, 9))
+    for sample in make_samples(rng, samples):
+        state.expressions.append(sample)
+    return state
+
+
+def measure(build, count: int, answers: int, samples: int):
+    """(bytes per session, the sessions) - tracemalloc counts everything the builder keeps"""
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    sessions = [build(seed, answers, samples) for seed in range(count)]
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return used / count, sessions
+
+
+def time_round_trip(dump, load, sessions: list) -> tuple:
+    """(ms per session, serialized bytes per session) for a JSON dump + load"""
+    started = time.perf_counter()
+    size = 0
+    for session in sessions:
+        data = json.dumps(dump(session), separators=(",", ":"))
+        size += len(data)
+        load(json.loads(data))
+    return (time.perf_counter() - started) * 1000 / len(sessions), size / len(sessions)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    answers = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    samples = int(sys.argv[3]) if len(sys.argv) > 3 else 900
+
+    dict_bytes, dicts = measure(dict_session, count, answers, samples)
+    slot_bytes, states = measure(slotted_session, count, answers, samples)
+    dict_ms, dict_size = time_round_trip(lambda s: s, lambda d: d, dicts)
+    slot_ms, slot_size = time_round_trip(InterviewState.to_dict, InterviewState.from_dict, states)
+
+    print(f"{count} sessions, {answers} answers and {samples} expression samples each")
+    print(f"  nested dicts   : {dict_bytes / 1024:8.1f} KB/session  JSON {dict_size / 1024:7.1f} KB  {dict_ms:6.3f} ms round trip")
+    print(f"  InterviewState : {slot_bytes / 1024:8.1f} KB/session  JSON {slot_size / 1024:7.1f} KB  {slot_ms:6.3f} ms round trip")
+    print(f"  saved          : {(dict_bytes - slot_bytes) / 1024:8.1f} KB/session  ({dict_bytes / max(slot_bytes, 1):.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
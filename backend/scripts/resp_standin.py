@@ -0,0 +1,176 @@
+"""
+Local stand-in for Redis: a tiny in-memory RESP2 server
+
+Implements only what RedisSessionStore uses (HSET/HGET/HMGET, DEL, EXISTS,
+EXPIRE, SCAN, WATCH/UNWATCH/MULTI/EXEC/DISCARD, PING, AUTH, SELECT) with real
+WATCH semantics, so the session store and its optimistic concurrency can be
+tested without a Redis server. Not for production use.
+
+Usage (from backend/):
+    python scripts/resp_standin.py [PORT]
+    SESSION_STORE=redis SESSION_REDIS_URL=redis://127.0.0.1:PORT/0 uvicorn main:app --workers 4
+"""
+
+import sys
+import time
+import fnmatch
+import asyncio
+from typing import Dict, Any, List, Optional
+
+
+class StandinState:
+    """Keyspace shared by all client connections"""
+
+    def __init__(self):
+        self.hashes: Dict[bytes, Dict[bytes, bytes]] = {}
+        self.expires: Dict[bytes, float] = {}
+        # Bumped on every write to a key; WATCH remembers the value it saw
+        self.revisions: Dict[bytes, int] = {}
+
+    def _expire_if_due(self, key: bytes):
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self.hashes.pop(key, None)
+            self.expires.pop(key, None)
+            self.touch(key)
+
+    def lookup(self, key: bytes) -> Optional[Dict[bytes, bytes]]:
+        self._expire_if_due(key)
+        return self.hashes.get(key)
+
+    def touch(self, key: bytes):
+        self.revisions[key] = self.revisions.get(key, 0) + 1
+
+
+def encode(value: Any) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, Exception):
+        return b"-ERR %s\r\n" % str(value).encode()
+    if isinstance(value, str):
+        return b"+%s\r\n" % value.encode()
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(encode(item) for item in value)
+    raise TypeError(type(value))
+
+
+async def read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        return line.strip().split()
+    args = []
+    for _ in range(int(line[1:-2])):
+        length = int((await reader.readline())[1:-2])
+        args.append((await reader.readexactly(length + 2))[:-2])
+    return args
+
+
+def run_command(state: StandinState, name: str, args: List[bytes]) -> Any:
+    if name == "PING":
+        return "PONG"
+    if name in ("AUTH", "SELECT"):
+        return "OK"
+    if name == "HSET":
+        key = args[0]
+        state._expire_if_due(key)
+        fields = state.hashes.setdefault(key, {})
+        added = 0
+        for field, value in zip(args[1::2], args[2::2]):
+            added += field not in fields
+            fields[field] = value
+        state.touch(key)
+        return added
+    if name == "HGET":
+        fields = state.lookup(args[0])
+        return fields.get(args[1]) if fields else None
+    if name == "HMGET":
+        fields = state.lookup(args[0]) or {}
+        return [fields.get(field) for field in args[1:]]
+    if name == "DEL":
+        removed = 0
+        for key in args:
+            if state.lookup(key) is not None:
+                del state.hashes[key]
+                state.expires.pop(key, None)
+                state.touch(key)
+                removed += 1
+        return removed
+    if name == "EXISTS":
+        return sum(1 for key in args if state.lookup(key) is not None)
+    if name == "EXPIRE":
+        if state.lookup(args[0]) is None:
+            return 0
+        state.expires[args[0]] = time.monotonic() + int(args[1])
+        return 1
+    if name == "SCAN":
+        pattern = "*"
+        if b"MATCH" in [a.upper() for a in args]:
+            pattern = args[[a.upper() for a in args].index(b"MATCH") + 1].decode()
+        keys = [k for k in list(state.hashes) if state.lookup(k) is not None and fnmatch.fnmatchcase(k.decode(), pattern)]
+        return [b"0", keys]
+    return ValueError(f"unknown command '{name}'")
+
+
+async def serve_client(state: StandinState, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    watched: Dict[bytes, int] = {}
+    queued: Optional[List[tuple]] = None
+    try:
+        while True:
+            command = await read_command(reader)
+            if command is None:
+                break
+            name, args = command[0].decode().upper(), command[1:]
+            if name == "WATCH":
+                for key in args:
+                    watched[key] = state.revisions.get(key, 0)
+                reply = "OK"
+            elif name == "UNWATCH":
+                watched.clear()
+                reply = "OK"
+            elif name == "MULTI":
+                queued = []
+                reply = "OK"
+            elif name == "DISCARD":
+                queued, reply = None, "OK"
+                watched.clear()
+            elif name == "EXEC":
+                if queued is None:
+                    reply = ValueError("EXEC without MULTI")
+                elif any(state.revisions.get(k, 0) != rev for k, rev in watched.items()):
+                    reply = None
+                else:
+                    reply = [run_command(state, n, a) for n, a in queued]
+                queued = None
+                watched.clear()
+            elif queued is not None:
+                queued.append((name, args))
+                reply = "QUEUED"
+            else:
+                reply = run_command(state, name, args)
+            writer.write(encode(reply))
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def main(port: int):
+    state = StandinState()
+    server = await asyncio.start_server(lambda r, w: serve_client(state, r, w), "127.0.0.1", port)
+    print(f"RESP stand-in listening on redis://127.0.0.1:{port}/0")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 6379))
+    except KeyboardInterrupt:
+        pass
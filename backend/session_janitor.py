@@ -0,0 +1,197 @@
+"""
+Session janitor for AI Interviewer
+Evicts abandoned interviews (idle TTL, absolute TTL, size budget) and persists the ones worth keeping to MongoDB first
+"""
+
+import os
+import time
+import asyncio
+from datetime import datetime
+from typing import Optional, List
+from dotenv import load_dotenv
+
+from database import create_interview_db, update_interview
+from session_store import session_store
+from session_state import InterviewState
+from expression_timeline import persist_timeline
+
+# Load environment variables
+load_dotenv()
+
+# A session with no request for this long is treated as a closed tab
+SESSION_IDLE_TTL_MINUTES = float(os.getenv("SESSION_IDLE_TTL_MINUTES", "30"))
+# No interview stays active longer than this, however busy
+SESSION_MAX_AGE_HOURS = float(os.getenv("SESSION_MAX_AGE_HOURS", "4"))
+# Global caps; least recently active sessions are evicted first when exceeded (0 disables)
+SESSION_MAX_ACTIVE = int(os.getenv("SESSION_MAX_ACTIVE", "5000"))
+SESSION_MEMORY_BUDGET_MB = float(os.getenv("SESSION_MEMORY_BUDGET_MB", "256"))
+SESSION_JANITOR_INTERVAL_SECONDS = float(os.getenv("SESSION_JANITOR_INTERVAL_SECONDS", "60"))
+# Evicted sessions with at least this many answers are saved as "abandoned" interviews
+SESSION_PERSIST_MIN_ANSWERS = int(os.getenv("SESSION_PERSIST_MIN_ANSWERS", "2"))
+
+# Process-wide totals, exposed through /metrics
+janitor_metrics = {
+    "sweeps": 0,
+    "evicted_idle": 0,
+    "evicted_max_age": 0,
+    "evicted_budget": 0,
+    "persisted": 0,
+    "persist_failures": 0,
+    "skipped_active": 0,
+    "last_sweep_ms": 0.0,
+    "active_sessions": 0,
+    "active_bytes": 0
+}
+
+_janitor_task: Optional[asyncio.Task] = None
+
+
+def answer_count(session: InterviewState) -> int:
+    """Answers the candidate gave (user turns in the history)"""
+    return session.history.count("user")
+
+
+async def persist_abandoned(session_id: str, session: InterviewState):
+    """Save an evicted session as an abandoned interview (idempotent across workers)"""
+    avg_score = session.average_score()
+    record = {
+        "scores": session.score_list(),
+        "average_score": round(avg_score, 1) if avg_score is not None else None,
+        "transcript": session.history.to_list(),
+        "question_count": session.question_count,
+        # No summary call for an abandoned session; the running notes are the closest thing
+        "summary": session.assessment["notes"] or None,
+        "ended_at": datetime.utcnow(),
+        "duration_seconds": int(time.time() - session.start_time),
+        "status": "abandoned"
+    }
+    if session.video_metrics["avg_confidence"]:
+        record["video_metrics"] = session.video_metrics
+
+    # Authenticated interviews already have a document; guests get one here
+    if await update_interview(session_id, record) is None:
+        await create_interview_db({
+            "session_id": session_id,
+            "user_id": session.user_id,
+            "topic": session.topic,
+            "topic_name": session.topic_name,
+            "company_style": session.company_style,
+            "company_name": session.company_name,
+            "difficulty": session.difficulty,
+            "duration_minutes": session.duration_minutes,
+            "has_resume": session.has_resume,
+            "has_job_description": session.has_job_description,
+            "mode": session.mode,
+            **record
+        })
+    await persist_timeline(session_id, session.expressions)
+
+
+async def evict(session_id: str, version: int, reason: str) -> bool:
+    """
+    Persist (if complete enough) and drop one session, unless it was written
+    after the sweep looked at it - then the candidate is back and it stays.
+    """
+    session = await session_store.get(session_id)
+    if session is None:
+        return False
+    if session.version != version:
+        janitor_metrics["skipped_active"] += 1
+        return False
+
+    if answer_count(session) >= SESSION_PERSIST_MIN_ANSWERS:
+        try:
+            await persist_abandoned(session_id, session)
+            janitor_metrics["persisted"] += 1
+        except Exception as e:
+            # Keep the session; a later sweep retries the save
+            janitor_metrics["persist_failures"] += 1
+            print(f"Could not persist abandoned session {session_id}: {e}")
+            return False
+
+    if not await session_store.delete(session_id, version=version):
+        janitor_metrics["skipped_active"] += 1
+        return False
+    janitor_metrics[f"evicted_{reason}"] += 1
+    print(f"🧹 Evicted session {session_id} ({reason})")
+    return True
+
+
+async def sweep() -> dict:
+    """One pass: TTL evictions first, then least recently active until under budget"""
+    started = time.monotonic()
+    now = time.time()
+    entries = await session_store.entries()
+    idle_cutoff = now - SESSION_IDLE_TTL_MINUTES * 60
+    age_cutoff = now - SESSION_MAX_AGE_HOURS * 3600
+
+    remaining: List[dict] = []
+    for entry in entries:
+        if entry["start_time"] and entry["start_time"] < age_cutoff:
+            reason = "max_age"
+        elif entry["last_active"] < idle_cutoff:
+            reason = "idle"
+        else:
+            remaining.append(entry)
+            continue
+        if not await evict(entry["session_id"], entry["version"], reason):
+            remaining.append(entry)
+
+    budget_bytes = SESSION_MEMORY_BUDGET_MB * 1024 * 1024
+    total_bytes = sum(entry["bytes"] for entry in remaining)
+    active = len(remaining)
+    remaining.sort(key=lambda entry: entry["last_active"])
+    for entry in remaining:
+        over_count = SESSION_MAX_ACTIVE > 0 and active > SESSION_MAX_ACTIVE
+        over_bytes = budget_bytes > 0 and total_bytes > budget_bytes
+        if not (over_count or over_bytes):
+            break
+        if await evict(entry["session_id"], entry["version"], "budget"):
+            active -= 1
+            total_bytes -= entry["bytes"]
+
+    janitor_metrics["sweeps"] += 1
+    janitor_metrics["last_sweep_ms"] = round((time.monotonic() - started) * 1000, 1)
+    janitor_metrics["active_sessions"] = active
+    janitor_metrics["active_bytes"] = total_bytes
+    return janitor_report()
+
+
+async def _run():
+    while True:
+        await asyncio.sleep(SESSION_JANITOR_INTERVAL_SECONDS)
+        try:
+            await sweep()
+        except Exception as e:
+            print(f"Session janitor sweep failed: {e}")
+
+
+def start_janitor():
+    """Start the periodic sweep (called from the app lifespan)"""
+    global _janitor_task
+    if _janitor_task is None or _janitor_task.done():
+        _janitor_task = asyncio.create_task(_run())
+
+
+async def stop_janitor():
+    global _janitor_task
+    if _janitor_task is not None:
+        _janitor_task.cancel()
+        try:
+            await _janitor_task
+        except asyncio.CancelledError:
+            pass
+        _janitor_task = None
+
+
+def janitor_report() -> dict:
+    """Eviction counters and the last sweep's view of active sessions"""
+    evicted = janitor_metrics["evicted_idle"] + janitor_metrics["evicted_max_age"] + janitor_metrics["evicted_budget"]
+    return {
+        **janitor_metrics,
+        "evicted_total": evicted,
+        "idle_ttl_minutes": SESSION_IDLE_TTL_MINUTES,
+        "max_age_hours": SESSION_MAX_AGE_HOURS,
+        "max_active": SESSION_MAX_ACTIVE,
+        "memory_budget_mb": SESSION_MEMORY_BUDGET_MB
+    }
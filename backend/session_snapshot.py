@@ -0,0 +1,293 @@
+"""
+Session snapshots for AI Interviewer
+Checkpoints in-memory interview sessions to local journal files (changed turns only) so a restart or rolling deploy does not lose them
+"""
+
+import os
+import json
+import time
+import asyncio
+import threading
+from typing import Optional, Dict, List, Tuple, Set
+from dotenv import load_dotenv
+
+from session_state import InterviewState
+from session_store import session_store, MemorySessionStore
+
+# Load environment variables
+load_dotenv()
+
+# Only the memory store needs this; Redis and MongoDB sessions already outlive the process
+SESSION_SNAPSHOTS = os.getenv("SESSION_SNAPSHOTS", "true").lower() == "true"
+SESSION_SNAPSHOT_DIR = os.getenv("SESSION_SNAPSHOT_DIR", "./data/session_snapshots")
+# At most this much of an interview is lost on a crash (a clean shutdown loses nothing)
+SESSION_SNAPSHOT_INTERVAL_SECONDS = float(os.getenv("SESSION_SNAPSHOT_INTERVAL_SECONDS", "2"))
+# A journal is rewritten as one full record once it holds this many deltas
+SESSION_SNAPSHOT_COMPACT_AFTER = int(os.getenv("SESSION_SNAPSHOT_COMPACT_AFTER", "50"))
+
+# Process-wide totals, exposed through /metrics
+snapshot_metrics = {
+    "checkpoints": 0,
+    "full_records": 0,
+    "delta_records": 0,
+    "bytes_written": 0,
+    "removed": 0,
+    "write_failures": 0,
+    "restored": 0,
+    "restore_failures": 0,
+    "last_checkpoint_ms": 0.0
+}
+
+
+def _revision(session: InterviewState) -> Tuple[int, int, int]:
+    """
+    What a journal record captures: the version, plus how far the context
+    summary and assessment notes reach. Background tasks fold those into the
+    live session in place, before (or, if the write-back fails, without) the
+    save that bumps the version, so the version alone would miss them.
+    """
+    return session.version, session.context["summarized_upto"], session.assessment["assessed_upto"]
+
+
+class SnapshotJournal:
+    """
+    One append-only JSON-lines file per session: a full record, then one
+    delta per checkpoint in which the session changed. Writes happen on a
+    worker thread during normal operation and on the event loop at shutdown;
+    the lock keeps the two from interleaving on the same file.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, session_id: str) -> str:
+        return os.path.join(self.directory, f"{session_id}.jsonl")
+
+    def session_ids(self) -> List[str]:
+        return [name[:-6] for name in os.listdir(self.directory) if name.endswith(".jsonl")]
+
+    def write(self, session_id: str, data: str, rewrite: bool) -> int:
+        """Append JSON lines (or replace the file with them); returns bytes written"""
+        path = self._path(session_id)
+        with self._lock:
+            if rewrite:
+                temp_path = f"{path}.tmp"
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    f.write(data)
+                os.replace(temp_path, path)
+            else:
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(data)
+        return len(data)
+
+    def remove(self, session_id: str):
+        with self._lock:
+            try:
+                os.remove(self._path(session_id))
+            except FileNotFoundError:
+                pass
+
+    def load(self, session_id: str) -> Optional[InterviewState]:
+        """Replay a journal (None if there is none)"""
+        try:
+            with open(self._path(session_id), encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return None
+        session = None
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash mid-append leaves a torn last line; everything before it is good
+                break
+            if record["type"] == "full":
+                session = InterviewState.from_dict(record["data"], record["version"])
+            elif session is not None:
+                session.apply_delta(record)
+        return session
+
+
+class SessionSnapshotter:
+    """
+    Keeps the journal in step with a MemorySessionStore. Each checkpoint
+    writes, per session, only what changed since the last one (see
+    InterviewState.delta); sessions that ended have their journal removed.
+    Journals left by a previous process are restored when their session is
+    first requested, and the rest are loaded in the background after startup.
+    """
+
+    def __init__(self, store: MemorySessionStore, journal: SnapshotJournal):
+        self.store = store
+        self.journal = journal
+        # session_id -> (revision, marks, records in the journal) as last written
+        self._written: Dict[str, Tuple[Tuple[int, int, int], Tuple[int, int, int, int], int]] = {}
+        self._pending: Set[str] = set()
+        self._loading: Dict[str, asyncio.Future] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._restore_task: Optional[asyncio.Task] = None
+        self._writing: Optional[asyncio.Future] = None
+
+    def _collect(self) -> List[tuple]:
+        """
+        (session_id, JSON line, rewrite, new written state) for every session
+        that changed or ended. Serialized here, on the event loop, because the
+        sessions keep changing while the batch is written.
+        """
+        batch = []
+        sessions = self.store.loaded()
+        for session_id, session in list(sessions.items()):
+            written = self._written.get(session_id)
+            current = _revision(session)
+            if written is not None and written[0] == current:
+                continue
+            marks = session.marks()
+            if written is None or written[2] >= SESSION_SNAPSHOT_COMPACT_AFTER:
+                record = {"type": "full", "version": session.version, "data": session.to_dict()}
+                rewrite, written = True, (current, marks, 1)
+            else:
+                record = {"type": "delta", **session.delta(written[1])}
+                rewrite, written = False, (current, marks, written[2] + 1)
+            batch.append((session_id, json.dumps(record, separators=(",", ":")) + "\n", rewrite, written))
+        for session_id in [sid for sid in self._written if sid not in sessions]:
+            batch.append((session_id, "", True, None))
+        return batch
+
+    def _write_batch(self, batch: List[tuple]) -> List[Tuple[str, Optional[tuple]]]:
+        """Write a collected batch; returns the entries that made it to disk"""
+        done = []
+        for session_id, data, rewrite, written in batch:
+            try:
+                if written is None:
+                    self.journal.remove(session_id)
+                    snapshot_metrics["removed"] += 1
+                else:
+                    snapshot_metrics["bytes_written"] += self.journal.write(session_id, data, rewrite)
+                    snapshot_metrics["full_records" if rewrite else "delta_records"] += 1
+                done.append((session_id, written))
+            except OSError as e:
+                # Not marked as written, so the next checkpoint retries from the same point
+                snapshot_metrics["write_failures"] += 1
+                print(f"Session snapshot write failed for {session_id}: {e}")
+        return done
+
+    def _mark_written(self, done: List[Tuple[str, Optional[tuple]]]):
+        for session_id, written in done:
+            if written is None:
+                self._written.pop(session_id, None)
+            else:
+                self._written[session_id] = written
+
+    async def checkpoint(self):
+        """Write one batch of changes on a worker thread"""
+        started = time.monotonic()
+        batch = self._collect()
+        if batch:
+            # Shielded: on shutdown stop() waits for this write before flushing, so journals stay in order
+            self._writing = asyncio.ensure_future(asyncio.to_thread(self._write_batch, batch))
+            self._mark_written(await asyncio.shield(self._writing))
+        snapshot_metrics["checkpoints"] += 1
+        snapshot_metrics["last_checkpoint_ms"] = round((time.monotonic() - started) * 1000, 1)
+
+    def flush(self):
+        """Write everything outstanding, blocking (shutdown: the loop has nothing else to do)"""
+        self._mark_written(self._write_batch(self._collect()))
+
+    async def restore(self, session_id: str) -> Optional[InterviewState]:
+        """MemorySessionStore hook: load a session a previous process left behind"""
+        loading = self._loading.get(session_id)
+        if loading is None:
+            if session_id not in self._pending:
+                return None
+            # Requests that arrive while the journal is being read wait for the same load
+            loading = self._loading[session_id] = asyncio.ensure_future(self._load(session_id))
+        return await asyncio.shield(loading)
+
+    async def _load(self, session_id: str) -> Optional[InterviewState]:
+        try:
+            session = await asyncio.to_thread(self.journal.load, session_id)
+        except Exception as e:
+            snapshot_metrics["restore_failures"] += 1
+            print(f"Session snapshot restore failed for {session_id}: {e}")
+            session = None
+        self._pending.discard(session_id)
+        self._loading.pop(session_id, None)
+        if session is None:
+            return None
+        # The next change rewrites the journal whole, dropping any line torn by a crash
+        self._written[session_id] = (_revision(session), session.marks(), SESSION_SNAPSHOT_COMPACT_AFTER)
+        snapshot_metrics["restored"] += 1
+        # Into the store in the same step it leaves _pending, so no request sees neither
+        return self.store.loaded().setdefault(session_id, session)
+
+    async def _restore_remaining(self):
+        for session_id in list(self._pending):
+            await self.store.get(session_id)
+            await asyncio.sleep(0)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(SESSION_SNAPSHOT_INTERVAL_SECONDS)
+            try:
+                await self.checkpoint()
+            except Exception as e:
+                print(f"Session snapshot checkpoint failed: {e}")
+
+    def start(self):
+        """Index journals from the last run (nothing is read yet) and start checkpointing"""
+        self._pending = set(self.journal.session_ids()) - set(self.store.loaded())
+        self.store.restore = self.restore
+        if self._pending:
+            print(f"💾 {len(self._pending)} interview session(s) to restore from snapshots")
+            self._restore_task = asyncio.create_task(self._restore_remaining())
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop checkpointing and flush synchronously, so a clean shutdown loses nothing"""
+        for task in (self._task, self._restore_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = self._restore_task = None
+        if self._writing is not None and not self._writing.done():
+            self._mark_written(await self._writing)
+        self.flush()
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+
+_snapshotter: Optional[SessionSnapshotter] = None
+
+
+def start_snapshots():
+    """Start snapshotting (called from the app lifespan); a no-op unless sessions live in memory"""
+    global _snapshotter
+    if not SESSION_SNAPSHOTS or not isinstance(session_store, MemorySessionStore) or _snapshotter is not None:
+        return
+    _snapshotter = SessionSnapshotter(session_store, SnapshotJournal(SESSION_SNAPSHOT_DIR))
+    _snapshotter.start()
+
+
+async def stop_snapshots():
+    global _snapshotter
+    if _snapshotter is not None:
+        await _snapshotter.stop()
+        _snapshotter = None
+
+
+def snapshot_report() -> dict:
+    """Checkpoint and restore counters"""
+    return {
+        **snapshot_metrics,
+        "enabled": _snapshotter is not None,
+        "pending_restore": _snapshotter.pending() if _snapshotter else 0,
+        "journaled_sessions": len(_snapshotter._written) if _snapshotter else 0,
+        "directory": SESSION_SNAPSHOT_DIR,
+        "interval_seconds": SESSION_SNAPSHOT_INTERVAL_SECONDS
+    }
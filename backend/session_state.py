@@ -0,0 +1,485 @@
+"""
+Compact session state for AI Interviewer
+Active interviews as slotted objects with array-backed transcripts, scores and expression series instead of nested dicts
+"""
+
+import base64
+from array import array
+from typing import Optional, List, Dict, Any, Iterator, Tuple
+
+from context_window import new_context_state
+from assessment import new_assessment_state
+
+# One byte per message instead of a {"role", "content"} dict; the letters are also the serialized form
+ROLE_CODES = {"system": ord("s"), "user": ord("u"), "assistant": ord("a")}
+ROLE_NAMES = {code: role for role, code in ROLE_CODES.items()}
+
+# Confidence trend: an EWMA of recent samples (half-weight after this many) against the interview's mean
+TREND_HALF_LIFE_SAMPLES = 30
+TREND_ALPHA = 1 - 0.5 ** (1 / TREND_HALF_LIFE_SAMPLES)
+# Points the recent level must sit above/below the mean (half of the old first-half/second-half gap of 10)
+TREND_THRESHOLD = 5.0
+TREND_MIN_SAMPLES = 10
+
+# Expression metrics are percentages; anything else (or NaN/inf) is rejected before it is stored
+EXPRESSION_VALUE_MIN = 0.0
+EXPRESSION_VALUE_MAX = 100.0
+# Epoch ms up to the end of year 9999, the last instant datetime can represent
+EXPRESSION_TIMESTAMP_MAX_MS = 253402300799999
+# Emotion/posture labels come from the client: each is cut to this length, and past this
+# many distinct labels in a session the rest are recorded as OTHER_LABEL
+EXPRESSION_LABEL_MAX_LENGTH = 32
+EXPRESSION_MAX_LABELS = 64
+OTHER_LABEL = "other"
+
+
+def pack_array(values: array) -> str:
+    """Typed array -> base64 of its raw bytes (machine byte order; every worker shares it)"""
+    return base64.b64encode(values.tobytes()).decode("ascii")
+
+
+def unpack_array(typecode: str, data: str) -> array:
+    values = array(typecode)
+    values.frombytes(base64.b64decode(data))
+    return values
+
+
+def splice_array(values: array, start: int, data: str):
+    """Replace everything from `start` on with packed values"""
+    del values[start:]
+    values.frombytes(base64.b64decode(data))
+
+
+def new_video_metrics() -> dict:
+    """Running video metrics returned by the expression endpoints"""
+    return {
+        "avg_confidence": 0,
+        "avg_eye_contact": 0,
+        "avg_engagement": 0,
+        "emotion_distribution": {},
+        "confidence_trend": "stable"
+    }
+
+
+class Transcript:
+    """Conversation history as a role-code bytearray and a list of message texts"""
+
+    __slots__ = ("roles", "contents")
+
+    def __init__(self):
+        self.roles = bytearray()
+        self.contents: List[str] = []
+
+    def append(self, message: Dict[str, str]):
+        self.roles.append(ROLE_CODES[message["role"]])
+        self.contents.append(message["content"])
+
+    def count(self, role: str) -> int:
+        return self.roles.count(ROLE_CODES[role])
+
+    def __len__(self) -> int:
+        return len(self.contents)
+
+    def __getitem__(self, index):
+        """Messages as plain dicts; a slice returns a new list"""
+        if isinstance(index, slice):
+            return [
+                {"role": ROLE_NAMES[code], "content": content}
+                for code, content in zip(self.roles[index], self.contents[index])
+            ]
+        return {"role": ROLE_NAMES[self.roles[index]], "content": self.contents[index]}
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        for code, content in zip(self.roles, self.contents):
+            yield {"role": ROLE_NAMES[code], "content": content}
+
+    def to_list(self) -> List[Dict[str, str]]:
+        """The history as a list of message dicts (responses, MongoDB transcripts)"""
+        return self[:]
+
+    def approx_bytes(self) -> int:
+        # ~50 bytes of str object header plus a list slot per message
+        return len(self.roles) + sum(len(content) + 57 for content in self.contents)
+
+    def dump(self, start: int = 0) -> dict:
+        """Messages from `start` on (all of them by default)"""
+        return {"roles": self.roles[start:].decode("ascii"), "contents": self.contents[start:]}
+
+    def splice(self, start: int, data: dict):
+        """Replace everything from `start` on with dumped messages (re-applying a dump is harmless)"""
+        del self.roles[start:]
+        del self.contents[start:]
+        self.roles.extend(data["roles"].encode("ascii"))
+        self.contents.extend(data["contents"])
+
+    @classmethod
+    def load(cls, data: dict) -> "Transcript":
+        transcript = cls()
+        transcript.splice(0, data)
+        return transcript
+
+
+class ExpressionSeries:
+    """
+    Expression samples as parallel typed arrays (22 bytes a sample instead of
+    a ~380 byte dict). Emotion and posture labels are interned per session;
+    code 0 means the sample did not report one.
+
+    Running totals (sums, emotion counts, a confidence EWMA) are kept as
+    samples arrive, so metrics() costs the same at sample 10 and 10,000.
+    """
+
+    __slots__ = (
+        "confidence", "eye_contact", "engagement", "emotions", "postures", "timestamps", "labels",
+        "label_codes", "confidence_sum", "eye_contact_sum", "engagement_sum", "confidence_ewma", "emotion_counts"
+    )
+
+    COLUMNS = ("confidence", "eye_contact", "engagement", "emotions", "postures", "timestamps")
+
+    def __init__(self):
+        self.confidence = array("f")
+        self.eye_contact = array("f")
+        self.engagement = array("f")
+        self.emotions = array("H")
+        self.postures = array("H")
+        self.timestamps = array("q")
+        self.labels: List[str] = []
+        self.label_codes: Dict[str, int] = {}
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.confidence_sum = 0.0
+        self.eye_contact_sum = 0.0
+        self.engagement_sum = 0.0
+        self.confidence_ewma = 0.0
+        # Indexed by label code (0 = no emotion reported)
+        self.emotion_counts = array("I")
+
+    def _count_sample(self, index: int):
+        """Fold sample `index` into the running totals"""
+        confidence = self.confidence[index]
+        self.confidence_sum += confidence
+        self.eye_contact_sum += self.eye_contact[index]
+        self.engagement_sum += self.engagement[index]
+        if index == 0:
+            self.confidence_ewma = confidence
+        else:
+            self.confidence_ewma += TREND_ALPHA * (confidence - self.confidence_ewma)
+        emotion = self.emotions[index]
+        if emotion >= len(self.emotion_counts):
+            self.emotion_counts.extend([0] * (emotion + 1 - len(self.emotion_counts)))
+        self.emotion_counts[emotion] += 1
+
+    def _rebuild_stats(self):
+        """Recompute the running totals from the samples (data saved before they existed)"""
+        self._reset_stats()
+        for index in range(len(self)):
+            self._count_sample(index)
+
+    def code(self, label: Optional[str]) -> int:
+        """Interned code for a label (0 for none); the vocabulary never exceeds EXPRESSION_MAX_LABELS"""
+        if not label:
+            return 0
+        label = label[:EXPRESSION_LABEL_MAX_LENGTH]
+        code = self.label_codes.get(label)
+        if code is None:
+            # Keep the last slot for OTHER_LABEL
+            if len(self.labels) >= EXPRESSION_MAX_LABELS - 1 and label != OTHER_LABEL:
+                return self.code(OTHER_LABEL)
+            self.labels.append(label)
+            code = self.label_codes[label] = len(self.labels)
+        return code
+
+    def label(self, code: int) -> Optional[str]:
+        return self.labels[code - 1] if code else None
+
+    def _convert(self, columns: Dict[str, list]) -> Tuple[array, ...]:
+        """
+        Parallel columns (the ExpressionData field names) as typed arrays in
+        COLUMNS order. Raises ValueError, with the series untouched, for
+        columns of different lengths, metrics outside 0-100 (or NaN/inf) and
+        timestamps outside epoch ms.
+        """
+        count = len(columns["timestamp"])
+        converted = []
+        for name in ("confidence", "eyeContact", "engagement", "emotion", "posture"):
+            if len(columns[name]) != count:
+                raise ValueError(f"Column '{name}' has {len(columns[name])} values, expected {count}")
+        for name in ("confidence", "eyeContact", "engagement"):
+            values = array("d", columns[name])
+            # NaN fails both comparisons
+            if not all(EXPRESSION_VALUE_MIN <= value <= EXPRESSION_VALUE_MAX for value in values):
+                raise ValueError(f"'{name}' must be between {EXPRESSION_VALUE_MIN:g} and {EXPRESSION_VALUE_MAX:g}")
+            converted.append(array("f", values))
+        if not all(isinstance(value, int) and 0 <= value <= EXPRESSION_TIMESTAMP_MAX_MS for value in columns["timestamp"]):
+            raise ValueError("'timestamp' must be epoch milliseconds")
+        timestamps = array("q", columns["timestamp"])
+        # Labels last: interning grows the vocabulary, so only once nothing else can fail
+        emotions = array("H", [self.code(label) for label in columns["emotion"]])
+        postures = array("H", [self.code(label) for label in columns["posture"]])
+        return (*converted, emotions, postures, timestamps)
+
+    def _add(self, converted: Tuple[array, ...]) -> int:
+        start = len(self)
+        for name, values in zip(self.COLUMNS, converted):
+            getattr(self, name).extend(values)
+        for index in range(start, len(self)):
+            self._count_sample(index)
+        return len(self) - start
+
+    def append(self, sample: Dict[str, Any]) -> int:
+        """Add one sample (the ExpressionData field names); returns its index. ValueError as for extend()"""
+        self._add(self._convert({
+            "confidence": [sample["confidence"]],
+            "eyeContact": [sample["eyeContact"]],
+            "engagement": [sample["engagement"]],
+            "emotion": [sample.get("emotion")],
+            "posture": [sample.get("posture")],
+            "timestamp": [sample["timestamp"]]
+        }))
+        return len(self) - 1
+
+    def extend(self, columns: Dict[str, list]) -> int:
+        """
+        Add a batch given as parallel columns (the ExpressionData field names,
+        all the same length) in one pass; returns how many were added. Every
+        value is checked before anything is stored, so a ValueError leaves
+        the series as it was.
+        """
+        return self._add(self._convert(columns))
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def sample(self, index: int) -> Dict[str, Any]:
+        # float32 storage: round back to what the client sent
+        return {
+            "confidence": round(self.confidence[index], 2),
+            "eyeContact": round(self.eye_contact[index], 2),
+            "emotion": self.label(self.emotions[index]),
+            "engagement": round(self.engagement[index], 2),
+            "posture": self.label(self.postures[index]),
+            "timestamp": self.timestamps[index]
+        }
+
+    def metrics(self) -> Dict[str, Any]:
+        """The video_metrics dict, from the running totals"""
+        total = len(self)
+        if not total:
+            return new_video_metrics()
+        mean_confidence = self.confidence_sum / total
+        trend = "stable"
+        if total >= TREND_MIN_SAMPLES:
+            if self.confidence_ewma > mean_confidence + TREND_THRESHOLD:
+                trend = "improving"
+            elif self.confidence_ewma < mean_confidence - TREND_THRESHOLD:
+                trend = "declining"
+        return {
+            "avg_confidence": round(mean_confidence, 1),
+            "avg_eye_contact": round(self.eye_contact_sum / total, 1),
+            "avg_engagement": round(self.engagement_sum / total, 1),
+            "emotion_distribution": {
+                self.label(code): round(count / total * 100, 1)
+                for code, count in enumerate(self.emotion_counts) if count
+            },
+            "confidence_trend": trend
+        }
+
+    def tail(self, count: int) -> List[Dict[str, Any]]:
+        """The newest `count` samples as dicts"""
+        return [self.sample(i) for i in range(max(0, len(self) - count), len(self))]
+
+    def approx_bytes(self) -> int:
+        return 22 * len(self) + sum(len(label) + 57 for label in self.labels)
+
+    def dump(self, start: int = 0) -> dict:
+        """Samples from `start` on; the label vocabulary and running totals always go whole (they are tiny)"""
+        data = {name: pack_array(getattr(self, name)[start:]) for name in self.COLUMNS}
+        data["labels"] = self.labels
+        data["stats"] = [
+            self.confidence_sum, self.eye_contact_sum, self.engagement_sum,
+            self.confidence_ewma, self.emotion_counts.tolist()
+        ]
+        return data
+
+    def splice(self, start: int, data: dict):
+        for name in self.COLUMNS:
+            splice_array(getattr(self, name), start, data[name])
+        self.labels = list(data["labels"])
+        self.label_codes = {label: code for code, label in enumerate(self.labels, 1)}
+        if "stats" not in data:
+            self._rebuild_stats()
+            return
+        self.confidence_sum, self.eye_contact_sum, self.engagement_sum, self.confidence_ewma, counts = data["stats"]
+        self.emotion_counts = array("I", counts)
+
+    @classmethod
+    def load(cls, data: dict) -> "ExpressionSeries":
+        series = cls()
+        series.splice(0, data)
+        return series
+
+
+class InterviewState:
+    """
+    One active interview. Slotted, with the unbounded parts (history, scores,
+    expression samples) in compact containers; to_dict()/from_dict() give the
+    JSON-ready form the Redis and MongoDB session stores persist.
+    """
+
+    __slots__ = (
+        "version", "topic", "topic_name", "difficulty", "company_style", "company_name",
+        "system_prompt", "history", "scores", "question_count", "enable_tts",
+        "current_difficulty_adjustment", "start_time", "duration_minutes",
+        "has_resume", "has_job_description", "user_id", "mode", "language", "whisper_lang",
+        "context", "assessment", "expressions", "snapshot_samples", "snapshot_scores",
+        "video_metrics", "chunk_worker"
+    )
+
+    # Plain values, serialized as they are
+    SCALARS = (
+        "topic", "topic_name", "difficulty", "company_style", "company_name",
+        "system_prompt", "question_count", "enable_tts", "current_difficulty_adjustment",
+        "start_time", "duration_minutes", "has_resume", "has_job_description",
+        "user_id", "mode", "language", "whisper_lang", "context", "assessment", "video_metrics",
+        "chunk_worker"
+    )
+
+    version: int
+    topic: str
+    topic_name: str
+    difficulty: str
+    company_style: str
+    company_name: str
+    system_prompt: str
+    history: Transcript
+    scores: array
+    question_count: int
+    enable_tts: bool
+    current_difficulty_adjustment: int
+    start_time: float
+    duration_minutes: int
+    has_resume: bool
+    has_job_description: bool
+    user_id: Optional[str]
+    mode: str
+    language: str
+    whisper_lang: str
+    context: dict
+    assessment: dict
+    expressions: ExpressionSeries
+    # Video answers: index of the expression sample taken with each answer, and its score (NaN if none)
+    snapshot_samples: array
+    snapshot_scores: array
+    video_metrics: dict
+    # Worker receiving the session's chunked answer uploads (incremental_stt.WORKER_ID)
+    chunk_worker: Optional[str]
+
+    def __init__(self, **fields):
+        self.version = 0
+        self.topic = "general"
+        self.topic_name = "General Technical"
+        self.difficulty = "medium"
+        self.company_style = "default"
+        self.company_name = "Standard"
+        self.system_prompt = ""
+        self.history = Transcript()
+        self.scores = array("d")
+        self.question_count = 0
+        self.enable_tts = True
+        self.current_difficulty_adjustment = 0
+        self.start_time = 0.0
+        self.duration_minutes = 30
+        self.has_resume = False
+        self.has_job_description = False
+        self.user_id = None
+        self.mode = "audio"
+        self.language = "en"
+        self.whisper_lang = "en"
+        self.context = new_context_state()
+        self.assessment = new_assessment_state()
+        self.expressions = ExpressionSeries()
+        self.snapshot_samples = array("I")
+        self.snapshot_scores = array("d")
+        self.video_metrics = new_video_metrics()
+        self.chunk_worker = None
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+    def score_list(self) -> List[float]:
+        return self.scores.tolist()
+
+    def average_score(self) -> Optional[float]:
+        return sum(self.scores) / len(self.scores) if self.scores else None
+
+    def add_snapshot(self, sample: Dict[str, Any], score: Optional[float]):
+        """Record the expression sample taken with a video answer"""
+        self.snapshot_samples.append(self.expressions.append(sample))
+        self.snapshot_scores.append(float("nan") if score is None else score)
+
+    def approx_bytes(self) -> int:
+        """Approximate memory held; text (prompt, history) dominates"""
+        return (
+            600 + len(self.system_prompt)
+            + self.history.approx_bytes()
+            + 8 * len(self.scores)
+            + self.expressions.approx_bytes()
+            + 12 * len(self.snapshot_samples)
+            + len(self.context.get("summary", ""))
+            + len(self.assessment.get("notes", ""))
+        )
+
+    def to_dict(self) -> dict:
+        """JSON-ready form; arrays travel as base64 bytes, not element by element"""
+        data = {name: getattr(self, name) for name in self.SCALARS}
+        data["history"] = self.history.dump()
+        data["scores"] = pack_array(self.scores)
+        data["expressions"] = self.expressions.dump()
+        data["snapshot_samples"] = pack_array(self.snapshot_samples)
+        data["snapshot_scores"] = pack_array(self.snapshot_scores)
+        return data
+
+    def marks(self) -> Tuple[int, int, int, int]:
+        """Lengths of the append-only parts (history, scores, samples, snapshots), for delta()"""
+        return len(self.history), len(self.scores), len(self.expressions), len(self.snapshot_samples)
+
+    def delta(self, marks: Tuple[int, int, int, int]) -> dict:
+        """
+        What changed since marks() returned `marks`: the small mutable values
+        in full, the append-only parts only from their mark on. The system
+        prompt never changes after start, so it is left out.
+        """
+        history, scores, samples, snapshots = marks
+        return {
+            "version": self.version,
+            "marks": marks,
+            "scalars": {name: getattr(self, name) for name in self.SCALARS if name != "system_prompt"},
+            "history": self.history.dump(history),
+            "scores": pack_array(self.scores[scores:]),
+            "expressions": self.expressions.dump(samples),
+            "snapshot_samples": pack_array(self.snapshot_samples[snapshots:]),
+            "snapshot_scores": pack_array(self.snapshot_scores[snapshots:])
+        }
+
+    def apply_delta(self, delta: dict):
+        """Bring this state up to a delta() taken from a later copy of it"""
+        history, scores, samples, snapshots = delta["marks"]
+        self.version = delta["version"]
+        for name, value in delta["scalars"].items():
+            setattr(self, name, value)
+        self.history.splice(history, delta["history"])
+        splice_array(self.scores, scores, delta["scores"])
+        self.expressions.splice(samples, delta["expressions"])
+        splice_array(self.snapshot_samples, snapshots, delta["snapshot_samples"])
+        splice_array(self.snapshot_scores, snapshots, delta["snapshot_scores"])
+
+    @classmethod
+    def from_dict(cls, data: dict, version: int = 0) -> "InterviewState":
+        state = cls(**{name: data[name] for name in cls.SCALARS if name in data})
+        state.version = version
+        state.history = Transcript.load(data["history"])
+        state.scores = unpack_array("d", data["scores"])
+        state.expressions = ExpressionSeries.load(data["expressions"])
+        state.snapshot_samples = unpack_array("I", data["snapshot_samples"])
+        state.snapshot_scores = unpack_array("d", data["snapshot_scores"])
+        return state
@@ -0,0 +1,593 @@
+"""
+Session store for AI Interviewer
+Active interview sessions behind one interface (in-memory, Redis or MongoDB) with optimistic concurrency, so several API workers can share them
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse, unquote
+from typing import Optional, Dict, Any, Callable, Awaitable, List, Tuple
+from dotenv import load_dotenv
+from fastapi import HTTPException
+
+from database import get_database
+from session_state import InterviewState
+
+# Load environment variables
+load_dotenv()
+
+# memory (single process, default) | redis | mongo
+SESSION_STORE = os.getenv("SESSION_STORE", "memory").lower()
+SESSION_REDIS_URL = os.getenv("SESSION_REDIS_URL", "redis://localhost:6379/0")
+SESSION_REDIS_POOL_SIZE = int(os.getenv("SESSION_REDIS_POOL_SIZE", "16"))
+SESSION_KEY_PREFIX = os.getenv("SESSION_KEY_PREFIX", "interview:session:")
+# Sessions nobody has written to for this long expire from Redis on their own (abandoned tabs)
+SESSION_STORE_KEY_TTL_SECONDS = int(os.getenv("SESSION_STORE_KEY_TTL_SECONDS", "86400"))
+# Times a read-modify-write is re-applied on a fresh copy after losing a version race
+SESSION_STORE_CAS_RETRIES = int(os.getenv("SESSION_STORE_CAS_RETRIES", "8"))
+# Base of the jittered exponential backoff between those retries
+SESSION_STORE_CAS_BACKOFF_MS = float(os.getenv("SESSION_STORE_CAS_BACKOFF_MS", "5"))
+
+# Process-wide totals, exposed through /metrics
+session_store_metrics = {
+    "gets": 0,
+    "creates": 0,
+    "saves": 0,
+    "deletes": 0,
+    "conflicts": 0,
+    "retries": 0
+}
+
+
+class SessionNotFoundError(HTTPException):
+    """The session does not exist (never started, ended, or expired)"""
+
+    def __init__(self):
+        super().__init__(status_code=404, detail="Session not found")
+
+
+class SessionConflictError(HTTPException):
+    """Another request saved the session first and retries ran out"""
+
+    def __init__(self, session_id: str):
+        super().__init__(
+            status_code=409,
+            detail=f"Session {session_id} was modified concurrently, please retry"
+        )
+
+
+def session_entry(session_id: str, version: int, last_active: float, start_time: float, size: int) -> dict:
+    """What the janitor needs to know about a session without loading it"""
+    return {
+        "session_id": session_id,
+        "version": version,
+        "last_active": last_active,
+        "start_time": start_time,
+        "bytes": size
+    }
+
+
+class SessionStore(ABC):
+    """
+    Interface shared by all backends. Sessions are InterviewState objects
+    carrying a version number; save() only succeeds if the stored version is
+    still the one the caller read, so concurrent writers on other workers are
+    detected instead of silently overwritten. A backend missing one of the
+    abstract methods fails when it is constructed, not on first use.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        # session_id -> event set on the next write or delete made through this process
+        self._changes: Dict[str, asyncio.Event] = {}
+
+    def _changed(self, session_id: str):
+        event = self._changes.pop(session_id, None)
+        if event is not None:
+            event.set()
+
+    async def wait_for_change(self, session_id: str, timeout: float) -> bool:
+        """
+        Wait up to `timeout` for this process to save or delete the session
+        (long-polling readers). Writes made by other workers are not seen,
+        so callers re-read the session on wake-up and after a timeout alike.
+        """
+        event = self._changes.setdefault(session_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    @abstractmethod
+    async def get(self, session_id: str) -> Optional[InterviewState]:
+        ...
+
+    @abstractmethod
+    async def version(self, session_id: str) -> Optional[int]:
+        """The stored version alone (None if the session is gone), without loading the session"""
+        ...
+
+    @abstractmethod
+    async def create(self, session_id: str, session: InterviewState):
+        ...
+
+    @abstractmethod
+    async def save(self, session_id: str, session: InterviewState):
+        """Write back a session read with get(); raises SessionConflictError on a version race"""
+        ...
+
+    @abstractmethod
+    async def delete(self, session_id: str, version: Optional[int] = None) -> bool:
+        """Remove a session; with `version`, only if nobody saved it since that version"""
+        ...
+
+    async def exists(self, session_id: str) -> bool:
+        return await self.get(session_id) is not None
+
+    @abstractmethod
+    async def count(self) -> int:
+        ...
+
+    @abstractmethod
+    async def entries(self) -> List[dict]:
+        """session_entry() for every stored session (version, activity, age, size)"""
+        ...
+
+    async def close(self):
+        pass
+
+    async def update(
+        self,
+        session_id: str,
+        mutate: Callable[[InterviewState], Any],
+        session: Optional[InterviewState] = None
+    ) -> Tuple[InterviewState, Any]:
+        """
+        Read-modify-write with optimistic concurrency: apply mutate() and save;
+        on a version conflict re-read the session and apply mutate() again.
+        Pass the copy the caller already holds as `session` to skip the first
+        read. mutate() may run more than once, so it must only touch the
+        session it is given. Returns (saved session, mutate's return value).
+        """
+        for attempt in range(SESSION_STORE_CAS_RETRIES + 1):
+            if session is None:
+                session = await self.get(session_id)
+                if session is None:
+                    raise SessionNotFoundError()
+            result = mutate(session)
+            try:
+                await self.save(session_id, session)
+                return session, result
+            except SessionConflictError:
+                if attempt == SESSION_STORE_CAS_RETRIES:
+                    raise
+                session_store_metrics["retries"] += 1
+                session = None
+                # Jitter so writers that collided do not collide again on the retry
+                await asyncio.sleep(random.uniform(0, SESSION_STORE_CAS_BACKOFF_MS * 2 ** attempt) / 1000)
+
+
+# ============== IN-MEMORY BACKEND ==============
+
+class MemorySessionStore(SessionStore):
+    """
+    Sessions in this process's memory. get() returns the live object, so a
+    single worker never copies or serializes a session; only use with one worker.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        super().__init__()
+        self._sessions: Dict[str, InterviewState] = {}
+        # Reads count as activity too: a candidate thinking on the page still polls /time
+        self._last_active: Dict[str, float] = {}
+        # Loads a session a previous process left behind (set by session_snapshot.py)
+        self.restore: Optional[Callable[[str], Awaitable[Optional[InterviewState]]]] = None
+
+    async def _restore(self, session_id: str) -> Optional[InterviewState]:
+        if self.restore is None:
+            return None
+        session = await self.restore(session_id)
+        if session is None:
+            return None
+        # Another request may have restored it while this one was reading
+        return self._sessions.setdefault(session_id, session)
+
+    def loaded(self) -> Dict[str, InterviewState]:
+        """The sessions held in memory right now"""
+        return self._sessions
+
+    async def get(self, session_id: str) -> Optional[InterviewState]:
+        session_store_metrics["gets"] += 1
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = await self._restore(session_id)
+        if session is not None:
+            self._last_active[session_id] = time.time()
+        return session
+
+    async def version(self, session_id: str) -> Optional[int]:
+        session = await self.get(session_id)
+        return session.version if session is not None else None
+
+    async def create(self, session_id: str, session: InterviewState):
+        session_store_metrics["creates"] += 1
+        session.version = 1
+        self._sessions[session_id] = session
+        self._last_active[session_id] = time.time()
+
+    async def save(self, session_id: str, session: InterviewState):
+        current = self._sessions.get(session_id)
+        if current is None:
+            raise SessionNotFoundError()
+        if current is not session and current.version != session.version:
+            session_store_metrics["conflicts"] += 1
+            raise SessionConflictError(session_id)
+        session_store_metrics["saves"] += 1
+        session.version += 1
+        self._sessions[session_id] = session
+        self._last_active[session_id] = time.time()
+        self._changed(session_id)
+
+    async def delete(self, session_id: str, version: Optional[int] = None) -> bool:
+        current = self._sessions.get(session_id)
+        if current is None or (version is not None and current.version != version):
+            return False
+        session_store_metrics["deletes"] += 1
+        del self._sessions[session_id]
+        self._last_active.pop(session_id, None)
+        self._changed(session_id)
+        return True
+
+    async def exists(self, session_id: str) -> bool:
+        return session_id in self._sessions or await self._restore(session_id) is not None
+
+    async def count(self) -> int:
+        return len(self._sessions)
+
+    async def entries(self) -> List[dict]:
+        return [
+            session_entry(
+                session_id,
+                session.version,
+                self._last_active.get(session_id, 0.0),
+                session.start_time,
+                session.approx_bytes()
+            )
+            for session_id, session in list(self._sessions.items())
+        ]
+
+
+# ============== REDIS BACKEND ==============
+
+class RespError(Exception):
+    """Error reply from the Redis server"""
+
+
+class RespConnection:
+    """Minimal RESP2 client connection: enough commands for the session store"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def open(cls, url: str) -> "RespConnection":
+        parsed = urlparse(url)
+        reader, writer = await asyncio.open_connection(parsed.hostname or "localhost", parsed.port or 6379)
+        conn = cls(reader, writer)
+        if parsed.password:
+            auth = [unquote(parsed.username), unquote(parsed.password)] if parsed.username else [unquote(parsed.password)]
+            await conn.execute("AUTH", *auth)
+        db = (parsed.path or "/").lstrip("/")
+        if db and db != "0":
+            await conn.execute("SELECT", db)
+        return conn
+
+    @staticmethod
+    def _encode(args: tuple) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(parts)
+
+    async def _read_reply(self) -> Any:
+        line = await self.reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Redis connection closed")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            # Returned, not raised, so the rest of a pipelined/EXEC reply is still consumed
+            return RespError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            return (await self.reader.readexactly(length + 2))[:-2]
+        if kind == b"*":
+            length = int(payload)
+            if length < 0:
+                return None
+            return [await self._read_reply() for _ in range(length)]
+        raise ConnectionError(f"Unexpected Redis reply: {line[:40]!r}")
+
+    async def pipeline(self, *commands: tuple) -> List[Any]:
+        """Send several commands in one write and read all replies (one round trip)"""
+        self.writer.write(b"".join(self._encode(command) for command in commands))
+        await self.writer.drain()
+        replies = [await self._read_reply() for _ in commands]
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply
+        return replies
+
+    async def execute(self, *args) -> Any:
+        return (await self.pipeline(args))[0]
+
+    def close(self):
+        self.writer.close()
+
+
+class RespPool:
+    """Bounded pool of RESP connections, opened lazily"""
+
+    def __init__(self, url: str, size: int):
+        self.url = url
+        self._idle: List[RespConnection] = []
+        self._slots = asyncio.Semaphore(max(1, size))
+
+    @asynccontextmanager
+    async def connection(self):
+        async with self._slots:
+            conn = self._idle.pop() if self._idle else await RespConnection.open(self.url)
+            try:
+                yield conn
+            except BaseException:
+                # A failed or cancelled exchange can leave unread replies or a WATCH behind
+                conn.close()
+                raise
+            self._idle.append(conn)
+
+    def close(self):
+        while self._idle:
+            self._idle.pop().close()
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Sessions as Redis hashes {v: version, data: JSON of to_dict()}. Saves are
+    check-and-set with WATCH/MULTI/EXEC, so a concurrent write from another
+    worker aborts the transaction and surfaces as a version conflict.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, pool_size: int):
+        super().__init__()
+        self.pool = RespPool(url, pool_size)
+
+    def _key(self, session_id: str) -> str:
+        return f"{SESSION_KEY_PREFIX}{session_id}"
+
+    def _write_commands(self, key: str, session: InterviewState) -> List[tuple]:
+        data = json.dumps(session.to_dict(), separators=(",", ":"))
+        # a/s/n (last write, start time, size) let the janitor sweep without loading sessions
+        return [
+            ("HSET", key, "v", session.version, "data", data,
+             "a", time.time(), "s", session.start_time, "n", len(data)),
+            ("EXPIRE", key, SESSION_STORE_KEY_TTL_SECONDS)
+        ]
+
+    async def _scan_keys(self, conn: RespConnection) -> List[bytes]:
+        keys = []
+        cursor = "0"
+        while True:
+            cursor, batch = await conn.execute("SCAN", cursor, "MATCH", f"{SESSION_KEY_PREFIX}*", "COUNT", 500)
+            keys.extend(batch)
+            cursor = cursor.decode() if isinstance(cursor, bytes) else cursor
+            if cursor == "0":
+                return keys
+
+    async def get(self, session_id: str) -> Optional[InterviewState]:
+        session_store_metrics["gets"] += 1
+        async with self.pool.connection() as conn:
+            version, raw = await conn.execute("HMGET", self._key(session_id), "v", "data")
+        return InterviewState.from_dict(json.loads(raw), int(version)) if raw is not None else None
+
+    async def version(self, session_id: str) -> Optional[int]:
+        async with self.pool.connection() as conn:
+            version = await conn.execute("HGET", self._key(session_id), "v")
+        return int(version) if version is not None else None
+
+    async def create(self, session_id: str, session: InterviewState):
+        session_store_metrics["creates"] += 1
+        session.version = 1
+        async with self.pool.connection() as conn:
+            await conn.pipeline(("MULTI",), *self._write_commands(self._key(session_id), session), ("EXEC",))
+
+    async def save(self, session_id: str, session: InterviewState):
+        key = self._key(session_id)
+        expected = session.version
+        committed = False
+        async with self.pool.connection() as conn:
+            _, stored = await conn.pipeline(("WATCH", key), ("HGET", key, "v"))
+            if stored is not None and int(stored) == expected:
+                session.version = expected + 1
+                replies = await conn.pipeline(("MULTI",), *self._write_commands(key, session), ("EXEC",))
+                # EXEC returns nil when the key changed between WATCH and EXEC
+                committed = replies[-1] is not None
+            else:
+                await conn.execute("UNWATCH")
+        if stored is None:
+            raise SessionNotFoundError()
+        if not committed:
+            session.version = expected
+            session_store_metrics["conflicts"] += 1
+            raise SessionConflictError(session_id)
+        session_store_metrics["saves"] += 1
+        self._changed(session_id)
+
+    async def delete(self, session_id: str, version: Optional[int] = None) -> bool:
+        key = self._key(session_id)
+        async with self.pool.connection() as conn:
+            if version is None:
+                deleted = await conn.execute("DEL", key) > 0
+            else:
+                _, stored = await conn.pipeline(("WATCH", key), ("HGET", key, "v"))
+                if stored is not None and int(stored) == version:
+                    replies = await conn.pipeline(("MULTI",), ("DEL", key), ("EXEC",))
+                    deleted = replies[-1] is not None and replies[-1][0] > 0
+                else:
+                    await conn.execute("UNWATCH")
+                    deleted = False
+        if deleted:
+            session_store_metrics["deletes"] += 1
+            self._changed(session_id)
+        return deleted
+
+    async def exists(self, session_id: str) -> bool:
+        async with self.pool.connection() as conn:
+            return await conn.execute("EXISTS", self._key(session_id)) > 0
+
+    async def count(self) -> int:
+        async with self.pool.connection() as conn:
+            return len(await self._scan_keys(conn))
+
+    async def entries(self) -> List[dict]:
+        async with self.pool.connection() as conn:
+            keys = await self._scan_keys(conn)
+            rows = await conn.pipeline(*[("HMGET", key, "v", "a", "s", "n") for key in keys]) if keys else []
+        prefix = len(SESSION_KEY_PREFIX)
+        return [
+            session_entry(key.decode()[prefix:], int(v), float(a or 0), float(s or 0), int(n or 0))
+            for key, (v, a, s, n) in zip(keys, rows)
+            # Expired between SCAN and HMGET
+            if v is not None
+        ]
+
+    async def close(self):
+        self.pool.close()
+
+
+# ============== MONGODB BACKEND ==============
+
+class MongoSessionStore(SessionStore):
+    """
+    Sessions as documents {_id, version, data: to_dict(), updated_at} in live_sessions.
+    A save is a replace filtered on the version read, so it matches nothing
+    (a conflict) if another worker saved first.
+    """
+
+    name = "mongo"
+
+    def _collection(self):
+        db = get_database()
+        if db is None:
+            raise RuntimeError("MongoDB is not connected; SESSION_STORE=mongo needs it")
+        return db.live_sessions
+
+    @staticmethod
+    def _document(session: InterviewState) -> dict:
+        return {
+            "version": session.version,
+            "data": session.to_dict(),
+            "bytes": session.approx_bytes(),
+            "updated_at": datetime.utcnow()
+        }
+
+    async def get(self, session_id: str) -> Optional[InterviewState]:
+        session_store_metrics["gets"] += 1
+        doc = await self._collection().find_one({"_id": session_id})
+        if doc is None:
+            return None
+        return InterviewState.from_dict(doc["data"], doc["version"])
+
+    async def version(self, session_id: str) -> Optional[int]:
+        doc = await self._collection().find_one({"_id": session_id}, {"version": 1})
+        return doc["version"] if doc is not None else None
+
+    async def create(self, session_id: str, session: InterviewState):
+        session_store_metrics["creates"] += 1
+        session.version = 1
+        await self._collection().insert_one({"_id": session_id, **self._document(session)})
+
+    async def save(self, session_id: str, session: InterviewState):
+        expected = session.version
+        session.version = expected + 1
+        result = await self._collection().replace_one(
+            {"_id": session_id, "version": expected},
+            self._document(session)
+        )
+        if result.matched_count == 0:
+            session.version = expected
+            if not await self.exists(session_id):
+                raise SessionNotFoundError()
+            session_store_metrics["conflicts"] += 1
+            raise SessionConflictError(session_id)
+        session_store_metrics["saves"] += 1
+        self._changed(session_id)
+
+    async def delete(self, session_id: str, version: Optional[int] = None) -> bool:
+        query = {"_id": session_id} if version is None else {"_id": session_id, "version": version}
+        result = await self._collection().delete_one(query)
+        if result.deleted_count:
+            session_store_metrics["deletes"] += 1
+            self._changed(session_id)
+        return result.deleted_count > 0
+
+    async def exists(self, session_id: str) -> bool:
+        return await self._collection().count_documents({"_id": session_id}, limit=1) > 0
+
+    async def count(self) -> int:
+        return await self._collection().count_documents({})
+
+    async def entries(self) -> List[dict]:
+        cursor = self._collection().find({}, {"version": 1, "updated_at": 1, "data.start_time": 1, "bytes": 1})
+        entries = []
+        async for doc in cursor:
+            # updated_at is naive UTC (same convention as the rest of the database)
+            last_active = doc["updated_at"].replace(tzinfo=timezone.utc).timestamp()
+            entries.append(session_entry(
+                doc["_id"], doc["version"], last_active,
+                doc.get("data", {}).get("start_time", 0.0), doc.get("bytes", 0)
+            ))
+        return entries
+
+
+def create_session_store() -> SessionStore:
+    """Backend selected by SESSION_STORE"""
+    if SESSION_STORE == "redis":
+        return RedisSessionStore(SESSION_REDIS_URL, SESSION_REDIS_POOL_SIZE)
+    if SESSION_STORE == "mongo":
+        return MongoSessionStore()
+    if SESSION_STORE != "memory":
+        print(f"⚠️ Unknown SESSION_STORE={SESSION_STORE!r}, using memory")
+    return MemorySessionStore()
+
+
+async def session_store_report() -> dict:
+    """Backend, active session count and read/write/conflict counters"""
+    try:
+        active = await session_store.count()
+    except Exception as e:
+        print(f"Session store count failed: {e}")
+        active = None
+    return {"backend": session_store.name, "active_sessions": active, **session_store_metrics}
+
+
+# Global session store instance
+session_store = create_session_store()
@@ -0,0 +1,105 @@
+"""
+Session watch for AI Interviewer
+Cursor-based polling for the status, timer and video metrics endpoints: "not modified" when nothing changed, and long-polls that wait for the next change
+"""
+
+import os
+import time
+from typing import Optional, Callable
+from dotenv import load_dotenv
+
+from session_store import session_store, SessionNotFoundError
+from session_state import InterviewState
+
+# Load environment variables
+load_dotenv()
+
+# Longest a request may hold the connection open with ?wait=
+LONG_POLL_MAX_SECONDS = float(os.getenv("LONG_POLL_MAX_SECONDS", "30"))
+# A waiting request re-checks the session at least this often, to catch writes by other
+# workers and timer changes that no write announces
+LONG_POLL_RECHECK_SECONDS = float(os.getenv("LONG_POLL_RECHECK_SECONDS", "1"))
+
+# Process-wide totals, exposed through /metrics
+watch_metrics = {
+    "cursor_polls": 0,
+    "not_modified": 0,
+    "long_polls": 0,
+    "long_polls_changed": 0,
+    "long_polls_timed_out": 0,
+    "version_checks": 0,
+    "session_loads": 0,
+    "waiting": 0
+}
+
+
+def timer_phase(session: InterviewState) -> str:
+    """running | warning | time_up - the parts of the timer a client cannot work out from its own clock"""
+    remaining = session.duration_minutes * 60 - (time.time() - session.start_time)
+    if remaining <= 0:
+        return "time_up"
+    return "warning" if remaining <= 300 else "running"
+
+
+def session_cursor(session: InterviewState) -> str:
+    """Cursor for /status and /time: changes with every write and every timer phase"""
+    return f"{session.version}.{timer_phase(session)}"
+
+
+async def watch(
+    session_id: str,
+    since: Optional[str],
+    wait: float,
+    cursor: Callable[[InterviewState], str]
+) -> Optional[InterviewState]:
+    """
+    The session once cursor(session) differs from `since` - right away if it
+    already does or no cursor was given. Otherwise wait up to `wait` seconds
+    for a change and return None if none came (the caller answers "not
+    modified"). Raises SessionNotFoundError if the session is gone.
+    While waiting only the stored version is re-read; the session itself is
+    loaded again once the version has moved.
+    """
+    if since is not None:
+        watch_metrics["cursor_polls"] += 1
+    deadline = time.monotonic() + max(0.0, min(wait, LONG_POLL_MAX_SECONDS))
+    long_poll = False
+    session = await session_store.get(session_id)
+    watch_metrics["session_loads"] += 1
+    try:
+        while True:
+            if session is None:
+                raise SessionNotFoundError()
+            if since is None or cursor(session) != since:
+                if long_poll:
+                    watch_metrics["long_polls_changed"] += 1
+                return session
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                if long_poll:
+                    watch_metrics["long_polls_timed_out"] += 1
+                watch_metrics["not_modified"] += 1
+                return None
+            if not long_poll:
+                long_poll = True
+                watch_metrics["long_polls"] += 1
+                watch_metrics["waiting"] += 1
+            await session_store.wait_for_change(session_id, min(remaining, LONG_POLL_RECHECK_SECONDS))
+            # The timer phase comes from the session already held; only a write needs a fresh copy
+            version = await session_store.version(session_id)
+            watch_metrics["version_checks"] += 1
+            if version != session.version:
+                session = await session_store.get(session_id) if version is not None else None
+                watch_metrics["session_loads"] += 1
+    finally:
+        if long_poll:
+            watch_metrics["waiting"] -= 1
+
+
+def watch_report() -> dict:
+    """Cursor polling and long-poll counters"""
+    return {
+        **watch_metrics,
+        "long_poll_max_seconds": LONG_POLL_MAX_SECONDS,
+        "recheck_seconds": LONG_POLL_RECHECK_SECONDS
+    }
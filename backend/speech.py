@@ -0,0 +1,62 @@
+"""
+Edge TTS synthesis helpers for AI Interviewer
+Free Microsoft neural voices, shared by the /tts/edge endpoint and the interview WebSocket
+"""
+
+from typing import AsyncIterator
+
+import edge_tts
+
+DEFAULT_EDGE_VOICE = "en-US-AriaNeural"
+
+# Voices offered by /tts/voices (all free, high-quality neural voices)
+EDGE_VOICES = [
+    {"id": "en-US-AriaNeural", "name": "Aria", "gender": "Female", "locale": "US English", "recommended": True},
+    {"id": "en-US-JennyNeural", "name": "Jenny", "gender": "Female", "locale": "US English"},
+    {"id": "en-US-GuyNeural", "name": "Guy", "gender": "Male", "locale": "US English"},
+    {"id": "en-US-DavisNeural", "name": "Davis", "gender": "Male", "locale": "US English"},
+    {"id": "en-GB-SoniaNeural", "name": "Sonia", "gender": "Female", "locale": "UK English"},
+    {"id": "en-AU-NatashaNeural", "name": "Natasha", "gender": "Female", "locale": "Australian English"},
+    {"id": "en-IN-NeerjaNeural", "name": "Neerja", "gender": "Female", "locale": "Indian English"},
+    {"id": "en-US-ChristopherNeural", "name": "Christopher", "gender": "Male", "locale": "US English"},
+    {"id": "en-US-EricNeural", "name": "Eric", "gender": "Male", "locale": "US English"},
+    {"id": "en-US-MichelleNeural", "name": "Michelle", "gender": "Female", "locale": "US English"}
+]
+EDGE_VOICE_IDS = {voice["id"] for voice in EDGE_VOICES}
+
+# Anything smaller than this is not a playable MP3
+MIN_AUDIO_BYTES = 100
+
+
+class InsufficientAudioError(Exception):
+    """Raised when edge-tts returns (almost) no audio for a piece of text"""
+    pass
+
+
+async def synthesize_edge_tts(text: str, voice: str = DEFAULT_EDGE_VOICE) -> bytes:
+    """Synthesize text with edge-tts and return the complete MP3"""
+    communicate = edge_tts.Communicate(text, voice)
+
+    audio_chunks = []
+    async for chunk in communicate.stream():
+        if chunk["type"] == "audio":
+            audio_chunks.append(chunk["data"])
+
+    audio_data = b"".join(audio_chunks)
+    if len(audio_data) < MIN_AUDIO_BYTES:
+        raise InsufficientAudioError(f"Audio data too small ({len(audio_data)} bytes)")
+    return audio_data
+
+
+async def stream_edge_tts(text: str, voice: str = DEFAULT_EDGE_VOICE) -> AsyncIterator[bytes]:
+    """
+    Yield MP3 data as edge-tts produces it. Closing this generator (e.g. when
+    the HTTP client disconnects) closes the upstream synthesis connection.
+    """
+    upstream = edge_tts.Communicate(text, voice).stream()
+    try:
+        async for chunk in upstream:
+            if chunk["type"] == "audio" and chunk["data"]:
+                yield chunk["data"]
+    finally:
+        await upstream.aclose()
@@ -0,0 +1,107 @@
+"""
+Streaming helpers for AI Interviewer
+Server-Sent Events framing, on-the-fly removal of the interviewer's score tag and sentence chunking for TTS
+"""
+
+import re
+import json
+from typing import Optional, Tuple, Union, List
+
+# Matches every prefix of "[SCORE: X/10]" (and "[SCORE: X.Y/10]") so a tag that is
+# split across several streamed tokens can be held back until it is complete
+SCORE_TAG_PREFIX = re.compile(
+    r'^\[(?:S(?:C(?:O(?:R(?:E(?::\s*(?:\d+(?:\.\d*)?(?:/(?:1(?:0\]?)?)?)?)?)?)?)?)?)?)?$'
+)
+SCORE_TAG = re.compile(r'\s*\[SCORE:\s*(\d+(?:\.\d+)?)/10\]')
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Format a single Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class ScoreTagFilter:
+    """
+    Strips the [SCORE: X/10] tag from a stream of tokens as they arrive.
+    Text that might be the start of a tag (plus whitespace in front of it)
+    is held back until the tag is either completed or ruled out.
+    """
+
+    def __init__(self):
+        self.raw = ""
+        self.pending = ""
+        self.score: Optional[Union[int, float]] = None
+
+    def feed(self, token: str) -> str:
+        """Add a token and return the text that is safe to show"""
+        self.raw += token
+        self.pending += token
+        emitted = ""
+
+        while True:
+            match = SCORE_TAG.search(self.pending)
+            if match:
+                if self.score is None:
+                    value = float(match.group(1))
+                    self.score = int(value) if value.is_integer() else value
+                emitted += self.pending[:match.start()]
+                self.pending = self.pending[match.end():]
+                continue
+
+            bracket = self.pending.rfind("[")
+            if bracket != -1 and SCORE_TAG_PREFIX.match(self.pending[bracket:]):
+                # Possible partial tag - hold it and the whitespace before it
+                head = self.pending[:bracket]
+                keep_from = len(head.rstrip())
+                emitted += head[:keep_from]
+                self.pending = self.pending[keep_from:]
+            else:
+                # Hold trailing whitespace in case a tag follows it
+                keep_from = len(self.pending.rstrip())
+                emitted += self.pending[:keep_from]
+                self.pending = self.pending[keep_from:]
+            return emitted
+
+    def finish(self) -> Tuple[str, Optional[Union[int, float]]]:
+        """Flush held text at end of stream and return it with the parsed score"""
+        tail = self.pending
+        self.pending = ""
+        if SCORE_TAG_PREFIX.match(tail.strip()):
+            # An incomplete tag at the very end is dropped rather than shown
+            tail = ""
+        return tail.rstrip(), self.score
+
+
+# Sentence boundary: terminal punctuation (Latin and CJK/Devanagari) followed by whitespace
+SENTENCE_END = re.compile(r'(?<=[.!?।。！？])\s+')
+
+
+class SentenceChunker:
+    """
+    Groups streamed reply text into sentences so each one can be sent to TTS
+    as soon as it is complete. Very short sentences are merged with the next
+    one to avoid choppy audio.
+    """
+
+    def __init__(self, min_chars: int = 20):
+        self.min_chars = min_chars
+        self.buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """Add text and return any sentences that are now complete"""
+        self.buffer += text
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self.buffer):
+            candidate = self.buffer[start:match.start()].strip()
+            if len(candidate) >= self.min_chars:
+                sentences.append(candidate)
+                start = match.end()
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        """Return whatever is left at the end of the reply"""
+        remainder = self.buffer.strip()
+        self.buffer = ""
+        return remainder or None
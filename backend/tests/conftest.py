@@ -0,0 +1,14 @@
+"""
+Shared setup for the backend tests (run from backend/: python -m pytest -q)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# No real Groq, Redis or MongoDB: sessions stay in this process and nothing is snapshotted
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ["SESSION_STORE"] = "memory"
+os.environ["SESSION_SNAPSHOTS"] = "false"
+os.environ.setdefault("TTS_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".tts_cache"))
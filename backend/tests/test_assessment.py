@@ -0,0 +1,61 @@
+import asyncio
+
+import assessment
+from assessment import assessment_evidence, ASSESSMENT_MAX_TAIL_MESSAGES
+from session_state import InterviewState
+
+
+def make_session(messages: int) -> InterviewState:
+    session = InterviewState()
+    for i in range(messages):
+        session.history.append({"role": "user" if i % 2 else "assistant", "content": f"message {i}"})
+    return session
+
+
+def test_without_notes_the_whole_transcript_is_evidence():
+    session = make_session(ASSESSMENT_MAX_TAIL_MESSAGES * 3)
+    evidence = asyncio.run(assessment_evidence("s1", session))
+    assert "message 0\n" in evidence
+    assert f"message {ASSESSMENT_MAX_TAIL_MESSAGES * 3 - 1}" in evidence
+
+
+def test_a_long_tail_is_folded_into_the_notes_first(monkeypatch):
+    prompts = []
+
+    async def fake_completion(**kwargs):
+        prompts.append(kwargs["messages"][0]["content"])
+        return "updated notes"
+
+    monkeypatch.setattr(assessment, "chat_completion", fake_completion)
+    session = make_session(4 + ASSESSMENT_MAX_TAIL_MESSAGES * 2)
+    session.assessment.update(notes="early notes", assessed_upto=4)
+
+    evidence = asyncio.run(assessment_evidence("s1", session))
+    assert len(prompts) == 1
+    assert "message 4\n" in prompts[0]
+    assert evidence == "Running assessment notes (covering the interview so far):\nupdated notes"
+
+
+def test_nothing_is_cut_when_the_update_fails(monkeypatch):
+    async def failing_completion(**kwargs):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(assessment, "chat_completion", failing_completion)
+    session = make_session(4 + ASSESSMENT_MAX_TAIL_MESSAGES * 2)
+    session.assessment.update(notes="early notes", assessed_upto=4)
+
+    evidence = asyncio.run(assessment_evidence("s1", session))
+    assert "early notes" in evidence
+    assert "message 3" not in evidence
+    assert all(f"message {i}\n" in evidence + "\n" for i in range(4, len(session.history)))
+
+
+def test_a_short_tail_is_sent_as_is(monkeypatch):
+    async def unexpected(**kwargs):
+        raise AssertionError("no update needed")
+
+    monkeypatch.setattr(assessment, "chat_completion", unexpected)
+    session = make_session(6)
+    session.assessment.update(notes="notes", assessed_upto=4)
+    evidence = asyncio.run(assessment_evidence("s1", session))
+    assert evidence.endswith("Latest exchanges not yet in the notes:\nASSISTANT: message 4\nUSER: message 5")
@@ -0,0 +1,39 @@
+import math
+from array import array
+
+from audio_preprocess import trim_silence, SAMPLE_RATE, AUDIO_VAD_FRAME_MS, AUDIO_VAD_PADDING_MS, AUDIO_VAD_MAX_PAUSE_MS
+
+FRAME_BYTES = SAMPLE_RATE * AUDIO_VAD_FRAME_MS // 1000 * 2
+
+
+def tone(ms: int, amplitude: int = 8000) -> bytes:
+    count = SAMPLE_RATE * ms // 1000
+    return array("h", (int(amplitude * math.sin(2 * math.pi * 440 * i / SAMPLE_RATE)) for i in range(count))).tobytes()
+
+
+def silence(ms: int) -> bytes:
+    return bytes(SAMPLE_RATE * ms // 1000 * 2)
+
+
+def frames(pcm: bytes) -> int:
+    return len(pcm) // FRAME_BYTES
+
+
+def test_trim_keeps_padding_and_shortens_long_pauses():
+    pcm = silence(990) + tone(600) + silence(3000) + tone(600) + silence(990)
+    trimmed = trim_silence(pcm)
+    padding = AUDIO_VAD_PADDING_MS // AUDIO_VAD_FRAME_MS
+    max_pause = AUDIO_VAD_MAX_PAUSE_MS // AUDIO_VAD_FRAME_MS
+    assert frames(trimmed) == padding + frames(tone(600)) + max_pause + frames(tone(600)) + padding
+    assert len(trimmed) % FRAME_BYTES == 0
+
+
+def test_trim_leaves_short_pauses_alone():
+    pcm = tone(600) + silence(300) + tone(600)
+    assert trim_silence(pcm) == pcm
+
+
+def test_trim_returns_silence_unchanged():
+    pcm = silence(2000)
+    assert trim_silence(pcm) == pcm
+    assert trim_silence(b"") == b""
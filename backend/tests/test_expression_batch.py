@@ -0,0 +1,35 @@
+import pytest
+
+from main import ExpressionBatch
+
+
+def test_columns_fill_in_defaults():
+    columns = ExpressionBatch(confidence=[10, 20], timestamp=[5, 6]).columns()
+    assert columns["confidence"] == [10, 20]
+    assert columns["emotion"] == ["neutral", "neutral"]
+    assert columns["timestamp"] == [5, 6]
+
+
+def test_samples_become_columns():
+    batch = ExpressionBatch(samples=[{"confidence": 10, "timestamp": 5}, {"confidence": 20, "timestamp": 6}])
+    assert batch.columns()["confidence"] == [10, 20]
+
+
+def test_a_zero_timestamp_is_kept():
+    assert ExpressionBatch(confidence=[1, 2], timestamp=[0, None]).columns()["timestamp"][0] == 0
+    assert ExpressionBatch(samples=[{"timestamp": 0}]).columns()["timestamp"] == [0]
+
+
+def test_missing_timestamps_are_filled_with_now():
+    timestamp = ExpressionBatch(confidence=[1], timestamp=[None]).columns()["timestamp"][0]
+    assert timestamp > 1_600_000_000_000
+
+
+def test_samples_and_columns_together_are_rejected():
+    with pytest.raises(ValueError, match="not both"):
+        ExpressionBatch(samples=[{"confidence": 10}], confidence=[20]).columns()
+
+
+def test_ragged_columns_are_rejected():
+    with pytest.raises(ValueError):
+        ExpressionBatch(confidence=[1, 2], engagement=[3]).columns()
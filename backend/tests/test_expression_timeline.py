@@ -0,0 +1,67 @@
+from datetime import datetime, timezone
+
+from expression_timeline import rollup, to_documents, from_documents, timeline_metrics
+from session_state import ExpressionSeries
+
+BASE_MS = 1_700_000_000_000
+
+
+def make_series():
+    series = ExpressionSeries()
+    # Out of order, as batches can arrive; two 5 s buckets plus one 20 s later
+    series.extend({
+        "confidence": [40.0, 60.0, 80.0, 20.0, 50.0],
+        "eyeContact": [10.0, 20.0, 30.0, 40.0, 50.0],
+        "engagement": [90.0, 90.0, 90.0, 90.0, 90.0],
+        "emotion": ["happy", None, "happy", "nervous", "happy"],
+        "posture": [None] * 5,
+        "timestamp": [BASE_MS + 6000, BASE_MS + 1000, BASE_MS + 2000, BASE_MS + 9000, BASE_MS + 25000]
+    })
+    return series
+
+
+def test_rollup_buckets_by_time():
+    timeline = rollup(make_series(), 5)
+    assert timeline["bucket_seconds"] == 5
+    assert timeline["start"] == [BASE_MS, BASE_MS + 5000, BASE_MS + 25000]
+    assert timeline["samples"] == [2, 2, 1]
+    assert timeline["confidence"] == {"min": [60.0, 20.0, 50.0], "avg": [70.0, 30.0, 50.0], "max": [80.0, 40.0, 50.0]}
+    assert timeline["emotions"] == {"none": [1, 0, 0], "happy": [1, 1, 1], "nervous": [0, 1, 0]}
+
+
+def test_rollup_range_selects_buckets_by_their_start():
+    timeline = rollup(make_series(), 5, start_ms=BASE_MS + 1000, end_ms=BASE_MS + 25000)
+    assert timeline["start"] == [BASE_MS + 5000]
+    assert timeline["emotions"] == {"happy": [1], "nervous": [1]}
+
+
+def test_rollup_of_an_empty_series():
+    timeline = rollup(ExpressionSeries(), 5)
+    assert timeline["start"] == [] and timeline["emotions"] == {}
+
+
+def test_documents_round_trip():
+    timeline = rollup(make_series(), 5)
+    documents = to_documents("s1", timeline)
+    assert len(documents) == 3
+    assert documents[0]["ts"] == datetime.fromtimestamp(BASE_MS / 1000, tz=timezone.utc)
+    assert documents[0]["session_id"] == "s1"
+    assert documents[1]["emotions"] == [["happy", 1], ["nervous", 1]]
+    assert from_documents(documents) == timeline
+
+
+def test_from_documents_accepts_naive_datetimes():
+    documents = to_documents("s1", rollup(make_series(), 5))
+    for document in documents:
+        # MongoDB hands back naive UTC datetimes
+        document["ts"] = document["ts"].replace(tzinfo=None)
+    assert from_documents(documents)["start"] == [BASE_MS, BASE_MS + 5000, BASE_MS + 25000]
+
+
+def test_to_documents_drops_unrepresentable_buckets():
+    timeline = rollup(make_series(), 5)
+    timeline["start"][0] = -5000
+    dropped = timeline_metrics["dropped_buckets"]
+    documents = to_documents("s1", timeline)
+    assert [document["samples"] for document in documents] == [2, 1]
+    assert timeline_metrics["dropped_buckets"] == dropped + 1
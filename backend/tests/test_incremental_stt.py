@@ -0,0 +1,69 @@
+import math
+from array import array
+
+from audio_preprocess import find_pause_cuts, SAMPLE_RATE, AUDIO_VAD_FRAME_MS
+from incremental_stt import split_new_segments, tail_segment
+
+FRAME_BYTES = SAMPLE_RATE * AUDIO_VAD_FRAME_MS // 1000 * 2
+
+
+def tone(ms: int, amplitude: int = 8000) -> bytes:
+    count = SAMPLE_RATE * ms // 1000
+    return array("h", (int(amplitude * math.sin(2 * math.pi * 440 * i / SAMPLE_RATE)) for i in range(count))).tobytes()
+
+
+def silence(ms: int) -> bytes:
+    return bytes(SAMPLE_RATE * ms // 1000 * 2)
+
+
+def test_pause_cuts_fall_inside_pauses_that_follow_speech():
+    pcm = silence(900) + tone(600) + silence(900) + tone(600) + silence(300) + tone(600) + silence(900)
+    cuts = find_pause_cuts(pcm, 600)
+    # Leading silence and the 300 ms pause are not cut points
+    assert len(cuts) == 2
+    first_pause = (len(silence(900) + tone(600)), len(silence(900) + tone(600) + silence(900)))
+    assert first_pause[0] < cuts[0] < first_pause[1]
+    assert cuts[1] > len(pcm) - len(silence(900))
+    assert all(cut % FRAME_BYTES == 0 for cut in cuts)
+
+
+def test_split_new_segments_reports_what_it_used():
+    pcm = tone(900) + silence(900) + tone(900)
+    segments, used = split_new_segments(pcm, 600, 0.5)
+    assert len(segments) == 1
+    wav, seconds = segments[0]
+    assert wav[:4] == b"RIFF"
+    assert seconds == used / (SAMPLE_RATE * 2)
+    assert used == find_pause_cuts(pcm, 600)[0]
+    # The rest is the tail, sent once the answer is finished
+    assert tail_segment(pcm[used:]) is not None
+    assert tail_segment(silence(500)) is None
+
+
+def test_split_new_segments_skips_segments_shorter_than_the_minimum():
+    pcm = tone(300) + silence(900) + tone(300)
+    assert split_new_segments(pcm, 600, 2.0) == ([], 0)
+
+
+def test_speech_without_pauses_is_cut_at_a_quiet_point_before_the_maximum():
+    # Breaths too short to count as pauses: the only places a cut would not split a word
+    stretch = tone(1400) + silence(300) + tone(1400)
+    pcm = silence(900) + stretch * 3
+    segments, used = split_new_segments(pcm, 600, 1.0, max_seconds=3.5)
+    assert segments
+    assert all(seconds <= 3.5 for _, seconds in segments)
+    assert len(pcm) - used <= 3.5 * SAMPLE_RATE * 2
+    # Every cut falls in a breath
+    offset = 0
+    for wav, seconds in segments:
+        offset += int(seconds * SAMPLE_RATE * 2)
+        assert not any(pcm[offset:offset + FRAME_BYTES])
+
+
+def test_pending_audio_stays_bounded_as_an_answer_grows():
+    pending = b""
+    for _ in range(40):
+        pending += tone(500)
+        segments, used = split_new_segments(pending, 600, 2.0, max_seconds=5.0)
+        pending = pending[used:]
+        assert len(pending) <= 5.0 * SAMPLE_RATE * 2
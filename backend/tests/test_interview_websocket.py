@@ -0,0 +1,33 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+import main
+from session_state import InterviewState
+
+
+@pytest.fixture
+def session_id():
+    asyncio.run(main.session_store.create("ws-test", InterviewState()))
+    yield "ws-test"
+    asyncio.run(main.session_store.delete("ws-test"))
+
+
+def test_unknown_session_is_refused():
+    with TestClient(main.app).websocket_connect("/ws/interview/missing") as websocket:
+        assert websocket.receive_json() == {"type": "error", "detail": "Session not found"}
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_json()
+    assert closed.value.code == 4404
+
+
+def test_unknown_voice_is_refused_when_the_socket_opens(session_id):
+    with TestClient(main.app).websocket_connect(f"/ws/interview/{session_id}?voice=en-XX-Nobody") as websocket:
+        message = websocket.receive_json()
+        assert message["type"] == "error"
+        assert "en-XX-Nobody" in message["detail"]
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_json()
+    assert closed.value.code == 4422
@@ -0,0 +1,121 @@
+import types
+import asyncio
+
+import httpx
+
+from jobs import JobManager
+
+
+def test_submit_with_a_key_runs_the_work_once():
+    async def scenario():
+        manager = JobManager(workers=2, result_ttl_seconds=60)
+        runs = []
+
+        async def work():
+            runs.append(1)
+            await asyncio.sleep(0.01)
+            return "done"
+
+        first = manager.submit("end", work, key="end:s1")
+        assert manager.submit("end", work, key="end:s1") is first
+        assert manager.find("end:s1") is first
+        await asyncio.sleep(0.05)
+        assert first["status"] == "succeeded"
+        # A retained result is still returned to a late retry
+        assert manager.submit("end", work, key="end:s1") is first
+        assert runs == [1]
+
+    asyncio.run(scenario())
+
+
+def test_a_failed_job_is_not_reused():
+    async def scenario():
+        manager = JobManager(workers=1, result_ttl_seconds=60)
+
+        async def fail():
+            raise RuntimeError("model unavailable")
+
+        failed = manager.submit("end", fail, key="end:s1")
+        await asyncio.sleep(0.01)
+        assert failed["status"] == "failed"
+        assert manager.find("end:s1") is None
+        retried = manager.submit("end", fail, key="end:s1")
+        assert retried is not failed
+
+    asyncio.run(scenario())
+
+
+def test_expired_results_are_forgotten():
+    async def scenario():
+        manager = JobManager(workers=1, result_ttl_seconds=0)
+
+        async def work():
+            return 1
+
+        job = manager.submit("end", work, key="end:s1")
+        await asyncio.sleep(0.01)
+        job["finished_at"] -= 1
+        assert manager.find("end:s1") is None
+        assert manager.get(job["job_id"]) is None
+
+    asyncio.run(scenario())
+
+
+class FakeCompletions:
+    """Stands in for client.chat.completions: a fixed reply and a call count"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        text = "Tell me about a project you are proud of. Overall solid. **Final Score**: 7/10"
+        return types.SimpleNamespace(
+            choices=[types.SimpleNamespace(message=types.SimpleNamespace(content=text))],
+            usage=types.SimpleNamespace(total_tokens=100)
+        )
+
+
+def test_async_end_is_deduplicated_and_survives_the_session_ending(monkeypatch):
+    import main
+    import groq_client
+
+    completions = FakeCompletions()
+    monkeypatch.setattr(groq_client, "client", types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions)))
+
+    async def no_database(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(main, "create_interview_db", no_database)
+    monkeypatch.setattr(main, "update_interview", no_database)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/interview/start", json={"enable_tts": False})
+            assert response.status_code == 200, response.text
+            session_id = response.json()["session_id"]
+            calls_after_start = completions.calls
+
+            first = await client.post(f"/interview/{session_id}/end?async_job=true")
+            second = await client.post(f"/interview/{session_id}/end?async_job=true")
+            assert first.status_code == second.status_code == 202
+            job_id = first.json()["job_id"]
+            assert second.json()["job_id"] == job_id
+
+            for _ in range(100):
+                job = (await client.get(f"/jobs/{job_id}")).json()
+                if job["status"] != "queued" and job["status"] != "running":
+                    break
+                await asyncio.sleep(0.02)
+            assert job["status"] == "succeeded", job
+
+            # The session is gone now, but a retry still gets the finished job instead of a 404
+            retry = await client.post(f"/interview/{session_id}/end?async_job=true")
+            assert retry.status_code == 202
+            assert retry.json()["job_id"] == job_id
+            assert (await client.post(f"/interview/{session_id}/end")).status_code == 404
+            assert completions.calls == calls_after_start + 1
+
+    asyncio.run(scenario())
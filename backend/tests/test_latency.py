@@ -0,0 +1,59 @@
+import asyncio
+
+import latency
+from latency import run_with_fallback, resilient_chat_stream
+
+
+def test_a_loser_that_also_succeeded_is_discarded(monkeypatch):
+    monkeypatch.setitem(latency.LATENCY_BUDGETS_MS, "test.hedge", 10)
+
+    async def scenario():
+        both_running = asyncio.Event()
+        discarded = []
+
+        async def primary():
+            await both_running.wait()
+            return "primary"
+
+        async def fallback():
+            # Wakes the primary, so both finish before the race is looked at
+            both_running.set()
+            return "fallback"
+
+        async def discard(result):
+            discarded.append(result)
+
+        result, served = await run_with_fallback("test.hedge", primary, "p", fallback, "f", discard=discard)
+        assert discarded == [{"p": "fallback", "f": "primary"}[served["served_by"]]]
+        assert result != discarded[0]
+
+    asyncio.run(scenario())
+
+
+def test_the_losing_stream_is_closed(monkeypatch):
+    monkeypatch.setitem(latency.LATENCY_BUDGETS_MS, "test.stream", 10)
+
+    async def scenario():
+        started = asyncio.Event()
+        closed = []
+
+        def fake_stream(model, **kwargs):
+            async def tokens():
+                try:
+                    if model == "slow":
+                        await started.wait()
+                    else:
+                        started.set()
+                    yield f"{model} says hi"
+                finally:
+                    closed.append(model)
+            return tokens()
+
+        monkeypatch.setattr(latency, "stream_chat_completion", fake_stream)
+        stream, served = await resilient_chat_stream("test.stream", [], model="slow", fallback_model="fast")
+        winner = served["served_by"]
+        assert closed == [{"slow": "fast", "fast": "slow"}[winner]]
+        assert [token async for token in stream] == [f"{winner} says hi"]
+        assert sorted(closed) == ["fast", "slow"]
+
+    asyncio.run(scenario())
@@ -0,0 +1,56 @@
+import asyncio
+
+from session_snapshot import SessionSnapshotter, SnapshotJournal
+from session_store import MemorySessionStore
+from session_state import InterviewState
+
+
+def make_snapshotter(tmp_path):
+    store = MemorySessionStore()
+    return store, SessionSnapshotter(store, SnapshotJournal(str(tmp_path)))
+
+
+def test_turns_are_journaled_and_restored(tmp_path):
+    async def scenario():
+        store, snapshotter = make_snapshotter(tmp_path)
+        session = InterviewState()
+        await store.create("s1", session)
+        await snapshotter.checkpoint()
+        session.history.append({"role": "user", "content": "my answer"})
+        await store.save("s1", session)
+        await snapshotter.checkpoint()
+
+        restored = SnapshotJournal(str(tmp_path)).load("s1")
+        assert restored.version == session.version
+        assert restored.history.to_list() == [{"role": "user", "content": "my answer"}]
+
+    asyncio.run(scenario())
+
+
+def test_background_updates_without_a_save_are_journaled(tmp_path):
+    async def scenario():
+        store, snapshotter = make_snapshotter(tmp_path)
+        session = InterviewState()
+        await store.create("s1", session)
+        await snapshotter.checkpoint()
+        # What the context fold and the assessment notes do to the live session, before any save
+        session.context.update(summary="asked about hash maps", summarized_upto=4)
+        session.assessment.update(notes="solid on complexity", assessed_upto=6)
+        await snapshotter.checkpoint()
+
+        restored = SnapshotJournal(str(tmp_path)).load("s1")
+        assert restored.context["summary"] == "asked about hash maps"
+        assert restored.assessment["notes"] == "solid on complexity"
+        assert restored.assessment["assessed_upto"] == 6
+
+    asyncio.run(scenario())
+
+
+def test_an_unchanged_session_is_not_rewritten(tmp_path):
+    async def scenario():
+        store, snapshotter = make_snapshotter(tmp_path)
+        await store.create("s1", InterviewState())
+        await snapshotter.checkpoint()
+        assert snapshotter._collect() == []
+
+    asyncio.run(scenario())
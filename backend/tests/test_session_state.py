@@ -0,0 +1,122 @@
+import json
+import math
+
+import pytest
+
+from session_state import ExpressionSeries, EXPRESSION_MAX_LABELS, EXPRESSION_TIMESTAMP_MAX_MS, OTHER_LABEL
+
+
+def make_sample(**overrides):
+    sample = {
+        "confidence": 72.5,
+        "eyeContact": 60.0,
+        "engagement": 80.25,
+        "emotion": "happy",
+        "posture": "upright",
+        "timestamp": 1_700_000_000_000
+    }
+    sample.update(overrides)
+    return sample
+
+
+def make_columns(count, **overrides):
+    columns = {
+        "confidence": [50.0 + i % 50 for i in range(count)],
+        "eyeContact": [40.0] * count,
+        "engagement": [90.0] * count,
+        "emotion": ["neutral", "focused"] * (count // 2) + ["neutral"] * (count % 2),
+        "posture": [None] * count,
+        "timestamp": [1_700_000_000_000 + i * 500 for i in range(count)]
+    }
+    columns.update(overrides)
+    return columns
+
+
+def test_append_returns_index_and_reads_back():
+    series = ExpressionSeries()
+    assert series.append(make_sample()) == 0
+    assert series.append(make_sample(emotion=None, timestamp=1_700_000_000_500)) == 1
+    assert series.sample(0) == make_sample()
+    assert series.sample(1)["emotion"] is None
+    assert series.metrics()["emotion_distribution"] == {"happy": 50.0, None: 50.0}
+
+
+@pytest.mark.parametrize("overrides", [
+    {"confidence": -0.1},
+    {"eyeContact": 100.5},
+    {"engagement": math.nan},
+    {"confidence": math.inf},
+    {"timestamp": -1},
+    {"timestamp": EXPRESSION_TIMESTAMP_MAX_MS + 1},
+    {"timestamp": 1.5}
+])
+def test_append_rejects_bad_values_without_touching_the_series(overrides):
+    series = ExpressionSeries()
+    series.append(make_sample())
+    with pytest.raises(ValueError):
+        series.append(make_sample(emotion="brand-new", **overrides))
+    assert len(series) == 1
+    assert series.labels == ["happy", "upright"]
+    assert series.metrics()["avg_confidence"] == 72.5
+
+
+def test_extend_adds_a_batch_and_matches_appending_one_by_one():
+    columns = make_columns(11)
+    batched = ExpressionSeries()
+    assert batched.extend(columns) == 11
+    single = ExpressionSeries()
+    for i in range(11):
+        single.append({name: values[i] for name, values in columns.items()})
+    assert [batched.sample(i) for i in range(11)] == [single.sample(i) for i in range(11)]
+    assert batched.metrics() == single.metrics()
+
+
+def test_extend_rejects_ragged_columns():
+    series = ExpressionSeries()
+    with pytest.raises(ValueError):
+        series.extend(make_columns(4, engagement=[90.0] * 3))
+    assert len(series) == 0
+
+
+def test_extend_is_all_or_nothing():
+    series = ExpressionSeries()
+    bad = make_columns(5, emotion=["a", "b", "c", "d", "e"])
+    bad["confidence"][4] = 101
+    with pytest.raises(ValueError):
+        series.extend(bad)
+    assert len(series) == 0
+    assert series.labels == []
+
+
+def test_label_vocabulary_is_capped_and_overflows_to_other():
+    series = ExpressionSeries()
+    count = EXPRESSION_MAX_LABELS + 10
+    series.extend(make_columns(count, emotion=[f"emotion-{i}" for i in range(count)]))
+    assert len(series.labels) == EXPRESSION_MAX_LABELS
+    assert series.labels[-1] == OTHER_LABEL
+    assert series.sample(count - 1)["emotion"] == OTHER_LABEL
+    # Labels interned before the cap keep their own code
+    assert series.sample(0)["emotion"] == "emotion-0"
+
+
+def test_dump_and_load_round_trip_through_json():
+    series = ExpressionSeries()
+    series.extend(make_columns(25))
+    series.append(make_sample())
+    loaded = ExpressionSeries.load(json.loads(json.dumps(series.dump())))
+    assert len(loaded) == len(series)
+    assert [loaded.sample(i) for i in range(len(loaded))] == [series.sample(i) for i in range(len(series))]
+    assert loaded.metrics() == series.metrics()
+    # The restored vocabulary keeps interning to the same codes
+    assert loaded.code("happy") == series.code("happy")
+    assert loaded.append(make_sample(emotion="focused")) == len(series)
+
+
+def test_splice_applies_a_partial_dump():
+    series = ExpressionSeries()
+    series.extend(make_columns(10))
+    copy = ExpressionSeries.load(series.dump())
+    series.extend(make_columns(5, emotion=["bored"] * 5))
+    copy.splice(10, json.loads(json.dumps(series.dump(10))))
+    assert [copy.sample(i) for i in range(15)] == [series.sample(i) for i in range(15)]
+    assert copy.metrics() == series.metrics()
@@ -0,0 +1,110 @@
+import json
+import asyncio
+
+import pytest
+
+import session_store as store_module
+from session_store import MemorySessionStore, SessionStore, SessionConflictError, SessionNotFoundError
+from session_state import InterviewState
+
+
+def stale_copy(session: InterviewState) -> InterviewState:
+    """What another worker would hold: a separate copy at the current version"""
+    return InterviewState.from_dict(json.loads(json.dumps(session.to_dict())), session.version)
+
+
+def test_save_of_a_stale_copy_conflicts():
+    async def scenario():
+        store = MemorySessionStore()
+        await store.create("s1", InterviewState())
+        first = stale_copy(await store.get("s1"))
+        second = stale_copy(await store.get("s1"))
+        first.question_count = 1
+        await store.save("s1", first)
+        second.question_count = 2
+        with pytest.raises(SessionConflictError):
+            await store.save("s1", second)
+        assert (await store.get("s1")).question_count == 1
+
+    asyncio.run(scenario())
+
+
+def test_update_retries_on_conflict_and_reapplies_mutate(monkeypatch):
+    monkeypatch.setattr(store_module, "SESSION_STORE_CAS_BACKOFF_MS", 0)
+
+    async def scenario():
+        store = MemorySessionStore()
+        await store.create("s1", InterviewState())
+        stale = stale_copy(await store.get("s1"))
+        # Another writer gets in first
+        current = await store.get("s1")
+        current.question_count += 1
+        await store.save("s1", stale_copy(current))
+
+        calls = []
+
+        def mutate(session):
+            calls.append(session.version)
+            session.question_count += 10
+            return session.question_count
+
+        retries = store_module.session_store_metrics["retries"]
+        saved, result = await store.update("s1", mutate, session=stale)
+        assert result == 11
+        assert saved.question_count == 11
+        # Applied to the stale copy, then again to the re-read one
+        assert calls == [1, 2]
+        assert store_module.session_store_metrics["retries"] == retries + 1
+        assert await store.version("s1") == 3
+
+    asyncio.run(scenario())
+
+
+def test_update_gives_up_after_the_retry_budget(monkeypatch):
+    monkeypatch.setattr(store_module, "SESSION_STORE_CAS_RETRIES", 2)
+    monkeypatch.setattr(store_module, "SESSION_STORE_CAS_BACKOFF_MS", 0)
+
+    async def scenario():
+        store = MemorySessionStore()
+        await store.create("s1", InterviewState())
+        attempts = []
+
+        def mutate(session):
+            attempts.append(1)
+            # Someone else writes between every read and save
+            store._sessions["s1"] = stale_copy(session)
+            store._sessions["s1"].version += 1
+
+        with pytest.raises(SessionConflictError):
+            await store.update("s1", mutate, session=stale_copy(await store.get("s1")))
+        assert len(attempts) == 3
+
+    asyncio.run(scenario())
+
+
+def test_update_of_a_missing_session_is_not_found():
+    async def scenario():
+        with pytest.raises(SessionNotFoundError):
+            await MemorySessionStore().update("missing", lambda session: None)
+
+    asyncio.run(scenario())
+
+
+def test_delete_with_a_version_only_removes_that_version():
+    async def scenario():
+        store = MemorySessionStore()
+        await store.create("s1", InterviewState())
+        assert not await store.delete("s1", version=0)
+        assert await store.delete("s1", version=1)
+        assert await store.version("s1") is None
+
+    asyncio.run(scenario())
+
+
+def test_a_backend_missing_a_method_fails_at_construction():
+    class Incomplete(SessionStore):
+        async def get(self, session_id):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,89 @@
+import pytest
+
+from streaming import ScoreTagFilter, SentenceChunker
+
+
+def run_filter(tokens):
+    score_filter = ScoreTagFilter()
+    shown = "".join(score_filter.feed(token) for token in tokens)
+    tail, score = score_filter.finish()
+    return shown + tail, score
+
+
+def test_score_tag_in_one_token_is_removed():
+    assert run_filter(["Nice answer. [SCORE: 8/10]"]) == ("Nice answer.", 8)
+
+
+@pytest.mark.parametrize("tokens", [
+    ["Good.", " [", "SCO", "RE:", " 7", "/1", "0]"],
+    ["Good.", " ", "[SCORE: 7/", "10", "]"],
+    list("Good. [SCORE: 7/10]")
+])
+def test_score_tag_split_across_tokens_is_never_shown(tokens):
+    score_filter = ScoreTagFilter()
+    for token in tokens:
+        assert "[" not in score_filter.feed(token)
+    assert score_filter.finish() == ("", 7)
+
+
+def test_decimal_score():
+    assert run_filter(["Solid. [SCORE: 6.5/10]"]) == ("Solid.", 6.5)
+
+
+def test_text_after_the_tag_is_kept():
+    assert run_filter(["Ok [SCORE: 5/10]", " next question?"]) == ("Ok next question?", 5)
+
+
+def test_first_tag_wins():
+    assert run_filter(["A [SCORE: 4/10] B [SCORE: 9/10]"]) == ("A B", 4)
+
+
+def test_brackets_that_are_not_a_tag_pass_through():
+    score_filter = ScoreTagFilter()
+    shown = score_filter.feed("Use a list [")
+    shown += score_filter.feed("1, 2] here")
+    tail, score = score_filter.finish()
+    assert shown + tail == "Use a list [1, 2] here"
+    assert score is None
+
+
+def test_incomplete_tag_at_the_end_is_dropped():
+    assert run_filter(["Done.", " [SCORE: 7"]) == ("Done.", None)
+
+
+def test_held_whitespace_is_released_when_no_tag_follows():
+    score_filter = ScoreTagFilter()
+    assert score_filter.feed("Hello ") == "Hello"
+    assert score_filter.feed("world") == " world"
+
+
+def test_chunker_emits_complete_sentences():
+    chunker = SentenceChunker(min_chars=10)
+    assert chunker.feed("This is the first sentence. And the sec") == ["This is the first sentence."]
+    assert chunker.feed("ond one! Tail") == ["And the second one!"]
+    assert chunker.flush() == "Tail"
+    assert chunker.flush() is None
+
+
+def test_chunker_merges_short_sentences():
+    chunker = SentenceChunker(min_chars=20)
+    assert chunker.feed("Yes. Ok. That is a longer sentence. ") == ["Yes. Ok. That is a longer sentence."]
+
+
+def test_chunker_waits_for_whitespace_after_punctuation():
+    chunker = SentenceChunker(min_chars=5)
+    # "3.14" must not split on the decimal point
+    assert chunker.feed("Pi is 3.") == []
+    assert chunker.feed("14 roughly. ") == ["Pi is 3.14 roughly."]
+
+
+def test_chunker_splits_on_cjk_and_devanagari_punctuation():
+    chunker = SentenceChunker(min_chars=2)
+    assert chunker.feed("你好世界。 再见！ ") == ["你好世界。", "再见！"]
+    assert chunker.feed("नमस्ते दुनिया। ") == ["नमस्ते दुनिया।"]
+
+
+def test_chunker_flush_of_whitespace_is_none():
+    chunker = SentenceChunker()
+    chunker.feed("   ")
+    assert chunker.flush() is None
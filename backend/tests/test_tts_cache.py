@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from tts_cache import TTSCache
+
+
+def make_cache(tmp_path) -> TTSCache:
+    return TTSCache(str(tmp_path), memory_limit_bytes=1 << 20, disk_limit_bytes=1 << 20)
+
+
+def test_concurrent_requests_share_one_synthesis(tmp_path):
+    async def scenario():
+        cache = make_cache(tmp_path)
+        calls = []
+
+        async def synthesize():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return b"audio"
+
+        results = await asyncio.gather(*(cache.get_or_create("k", synthesize) for _ in range(3)))
+        assert sorted(results) == [(b"audio", False), (b"audio", True), (b"audio", True)]
+        assert calls == [1]
+        assert await cache.get_or_wait("k") == b"audio"
+
+    asyncio.run(scenario())
+
+
+def test_a_cancelled_producer_hands_the_synthesis_to_a_waiter(tmp_path):
+    async def scenario():
+        cache = make_cache(tmp_path)
+        calls = []
+
+        async def synthesize():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return b"audio"
+
+        producer = asyncio.ensure_future(cache.get_or_create("k", synthesize))
+        await asyncio.sleep(0.01)
+        creator = asyncio.ensure_future(cache.get_or_create("k", synthesize))
+        reader = asyncio.ensure_future(cache.get_or_wait("k"))
+        await asyncio.sleep(0.01)
+        # The client that started the synthesis goes away
+        producer.cancel()
+        assert await creator == (b"audio", False)
+        assert await reader == b"audio"
+        assert calls == [1, 1]
+        with pytest.raises(asyncio.CancelledError):
+            await producer
+
+    asyncio.run(scenario())
+
+
+def test_a_reader_falls_through_when_the_only_synthesis_is_cancelled(tmp_path):
+    async def scenario():
+        cache = make_cache(tmp_path)
+
+        async def synthesize():
+            await asyncio.sleep(1)
+            return b"audio"
+
+        producer = asyncio.ensure_future(cache.get_or_create("k", synthesize))
+        await asyncio.sleep(0.01)
+        reader = asyncio.ensure_future(cache.get_or_wait("k"))
+        await asyncio.sleep(0.01)
+        producer.cancel()
+        assert await reader is None
+
+    asyncio.run(scenario())
+
+
+def test_a_cancelled_waiter_does_not_cancel_the_synthesis(tmp_path):
+    async def scenario():
+        cache = make_cache(tmp_path)
+
+        async def synthesize():
+            await asyncio.sleep(0.03)
+            return b"audio"
+
+        producer = asyncio.ensure_future(cache.get_or_create("k", synthesize))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.ensure_future(cache.get_or_create("k", synthesize))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert await producer == (b"audio", False)
+
+    asyncio.run(scenario())
@@ -0,0 +1,268 @@
+"""
+Content-addressed TTS audio cache for AI Interviewer
+Size-bounded in-memory LRU in front of an on-disk tier, keyed by hash(text, voice, engine, format)
+"""
+
+import os
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Optional, Dict, List, Callable, Awaitable, Tuple
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "./data/tts_cache")
+TTS_CACHE_MEMORY_MB = float(os.getenv("TTS_CACHE_MEMORY_MB", "64"))
+TTS_CACHE_DISK_MB = float(os.getenv("TTS_CACHE_DISK_MB", "512"))
+
+
+def tts_cache_key(text: str, voice: str, engine: str, audio_format: str) -> str:
+    """Stable content hash identifying one synthesized utterance"""
+    digest = hashlib.sha256()
+    for part in (engine, voice, audio_format, text):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class TTSCache:
+    """Two-tier (memory LRU + disk) cache of synthesized audio"""
+
+    def __init__(self, directory: str, memory_limit_bytes: int, disk_limit_bytes: int):
+        self.directory = directory
+        self.memory_limit_bytes = memory_limit_bytes
+        self.disk_limit_bytes = disk_limit_bytes
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_sizes: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self._disk_loaded = False
+        self._disk_indexing: Optional[asyncio.Future] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        # Served by a synthesis of the same key that was already running
+        self.inflight_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ---------- disk tier ----------
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def _scan_disk(self) -> List[Tuple[str, int]]:
+        """(key, size) of the existing cache files, oldest first (runs on a worker thread)"""
+        if self.disk_limit_bytes <= 0 or not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, name, stat.st_size))
+        return [(name, size) for _, name, size in sorted(entries)]
+
+    async def _load_disk_index(self):
+        """
+        Index existing cache files so disk eviction survives restarts. The
+        first lookups all wait for one scan; the index is filled in on the
+        event loop, like every other change to it.
+        """
+        if self._disk_indexing is None:
+            self._disk_indexing = asyncio.ensure_future(asyncio.to_thread(self._scan_disk))
+        entries = await asyncio.shield(self._disk_indexing)
+        if self._disk_loaded:
+            return
+        self._disk_loaded = True
+        for name, size in entries:
+            if name not in self._disk_sizes:
+                self._disk_sizes[name] = size
+                self._disk_bytes += size
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_disk(self, key: str, data: bytes):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _remove_disk(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    async def _store_disk(self, key: str, data: bytes):
+        if self.disk_limit_bytes <= 0 or len(data) > self.disk_limit_bytes:
+            return
+        try:
+            await asyncio.to_thread(self._write_disk, key, data)
+        except OSError as e:
+            print(f"TTS cache disk write failed: {e}")
+            return
+
+        self._disk_bytes -= self._disk_sizes.pop(key, 0)
+        self._disk_sizes[key] = len(data)
+        self._disk_bytes += len(data)
+        while self._disk_bytes > self.disk_limit_bytes and self._disk_sizes:
+            old_key, size = self._disk_sizes.popitem(last=False)
+            self._disk_bytes -= size
+            self.evictions += 1
+            await asyncio.to_thread(self._remove_disk, old_key)
+
+    # ---------- memory tier ----------
+
+    def _store_memory(self, key: str, data: bytes):
+        if len(data) > self.memory_limit_bytes:
+            return
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.memory_limit_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    # ---------- public API ----------
+
+    async def _lookup(self, key: str) -> Optional[bytes]:
+        """Memory, then disk; hits are counted here, misses by the caller"""
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return data
+
+        if not self._disk_loaded:
+            await self._load_disk_index()
+        if key in self._disk_sizes:
+            data = await asyncio.to_thread(self._read_disk, key)
+            if data is not None:
+                self._disk_sizes.move_to_end(key)
+                self._store_memory(key, data)
+                self.disk_hits += 1
+                return data
+            self._disk_bytes -= self._disk_sizes.pop(key, 0)
+        return None
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Look a key up in memory, then on disk"""
+        data = await self._lookup(key)
+        if data is None:
+            self.misses += 1
+        return data
+
+    async def put(self, key: str, data: bytes):
+        """Store audio in both tiers"""
+        self._store_memory(key, data)
+        if not self._disk_loaded:
+            await self._load_disk_index()
+        await self._store_disk(key, data)
+
+    async def _settled(self, key: str) -> Optional[asyncio.Future]:
+        """
+        Wait for the synthesis of this key that is running, if any; returns
+        its finished future, or None once none is running. A synthesis whose
+        request was cancelled (a client that went away) is skipped over, not
+        passed on: only this request's own cancellation raises here.
+        """
+        while True:
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                return None
+            # wait() never cancels what it waits for, and only raises if this request is cancelled
+            await asyncio.wait({inflight})
+            if not inflight.cancelled():
+                self.inflight_hits += 1
+                return inflight
+
+    async def get_or_wait(self, key: str) -> Optional[bytes]:
+        """Like get(), but waits for a synthesis of this key that is still running"""
+        data = await self._lookup(key)
+        if data is not None:
+            return data
+        inflight = await self._settled(key)
+        if inflight is None or inflight.exception() is not None:
+            self.misses += 1
+            return None
+        return inflight.result()
+
+    async def get_or_create(self, key: str, factory: Callable[[], Awaitable[bytes]]) -> Tuple[bytes, bool]:
+        """
+        Return (audio, was_cached). Concurrent requests for the same key share
+        a single synthesis instead of each calling the TTS engine; if the
+        request running it is cancelled, a waiting one takes it over.
+        """
+        inflight = await self._settled(key)
+        if inflight is not None:
+            return inflight.result(), True
+
+        # Registered before the first await, so get_or_wait() finds it as soon as this starts
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            data = await self._lookup(key)
+            if data is not None:
+                future.set_result(data)
+                return data, True
+            self.misses += 1
+            data = await factory()
+            await self.put(key, data)
+            future.set_result(data)
+            return data, False
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    def stats(self) -> dict:
+        """Hit-rate counters and tier sizes, for sizing the cache"""
+        hits = self.memory_hits + self.disk_hits + self.inflight_hits
+        lookups = hits + self.misses
+        return {
+            "lookups": lookups,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "inflight_hits": self.inflight_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 3) if lookups else None,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "memory_limit_bytes": self.memory_limit_bytes,
+            "disk_entries": len(self._disk_sizes),
+            "disk_bytes": self._disk_bytes,
+            "disk_limit_bytes": self.disk_limit_bytes,
+            "disk_evictions": self.evictions
+        }
+
+
+# Global cache instance shared by all TTS endpoints
+tts_cache = TTSCache(
+    TTS_CACHE_DIR,
+    memory_limit_bytes=int(TTS_CACHE_MEMORY_MB * 1024 * 1024),
+    disk_limit_bytes=int(TTS_CACHE_DISK_MB * 1024 * 1024)
+)
@@ -0,0 +1,170 @@
+"""
+Turn guard for AI Interviewer
+One answer at a time per session, and Idempotency-Key replay so a retried or double-clicked upload never runs Whisper and the LLM twice
+"""
+
+import os
+import time
+import asyncio
+import hashlib
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Callable, Awaitable, Any, Tuple
+from dotenv import load_dotenv
+from fastapi import HTTPException
+
+# Load environment variables
+load_dotenv()
+
+# A second answer for the same session waits this long for the first, then gets 409
+SESSION_TURN_LOCK_TIMEOUT_SECONDS = float(os.getenv("SESSION_TURN_LOCK_TIMEOUT_SECONDS", "60"))
+# How long a finished response is replayed for the same Idempotency-Key
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "600"))
+# Oldest keys are dropped beyond this many
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+
+# Process-wide totals, exposed through /metrics
+turn_guard_metrics = {
+    "turns": 0,
+    "lock_waits": 0,
+    "lock_timeouts": 0,
+    "keyed_requests": 0,
+    "replayed": 0,
+    "joined_in_flight": 0,
+    "key_mismatches": 0
+}
+
+
+def request_fingerprint(*parts: Any) -> str:
+    """Digest of a request's body parts, to spot an Idempotency-Key reused for another request"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else repr(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class SessionLocks:
+    """
+    One asyncio.Lock per session, dropped once nobody holds or waits for it.
+    Process-local: across workers the session store's version check still
+    prevents lost writes, this only keeps one worker's turns in order.
+    """
+
+    def __init__(self, timeout_seconds: float):
+        self.timeout_seconds = timeout_seconds
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._users: Dict[str, int] = {}
+
+    @asynccontextmanager
+    async def hold(self, session_id: str):
+        lock = self._locks.setdefault(session_id, asyncio.Lock())
+        self._users[session_id] = self._users.get(session_id, 0) + 1
+        try:
+            if lock.locked():
+                turn_guard_metrics["lock_waits"] += 1
+            try:
+                await asyncio.wait_for(lock.acquire(), self.timeout_seconds)
+            except asyncio.TimeoutError:
+                turn_guard_metrics["lock_timeouts"] += 1
+                raise HTTPException(status_code=409, detail="The previous answer for this session is still being processed")
+            turn_guard_metrics["turns"] += 1
+            try:
+                yield
+            finally:
+                lock.release()
+        finally:
+            self._users[session_id] -= 1
+            if not self._users[session_id]:
+                del self._users[session_id]
+                del self._locks[session_id]
+
+    def active(self) -> int:
+        return len(self._locks)
+
+
+class IdempotencyCache:
+    """
+    Results of keyed requests for IDEMPOTENCY_TTL_SECONDS. The work runs as
+    its own task, so a duplicate that arrives while the first is still in
+    flight waits for the same result, and a client that disconnects and
+    retries picks up the answer instead of starting over. Failures are not
+    kept; the next retry runs again.
+    """
+
+    def __init__(self, ttl_seconds: int, max_keys: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_keys = max_keys
+        self._entries: Dict[Tuple[str, str, str], dict] = {}
+
+    def _purge_expired(self):
+        now = time.time()
+        expired = [
+            key for key, entry in self._entries.items()
+            if entry["finished_at"] and now - entry["finished_at"] > self.ttl_seconds
+        ]
+        for key in expired:
+            del self._entries[key]
+        while len(self._entries) > self.max_keys:
+            del self._entries[next(iter(self._entries))]
+
+    def _settle(self, key: Tuple[str, str, str], task: asyncio.Task):
+        entry = self._entries.get(key)
+        if entry is None or entry["task"] is not task:
+            return
+        if task.cancelled() or task.exception() is not None:
+            del self._entries[key]
+        else:
+            entry["finished_at"] = time.time()
+
+    async def run(
+        self,
+        scope: str,
+        session_id: str,
+        key: Optional[str],
+        fingerprint: str,
+        work: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        """
+        Run work() once per (scope, session, key). Returns (result, replayed).
+        Without a key the work simply runs. Reusing a key for a different
+        request body (fingerprint) is a 422, as in the IETF Idempotency-Key draft.
+        """
+        if not key:
+            return await work(), False
+        turn_guard_metrics["keyed_requests"] += 1
+        self._purge_expired()
+
+        cache_key = (scope, session_id, key)
+        entry = self._entries.get(cache_key)
+        if entry is not None:
+            if entry["fingerprint"] != fingerprint:
+                turn_guard_metrics["key_mismatches"] += 1
+                raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+            if entry["task"].done():
+                turn_guard_metrics["replayed"] += 1
+            else:
+                turn_guard_metrics["joined_in_flight"] += 1
+            return await asyncio.shield(entry["task"]), True
+
+        task = asyncio.create_task(work())
+        self._entries[cache_key] = {"task": task, "fingerprint": fingerprint, "finished_at": None}
+        task.add_done_callback(lambda done: self._settle(cache_key, done))
+        return await asyncio.shield(task), False
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+def turn_guard_report() -> dict:
+    """Lock contention and idempotent replay counters"""
+    return {
+        **turn_guard_metrics,
+        "locked_sessions": session_locks.active(),
+        "cached_keys": idempotency_cache.size(),
+        "idempotency_ttl_seconds": IDEMPOTENCY_TTL_SECONDS
+    }
+
+
+# Global instances shared by the turn endpoints
+session_locks = SessionLocks(SESSION_TURN_LOCK_TIMEOUT_SECONDS)
+idempotency_cache = IdempotencyCache(IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_MAX_KEYS)